@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import time
+
+from src.websocket import Broadcaster
+
+
+EVENT = {
+    "action": "soundPlaying",
+    "groupIndex": 3,
+    "soundIndex": 12,
+    "groupName": "Scene 4 - The Haunted Mill",
+    "soundName": "Creaking Floorboards",
+    "volume": 0.75,
+    "repeatCount": 0,
+    "repeatDelay": "2000-8000",
+}
+
+
+class FakeWebSocket:
+    """
+    Stands in for `aiohttp.web.WebSocketResponse`. Sending does no I/O, so only the serialization cost is measured.
+    """
+
+    compress = 0
+
+    async def send_str(self, data: str):
+        pass
+
+
+class PerClientEncodingBroadcaster(Broadcaster):
+    """
+    The previous approach: serialize the message once for every client.
+    """
+
+    def broadcast(self, message):
+        for client in list(self.clients.values()):
+            if not client.send(json.dumps(message)):
+                self._on_overflow(client)
+
+
+async def measure(broadcaster: Broadcaster, n_clients: int, n_events: int) -> float:
+    """
+    Returns the CPU time per event in microseconds.
+    """
+    for i in range(n_clients):
+        broadcaster.register(f"client-{i}", FakeWebSocket())
+    start = time.process_time()
+    for _ in range(n_events):
+        broadcaster.broadcast(EVENT)
+        while any(client.queue_size for client in broadcaster.clients.values()):
+            await asyncio.sleep(0)  # let the writer tasks send the frames
+    cpu_time = time.process_time() - start
+    await broadcaster.close()
+    return cpu_time / n_events * 1e6
+
+
+async def run(n_clients: int, n_events: int):
+    per_client_us = await measure(PerClientEncodingBroadcaster(), n_clients, n_events)
+    encode_once_us = await measure(Broadcaster(), n_clients, n_events)
+    print(f"{n_clients:>8} {per_client_us:>18.1f} {encode_once_us:>18.1f}")
+
+
+if __name__ == "__main__":
+    """
+    Measures the CPU time per broadcast event when the event is serialized once per client compared to once for
+    all clients.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.broadcast_encoding`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the encoding of broadcast events")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 10, 100], help="numbers of connected clients")
+    parser.add_argument("--events", type=int, default=2000, help="events to broadcast per measurement")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'per client (us)':>18} {'encode once (us)':>18}")
+    loop = asyncio.get_event_loop()
+    for clients in args.clients:
+        loop.run_until_complete(run(clients, args.events))
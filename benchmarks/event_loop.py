@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import List
+
+from benchmarks.index_page import create_server
+from benchmarks.websocket_load import parse_mix, percentile
+from benchmarks.websocket_load import run as run_websocket_load
+from benchmarks.websocket_load import stub_audio
+from src.event_loop import EventLoop, install_event_loop
+
+
+async def sleep_repeatedly(interval: float, n_sleeps: int, overshoots: List[float]):
+    """
+    Sleeps like the polling loops of the music and sound managers and records how late every sleep returns.
+    """
+    for _ in range(n_sleeps):
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        overshoots.append(time.perf_counter() - start - interval)
+
+
+async def measure_jitter(n_timers: int, n_sleeps: int, interval: float) -> str:
+    """
+    Returns the p50/p99/max of how late the sleeps of `n_timers` concurrent timers return in milliseconds.
+    """
+    overshoots: List[float] = []
+    await asyncio.gather(*[sleep_repeatedly(interval, n_sleeps, overshoots) for _ in range(n_timers)])
+    p50, p99 = percentile(overshoots, 50), percentile(overshoots, 99)
+    return f"{p50 * 1000:>14.2f} {p99 * 1000:>10.2f} {max(overshoots) * 1000:>10.2f}"
+
+
+if __name__ == "__main__":
+    """
+    Compares the event loop of asyncio with uvloop. Measures how late 10 ms sleeps return, i.e., the timer jitter of
+    the polling loops, and the websocket throughput of `benchmarks.websocket_load` for every number of clients.
+    uvloop is skipped if it is not installed.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.event_loop`
+    """
+    parser = argparse.ArgumentParser(description="Compare the event loop implementations")
+    parser.add_argument("--timers", type=int, default=100, help="number of concurrent timers")
+    parser.add_argument("--sleeps", type=int, default=200, help="sleeps per timer")
+    parser.add_argument("--interval", type=float, default=0.01, help="sleep interval in seconds")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 100], help="numbers of websocket clients")
+    parser.add_argument("--commands", type=int, default=500, help="commands per measurement")
+    parser.add_argument("--protocol", choices=["json", "msgpack"], default="json", help="wire protocol of the clients")
+    parser.add_argument("--groups", type=int, default=10, help="number of music and sound groups each")
+    parser.add_argument("--items", type=int, default=10, help="track lists or sounds per group")
+    args = parser.parse_args()
+    weights = parse_mix("playSound=5,setSoundVolume=4,playMusic=1")
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # pygame initializes the mixer even if nothing is played
+    logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
+    logging.getLogger("src").setLevel(logging.WARNING)
+    for event_loop in EventLoop:
+        if install_event_loop(event_loop) != event_loop:
+            print(f"{event_loop.value}: not installed, skipped\n")
+            continue
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        print(f"{event_loop.value}: {args.timers} timers of {args.interval * 1000:.0f} ms")
+        print(f"{'late p50 (ms)':>14} {'p99 (ms)':>10} {'max (ms)':>10}")
+        print(loop.run_until_complete(measure_jitter(args.timers, args.sleeps, args.interval)))
+        print(f"{'clients':>8} {'commands (/s)':>14} {'broadcasts (/s)':>16} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+        for n_clients in args.clients:
+            random.seed(0)
+            server = create_server(args.groups, args.items)
+            server.coalesce_window = 0
+            stub_audio(server, 60.0)
+            print(loop.run_until_complete(run_websocket_load(server, n_clients, args.commands, weights, args)))
+        loop.close()
+        print()
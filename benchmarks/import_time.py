@@ -0,0 +1,73 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+# Modules that take long to import and are only needed to play audio, they must be imported on first use
+DEFERRED_MODULES = ("vlc", "pafy", "youtube_dl", "pygame", "pydub", "pkg_resources")
+
+# The command line after `python -X importtime` and its budget in milliseconds
+TARGETS = {
+    "start_server.py --help": (["start_server.py", "--help"], 200),
+    "import src.music, src.sound": (["-c", "import src.music, src.sound"], 250),
+    "import src.server": (["-c", "import src.server"], 350),
+}
+
+
+def measure(arguments: List[str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Runs the arguments in a new interpreter with `-X importtime`. Returns the total import time in milliseconds and
+    the cumulative import time of every module.
+    """
+    env = {**os.environ, "SDL_AUDIODRIVER": "dummy"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    total = 0.0
+    modules = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+        if not name.startswith("  "):  # nested imports are indented
+            total += int(cumulative) / 1000
+    return total, modules
+
+
+if __name__ == "__main__":
+    """
+    Checks the import time of the entry points against a budget with `python -X importtime`. Every target is measured
+    several times in a fresh interpreter and the fastest run counts. Fails if a target exceeds its budget or imports
+    one of the media libraries that are meant to be imported on first use.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.import_time`
+    """
+    parser = argparse.ArgumentParser(description="Check the import time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="runs per target")
+    parser.add_argument("--budget-factor", type=float, default=1.0, help="scales the budgets, e.g., for slow machines")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'target':>28} {'import (ms)':>12} {'budget (ms)':>12}  slowest imports")
+    for target, (arguments, budget) in TARGETS.items():
+        total, modules = min((measure(arguments) for _ in range(args.runs)), key=lambda measurement: measurement[0])
+        budget *= args.budget_factor
+        slowest = sorted(
+            ((name, ms) for name, ms in modules.items() if "." not in name), key=lambda item: item[1], reverse=True
+        )[:3]
+        print(
+            f"{target:>28} {total:>12.1f} {budget:>12.0f}  "
+            + ", ".join(f"{name} ({ms:.0f} ms)" for name, ms in slowest)
+        )
+        if total > budget:
+            print(f"{'':>28} over budget")
+            failed = True
+        deferred = [name for name in DEFERRED_MODULES if name in modules]
+        if deferred:
+            print(f"{'':>28} imports {', '.join(deferred)}")
+            failed = True
+    sys.exit(1 if failed else 0)
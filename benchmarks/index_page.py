@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.music import MusicGroup
+from src.server import Server
+from src.sound import SoundGroup
+
+
+EMPTY_CONFIG = """
+music:
+  volume: 20
+  groups: []
+sound:
+  volume: 1
+  groups: []
+"""
+
+
+def create_server(n_groups: int, n_items: int) -> Server:
+    """
+    Returns a server with a campaign of `n_groups` music and sound groups with `n_items` track lists or sounds each.
+    The groups are assigned after the start to skip the checks of the files.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml") as config_file:
+        config_file.write(EMPTY_CONFIG)
+        config_file.flush()
+        server = Server(config_path=config_file.name, host="127.0.0.1", port=8080)
+    server.music.groups = tuple(
+        MusicGroup(
+            {
+                "name": f"Scene {i}",
+                "track_lists": [{"name": f"Track List {j}", "tracks": ["track.mp3"]} for j in range(n_items)],
+            }
+        )
+        for i in range(n_groups)
+    )
+    server.sound.groups = tuple(
+        SoundGroup(
+            {"name": f"Scene {i}", "sounds": [{"name": f"Sound {j}", "files": ["sound.wav"]} for j in range(n_items)]}
+        )
+        for i in range(n_groups)
+    )
+    return server
+
+
+async def measure(client: TestClient, n_requests: int, headers=None, invalidate=False) -> float:
+    """
+    Returns the number of page loads per second. If `invalidate` is set, the state version changes before every load.
+    """
+    event_log = client.server.app["event_log"]
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        if invalidate:
+            event_log.append({"action": "musicStopped"})
+        resp = await client.get("/", headers=headers)
+        await resp.read()
+    return n_requests / (time.perf_counter() - start)
+
+
+async def run(n_groups: int, n_items: int, n_requests: int):
+    server = create_server(n_groups, n_items)
+    client = TestClient(TestServer(await server._init_app()))
+    await client.start_server()
+    rendered = await measure(client, n_requests, invalidate=True)
+    resp = await client.get("/")
+    page_size = len(await resp.read())
+    cached = await measure(client, n_requests)
+    not_modified = await measure(client, n_requests, headers={"If-None-Match": resp.headers["ETag"]})
+    await client.close()
+    print(f"{n_groups * n_items * 2:>6} {page_size:>12,} {rendered:>14,.0f} {cached:>12,.0f} {not_modified:>14,.0f}")
+
+
+if __name__ == "__main__":
+    """
+    Measures the page loads per second of the index page when it is rendered for every request compared to the
+    cached page and to a `304 Not Modified` response.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.index_page`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark loading the index page")
+    parser.add_argument("--groups", type=int, default=20, help="number of music and sound groups each")
+    parser.add_argument("--items", nargs="+", type=int, default=[5, 25], help="track lists or sounds per group")
+    parser.add_argument("--requests", type=int, default=200, help="page loads per measurement")
+    args = parser.parse_args()
+
+    logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
+    print(f"{'items':>6} {'page (B)':>12} {'rendered (/s)':>14} {'cached (/s)':>12} {'304 (/s)':>14}")
+    loop = asyncio.get_event_loop()
+    for items in args.items:
+        loop.run_until_complete(run(args.groups, items, args.requests))
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+import time
+
+from src.websocket import MessageDispatcher
+
+
+MESSAGES = [
+    json.loads(json.dumps(message))  # the decoded JSON, like the dispatch receives it
+    for message in [
+        {"action": "playMusic", "groupIndex": 0, "trackListIndex": 1},
+        {"action": "stopMusic"},
+        {"action": "setMusicMasterVolume", "volume": 50},
+        {"action": "setTrackListVolume", "groupIndex": 0, "trackListIndex": 1, "volume": 75},
+        {"action": "playSound", "groupIndex": 1, "soundIndex": 2},
+        {"action": "stopSound", "groupIndex": 1, "soundIndex": 2},
+        {"action": "setSoundMasterVolume", "volume": 0.5},
+        {"action": "setSoundVolume", "groupIndex": 1, "soundIndex": 2, "volume": 0.25},
+        {"action": "setSoundRepeatCount", "groupIndex": 1, "soundIndex": 2, "repeatCount": 3},
+        {"action": "setSoundRepeatDelay", "groupIndex": 1, "soundIndex": 2, "repeatDelay": "100-200"},
+    ]
+]
+
+MALFORMED_MESSAGES = [
+    {"action": "playSound", "groupIndex": "first", "soundIndex": 0},
+    {"action": "setSoundVolume", "groupIndex": 0, "soundIndex": 0, "volume": None},
+    {"action": "playMusic", "groupIndex": 0},
+    {"action": "unknown"},
+]
+
+
+async def noop(*args):
+    pass
+
+
+async def legacy_handle_message(request, data_dict):
+    """
+    The previous approach: an if/elif chain over the actions. It raised exceptions for malformed messages, which
+    ended the receive loop. They are caught here to be able to measure the rate.
+    """
+    try:
+        if "action" not in data_dict:
+            return
+        action = data_dict["action"]
+        if action == "playMusic":
+            if "groupIndex" in data_dict and "trackListIndex" in data_dict:
+                await noop(None, int(data_dict["groupIndex"]), int(data_dict["trackListIndex"]))
+        elif action == "stopMusic":
+            await noop()
+        elif action == "setMusicMasterVolume":
+            if "volume" in data_dict:
+                await noop(None, int(data_dict["volume"]))
+        elif action == "setTrackListVolume":
+            if "groupIndex" in data_dict and "trackListIndex" in data_dict and "volume" in data_dict:
+                group_index = int(data_dict["groupIndex"])
+                track_list_index = int(data_dict["trackListIndex"])
+                await noop(None, group_index, track_list_index, int(data_dict["volume"]))
+        elif action == "playSound":
+            if "groupIndex" in data_dict and "soundIndex" in data_dict:
+                await noop(None, int(data_dict["groupIndex"]), int(data_dict["soundIndex"]))
+        elif action == "stopSound":
+            if "groupIndex" in data_dict and "soundIndex" in data_dict:
+                await noop(int(data_dict["groupIndex"]), int(data_dict["soundIndex"]))
+        elif action == "setSoundMasterVolume":
+            if "volume" in data_dict:
+                await noop(None, float(data_dict["volume"]))
+        elif action == "setSoundVolume":
+            if "groupIndex" in data_dict and "soundIndex" in data_dict and "volume" in data_dict:
+                group_index = int(data_dict["groupIndex"])
+                sound_index = int(data_dict["soundIndex"])
+                await noop(None, group_index, sound_index, float(data_dict["volume"]))
+        elif action == "setSoundRepeatCount":
+            if "groupIndex" in data_dict and "soundIndex" in data_dict and "repeatCount" in data_dict:
+                group_index = int(data_dict["groupIndex"])
+                sound_index = int(data_dict["soundIndex"])
+                await noop(None, group_index, sound_index, int(data_dict["repeatCount"]))
+        elif action == "setSoundRepeatDelay":
+            if "groupIndex" in data_dict and "soundIndex" in data_dict and "repeatDelay" in data_dict:
+                group_index = int(data_dict["groupIndex"])
+                sound_index = int(data_dict["soundIndex"])
+                await noop(None, group_index, sound_index, data_dict["repeatDelay"])
+    except (TypeError, ValueError):
+        pass
+
+
+def create_dispatcher() -> MessageDispatcher:
+    """
+    Returns a dispatcher with the same actions and fields as `Server`, but with handlers that do nothing.
+    """
+    dispatcher = MessageDispatcher()
+    dispatcher.register("playMusic", noop, fields=(("groupIndex", int), ("trackListIndex", int)))
+    dispatcher.register("stopMusic", noop)
+    dispatcher.register("setMusicMasterVolume", noop, fields=(("volume", int),))
+    dispatcher.register(
+        "setTrackListVolume", noop, fields=(("groupIndex", int), ("trackListIndex", int), ("volume", int))
+    )
+    dispatcher.register("playSound", noop, fields=(("groupIndex", int), ("soundIndex", int)))
+    dispatcher.register("stopSound", noop, fields=(("groupIndex", int), ("soundIndex", int)))
+    dispatcher.register("setSoundMasterVolume", noop, fields=(("volume", float),))
+    dispatcher.register("setSoundVolume", noop, fields=(("groupIndex", int), ("soundIndex", int), ("volume", float)))
+    dispatcher.register(
+        "setSoundRepeatCount", noop, fields=(("groupIndex", int), ("soundIndex", int), ("repeatCount", int))
+    )
+    dispatcher.register(
+        "setSoundRepeatDelay", noop, fields=(("groupIndex", int), ("soundIndex", int), ("repeatDelay", str))
+    )
+    return dispatcher
+
+
+async def measure(dispatch, messages) -> float:
+    """
+    Returns the duration to dispatch the messages once.
+
+    The messages are dispatched like `Server._handle_message` does: `dispatch` returns the awaitable that handles
+    the message, or `None` if it is dropped.
+    """
+    start = time.perf_counter()
+    for message in messages:
+        handling = dispatch(None, message)
+        if handling is not None:
+            await handling
+    return time.perf_counter() - start
+
+
+async def run(n_messages: int, repeats: int):
+    dispatcher = create_dispatcher()
+    print(f"{'messages':>10} {'if/elif chain (msg/s)':>24} {'dispatch table (msg/s)':>24}")
+    for name, message_mix in [("valid", MESSAGES), ("malformed", MALFORMED_MESSAGES)]:
+        messages = [message_mix[i % len(message_mix)] for i in range(n_messages)]
+        legacy_duration, table_duration = float("inf"), float("inf")
+        for _ in range(repeats):  # alternating, such that both see the same load of the machine
+            legacy_duration = min(legacy_duration, await measure(legacy_handle_message, messages))
+            table_duration = min(table_duration, await measure(dispatcher.dispatch, messages))
+        print(f"{name:>10} {n_messages / legacy_duration:>24,.0f} {n_messages / table_duration:>24,.0f}")
+
+
+if __name__ == "__main__":
+    """
+    Measures how many messages per second pass through the dispatch of `Server._handle_message`, comparing the
+    previous if/elif chain with the `MessageDispatcher`. The handlers do nothing, so only the dispatch is measured.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.message_dispatch`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the dispatch of websocket messages")
+    parser.add_argument("--messages", type=int, default=100000, help="number of messages to dispatch")
+    parser.add_argument("--repeats", type=int, default=5, help="number of measurements, the best one is reported")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.messages, args.repeats))
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import wave
+
+from src.music import MusicManager
+from src.music.music_manager import CurrentlyPlaying
+
+
+def get_rss_mb() -> float:
+    """
+    Returns the resident set size of the process in MB. Falls back to the peak RSS if `/proc` is not available.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        import resource  # not available on Windows
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+def write_silence(path: str, milliseconds: int):
+    """
+    Writes a silent mono WAV file of the given duration.
+    """
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(44100)
+        file.writeframes(b"\0\0" * (44100 * milliseconds // 1000))
+
+
+async def run(n_tracks: int, track_ms: int, n_warmup: int, max_growth_mb: float) -> bool:
+    with tempfile.TemporaryDirectory() as directory:
+        write_silence(os.path.join(directory, "silence.wav"), track_ms)
+        config = {
+            "volume": 0,
+            "directory": directory,
+            "groups": [{"name": "Soak", "track_lists": [{"name": "Silence", "tracks": ["silence.wav"]}]}],
+        }
+        music = MusicManager(config)
+        group = music.groups[0]
+        track_list = group.track_lists[0]
+        track = track_list.tracks[0]
+        # the tracks are played by this task, as `play_track_list()` would do in the task it creates
+        music._currently_playing = CurrentlyPlaying(0, 0, asyncio.current_task())
+        baseline_mb = None
+        start = time.perf_counter()
+        print(f"{'tracks':>8} {'RSS (MB)':>10} {'tracks (/s)':>12}")
+        for i in range(1, n_tracks + 1):
+            await music._play_track(group, track_list, track)
+            if i == n_warmup:
+                baseline_mb = get_rss_mb()
+            if i % max(n_tracks // 10, 1) == 0:
+                print(f"{i:>8} {get_rss_mb():>10.1f} {i / (time.perf_counter() - start):>12.1f}")
+    growth_mb = get_rss_mb() - baseline_mb
+    print(f"RSS grew by {growth_mb:.1f} MB after the first {n_warmup} tracks (allowed: {max_growth_mb:.1f} MB)")
+    return growth_mb <= max_growth_mb
+
+
+if __name__ == "__main__":
+    """
+    Plays thousands of short tracks through `MusicManager._play_track` with libvlc and checks that the resident
+    memory stays flat after a warm-up, i.e., that neither libvlc instances nor players nor media objects leak.
+    Requires VLC. Fails if the RSS grows by more than `--max-growth` MB.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.music_soak`
+    """
+    parser = argparse.ArgumentParser(description="Check the memory of the music playback over many tracks")
+    parser.add_argument("--tracks", type=int, default=2000, help="number of tracks to play")
+    parser.add_argument("--track-ms", type=int, default=50, help="duration of a track in milliseconds")
+    parser.add_argument("--warmup", type=int, default=200, help="tracks to play before the baseline is taken")
+    parser.add_argument("--max-growth", type=float, default=10.0, help="allowed growth of the RSS in MB")
+    args = parser.parse_args()
+
+    logging.getLogger("src").setLevel(logging.WARNING)
+    loop = asyncio.get_event_loop()
+    is_flat = loop.run_until_complete(run(args.tracks, args.track_ms, min(args.warmup, args.tracks), args.max_growth))
+    sys.exit(0 if is_flat else 1)
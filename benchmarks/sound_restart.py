@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+from benchmarks.websocket_load import percentile
+from src.sound import SoundGroup, SoundManager
+from src.sound.sound_tracker import SoundTracker
+
+
+async def legacy_cancel_sound(self: SoundTracker, group_index: int, sound_index: int):
+    """
+    The previous approach: cancel the task and poll every 10 ms until it is done.
+    """
+    key = self._get_sound_key(group_index, sound_index)
+    if key not in self.sound_to_task:
+        return
+    task = self.sound_to_task[key]
+    task.cancel()
+    while not task.done():
+        await asyncio.sleep(0.01)
+
+
+async def measure(n_triggers: int, interval: float, legacy: bool) -> str:
+    """
+    Re-triggers the same sound `n_triggers` times, every `interval` seconds. Returns the p50/p99 of the time from the
+    call of `play_sound()` until the restarted sound plays and of the duration of the call in milliseconds.
+    """
+    sound = SoundManager({"volume": 1, "groups": []})
+    sound.groups = (SoundGroup({"name": "Scene", "sounds": [{"name": "Sound", "files": ["sound.wav"]}]}),)
+    loop = asyncio.get_event_loop()
+    started = loop.create_future()
+
+    async def play(*args, **kwargs):
+        started.set_result(time.perf_counter())
+        await asyncio.sleep(60)
+
+    sound._play_sound_file = play
+    start_latencies: List[float] = []
+    call_durations: List[float] = []
+    for _ in range(n_triggers):
+        started = loop.create_future()
+        called_at = time.perf_counter()
+        await sound.play_sound(None, 0, 0)
+        if legacy:
+            await asyncio.sleep(0.01)  # `play_sound()` returned to the event loop with a 10 ms sleep
+        call_durations.append(time.perf_counter() - called_at)
+        start_latencies.append(await started - called_at)
+        await asyncio.sleep(interval)
+    await sound.cancel_sound(0, 0)
+    return (
+        f"{'polling' if legacy else 'awaiting':>10} {percentile(start_latencies, 50) * 1000:>15.2f} "
+        f"{percentile(start_latencies, 99) * 1000:>10.2f} {percentile(call_durations, 50) * 1000:>14.2f} "
+        f"{percentile(call_durations, 99) * 1000:>10.2f}"
+    )
+
+
+if __name__ == "__main__":
+    """
+    Measures the restart latency of a sound that is re-triggered rapidly, i.e., the time it takes to cancel the sound
+    that plays and to start it again, with the previous polling cancellation and with the cancellation that awaits the
+    task. The playback is replaced by a sleep, so pygame plays nothing.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.sound_restart`
+    """
+    parser = argparse.ArgumentParser(description="Measure the restart latency of sounds")
+    parser.add_argument("--triggers", type=int, default=200, help="number of times the sound is triggered")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between two triggers")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # pygame initializes the mixer even if nothing is played
+    logging.getLogger("src").setLevel(logging.WARNING)
+    loop = asyncio.get_event_loop()
+    print(f"{'cancel':>10} {'start p50 (ms)':>15} {'p99 (ms)':>10} {'call p50 (ms)':>14} {'p99 (ms)':>10}")
+    cancel_sound = SoundTracker.cancel_sound
+    SoundTracker.cancel_sound = legacy_cancel_sound
+    print(loop.run_until_complete(measure(args.triggers, args.interval, legacy=True)))
+    SoundTracker.cancel_sound = cancel_sound
+    print(loop.run_until_complete(measure(args.triggers, args.interval, legacy=False)))
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import List
+
+from benchmarks.music_soak import write_silence
+from benchmarks.websocket_load import percentile
+from src.music import MusicManager
+from src.music.player_events import PlayerEvents
+
+
+def record_events(starts: List[float], ends: List[float]):
+    """
+    Records when a player starts playing after it was paused by the option "start-paused" and when it ends. The times
+    are taken in the thread of VLC, such that the latency of the event loop is part of the gap.
+    """
+    on_playing, on_paused, on_ended = PlayerEvents._on_playing, PlayerEvents._on_paused, PlayerEvents._on_ended
+
+    def _on_playing(self, event):
+        if getattr(self, "_benchmark_paused", False):  # VLC may report playing while it opens the paused media
+            starts.append(time.perf_counter())
+        on_playing(self, event)
+
+    def _on_paused(self, event):
+        self._benchmark_paused = True
+        on_paused(self, event)
+
+    def _on_ended(self, event):
+        if not getattr(self, "_benchmark_ended", False):  # a track that reached the end is stopped afterwards
+            self._benchmark_ended = True
+            ends.append(time.perf_counter())
+        on_ended(self, event)
+
+    PlayerEvents._on_playing, PlayerEvents._on_paused, PlayerEvents._on_ended = _on_playing, _on_paused, _on_ended
+
+
+async def measure_gaps(n_tracks: int, track_ms: int, preload: bool) -> str:
+    """
+    Plays `n_tracks` short tracks in a row and returns the p50/p99/max of the gap between the end of a track and the
+    start of the next one in milliseconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        files = [f"silence-{i}.wav" for i in range(n_tracks)]
+        for file in files:
+            write_silence(os.path.join(directory, file), track_ms)
+        config = {
+            "volume": 0,
+            "directory": directory,
+            "groups": [
+                {
+                    "name": "Gap",
+                    "track_lists": [{"name": "Silence", "loop": False, "shuffle": False, "tracks": files}],
+                }
+            ],
+        }
+        music = MusicManager(config)
+        if not preload:
+            music._preload_track = lambda *args: None
+        starts: List[float] = []
+        ends: List[float] = []
+        callbacks = PlayerEvents._on_playing, PlayerEvents._on_paused, PlayerEvents._on_ended
+        record_events(starts, ends)
+        try:
+            task = await music.play_track_list(None, 0, 0)
+            await task
+        finally:
+            PlayerEvents._on_playing, PlayerEvents._on_paused, PlayerEvents._on_ended = callbacks
+    gaps = [start - end for start, end in zip(starts[1:], ends)]
+    if not gaps:
+        return f"{'on' if preload else 'off':>8} no gaps measured ({len(starts)} tracks started)"
+    p50, p99 = percentile(gaps, 50), percentile(gaps, 99)
+    return f"{'on' if preload else 'off':>8} {p50 * 1000:>10.1f} {p99 * 1000:>10.1f} {max(gaps) * 1000:>10.1f}"
+
+
+if __name__ == "__main__":
+    """
+    Measures the gap between two tracks of a track list, i.e., the time from the end of a track to the start of the
+    next one, with and without preloading the next track. Requires VLC.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.track_gap`
+    """
+    parser = argparse.ArgumentParser(description="Measure the gap between two tracks")
+    parser.add_argument("--tracks", type=int, default=50, help="number of tracks to play")
+    parser.add_argument("--track-ms", type=int, default=500, help="duration of a track in milliseconds")
+    args = parser.parse_args()
+
+    logging.getLogger("src").setLevel(logging.WARNING)
+    loop = asyncio.get_event_loop()
+    print(f"{'preload':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for preload in (False, True):
+        print(loop.run_until_complete(measure_gaps(args.tracks, args.track_ms, preload)))
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import List, Optional, Union
+
+from aiohttp.http_websocket import WebSocketWriter
+
+from benchmarks.index_page import create_server
+from benchmarks.wire_protocol import EVENTS
+from src.websocket import EventLog, WebsocketClient, binary_protocol
+
+
+class CountingTransport:
+    """
+    Stands in for the transport of the connection and counts the bytes that would be sent.
+    """
+
+    def __init__(self):
+        self.n_bytes = 0
+
+    def write(self, data: bytes):
+        self.n_bytes += len(data)
+
+    def is_closing(self) -> bool:
+        return False
+
+
+class FakeProtocol:
+    async def _drain_helper(self):
+        pass
+
+
+class FakeWebSocket:
+    """
+    Stands in for `aiohttp.web.WebSocketResponse` with the writer of aiohttp, so the frames are compressed as they
+    would be on a real connection.
+    """
+
+    def __init__(self, compress: int):
+        self.transport = CountingTransport()
+        self.compress = compress
+        self._writer = WebSocketWriter(FakeProtocol(), self.transport, compress=compress)
+
+    async def send_str(self, data: str):
+        await self._writer.send(data, binary=False)
+
+    async def send_bytes(self, data: bytes):
+        await self._writer.send(data, binary=True)
+
+
+async def measure(frames: List[Union[str, bytes]], binary: bool, threshold: Optional[int]) -> str:
+    """
+    Sends the frames through a `WebsocketClient` and returns the bytes on the wire and the CPU time per message.
+    The threshold `None` disables the compression.
+    """
+    ws = FakeWebSocket(compress=0 if threshold is None else 15)
+    client = WebsocketClient(
+        "client", ws, max_queue_size=len(frames), send_timeout=1, binary=binary, compress_threshold=threshold or 0
+    )
+    start = time.process_time()
+    for frame in frames:
+        client.send(frame)
+    while client.queue_size:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)  # let the writer send the last frame
+    cpu_time = time.process_time() - start
+    client.stop()
+    label = "off" if threshold is None else f"threshold {threshold}"
+    return f"{label:>14} {ws.transport.n_bytes:>12,} {cpu_time / len(frames) * 1e6:>10.1f}"
+
+
+async def run(args):
+    server = create_server(args.groups, args.items)
+    snapshot = server._get_snapshot(EventLog())
+    events = [snapshot] + [{**random.choice(EVENTS), "version": i} for i in range(args.events)]
+    for protocol in args.protocols:
+        binary = protocol == "msgpack"
+        frames = [binary_protocol.encode(event) if binary else json.dumps(event) for event in events]
+        payload_size = sum(len(frame if binary else frame.encode()) for frame in frames)
+        print(f"{protocol}: 1 snapshot of {len(frames[0]):,} B and {args.events} events, {payload_size:,} B")
+        print(f"{'compression':>14} {'wire (B)':>12} {'CPU (us)':>10}")
+        for threshold in [None, *args.thresholds]:
+            print(await measure(frames, binary, threshold))
+
+
+if __name__ == "__main__":
+    """
+    Measures the bytes on the wire and the CPU time per message of a client that receives the snapshot of a large
+    campaign followed by a stream of events, without compression and with permessage-deflate at several thresholds.
+    Frames shorter than the threshold are sent uncompressed.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.websocket_compression`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the websocket compression")
+    parser.add_argument("--events", type=int, default=2000, help="events after the snapshot")
+    parser.add_argument("--groups", type=int, default=50, help="number of music and sound groups each")
+    parser.add_argument("--items", type=int, default=20, help="track lists or sounds per group")
+    parser.add_argument(
+        "--thresholds", nargs="+", type=int, default=[0, 32, 256], help="compression thresholds in bytes"
+    )
+    parser.add_argument("--protocols", nargs="+", choices=["json", "msgpack"], default=["json", "msgpack"])
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # pygame initializes the mixer even if nothing is played
+    logging.getLogger("src").setLevel(logging.WARNING)
+    random.seed(0)
+    asyncio.get_event_loop().run_until_complete(run(args))
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Tuple
+
+import aiohttp
+import msgpack
+from aiohttp.test_utils import TestServer
+
+from benchmarks.index_page import create_server
+from src.server import Server
+from src.websocket import binary_protocol
+
+
+# The broadcast that completes a command, identified by `(action, group index, item index)`
+EXPECTED_ACTIONS = {"playSound": "soundPlaying", "setSoundVolume": "setSoundVolume", "playMusic": "nowPlaying"}
+
+CLIENT_OPCODES = {action: (opcode, fields) for opcode, (action, fields) in enumerate(binary_protocol.CLIENT_ACTIONS)}
+
+
+def stub_audio(server: Server, seconds: float):
+    """
+    Replaces the playback of tracks and sound files by a sleep, so neither VLC nor pygame is needed.
+    """
+
+    async def play(*args, **kwargs):
+        await asyncio.sleep(seconds)
+
+    server.music._play_track = play
+    server.sound._play_sound_file = play
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Parses a mix of the form "playSound=5,setSoundVolume=4,playMusic=1" into a mapping from action to weight.
+    """
+    weights = {}
+    for part in mix.split(","):
+        action, weight = part.split("=")
+        if action not in EXPECTED_ACTIONS:
+            raise argparse.ArgumentTypeError(f"Unknown action '{action}', choose from {', '.join(EXPECTED_ACTIONS)}")
+        weights[action] = int(weight)
+    return weights
+
+
+def create_command(action: str, n_groups: int, n_items: int) -> Tuple[Dict, Tuple]:
+    """
+    Returns a random command of the action and the key of the broadcast that completes it.
+    """
+    group_index = random.randrange(n_groups)
+    item_index = random.randrange(n_items)
+    if action == "playMusic":
+        command = {"action": action, "groupIndex": group_index, "trackListIndex": item_index}
+    elif action == "playSound":
+        command = {"action": action, "groupIndex": group_index, "soundIndex": item_index}
+    else:
+        command = {"action": action, "groupIndex": group_index, "soundIndex": item_index, "volume": random.random()}
+    return command, (EXPECTED_ACTIONS[action], group_index, item_index)
+
+
+def get_key(message: Dict) -> Tuple:
+    """
+    Returns the key of a broadcast message, see `create_command`.
+    """
+    item_index = message.get("soundIndex", message.get("trackListIndex"))
+    return message["action"], message.get("groupIndex"), item_index
+
+
+class LoadClient:
+    """
+    A websocket client that records when the broadcast of the pending command arrives.
+    """
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse, binary: bool):
+        self.ws = ws
+        self.binary = binary
+        self.n_received = 0
+        self.pending_key = None
+        self.received = asyncio.Event()
+        self.received_at = None
+
+    async def send(self, command: Dict):
+        if self.binary:
+            opcode, fields = CLIENT_OPCODES[command["action"]]
+            await self.ws.send_bytes(msgpack.packb([opcode, *[command[field] for field in fields]]))
+        else:
+            await self.ws.send_str(json.dumps(command))
+
+    async def receive_forever(self):
+        async for msg in self.ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                opcode, *values = msgpack.unpackb(msg.data, raw=False)
+                action, fields = binary_protocol.SERVER_ACTIONS[opcode]
+                message = {"action": action, **dict(zip(fields, values))}
+            else:
+                message = json.loads(msg.data)
+            self.n_received += 1
+            if self.pending_key is not None and get_key(message) == self.pending_key:
+                self.pending_key = None
+                self.received_at = time.perf_counter()
+                self.received.set()
+
+    def expect(self, key: Tuple):
+        self.pending_key = key
+        self.received_at = None
+        self.received.clear()
+
+
+def percentile(values: List[float], percent: int) -> float:
+    """
+    Returns the percentile of the values (nearest rank).
+    """
+    values = sorted(values)
+    return values[round(percent / 100 * (len(values) - 1))]
+
+
+async def run(server: Server, n_clients: int, n_commands: int, weights: Dict[str, int], args) -> str:
+    test_server = TestServer(await server._init_app())
+    await test_server.start_server()
+    protocols = (binary_protocol.SUBPROTOCOL,) if args.protocol == "msgpack" else ()
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+    clients = []
+    for _ in range(n_clients):
+        ws = await session.ws_connect(test_server.make_url("/"), protocols=protocols)
+        clients.append(LoadClient(ws, binary=args.protocol == "msgpack"))
+    receivers = [asyncio.ensure_future(client.receive_forever()) for client in clients]
+    actions = random.choices(list(weights), weights=list(weights.values()), k=n_commands)
+    latencies: List[float] = []
+    n_received_before = sum(client.n_received for client in clients)
+    start = time.perf_counter()
+    for action in actions:
+        command, key = create_command(action, args.groups, args.items)
+        for client in clients:
+            client.expect(key)
+        sent_at = time.perf_counter()
+        await clients[0].send(command)
+        await asyncio.wait_for(asyncio.gather(*[client.received.wait() for client in clients]), timeout=10)
+        latencies.extend(client.received_at - sent_at for client in clients)
+    elapsed = time.perf_counter() - start
+    n_received = sum(client.n_received for client in clients) - n_received_before
+    await server.music.cancel()
+    for active_sound in server.sound.tracker.active_sounds:
+        await server.sound.cancel_sound(active_sound.group_index, active_sound.sound_index)
+    for client in clients:
+        await client.ws.close()
+    await asyncio.gather(*receivers)
+    await session.close()
+    await test_server.close()
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    return (
+        f"{n_clients:>8} {n_commands / elapsed:>14,.0f} {n_received / elapsed:>16,.0f} "
+        f"{p50 * 1000:>10.2f} {p99 * 1000:>10.2f}"
+    )
+
+
+if __name__ == "__main__":
+    """
+    Connects N websocket clients to a server with stubbed audio backends. The first client sends a mix of commands, one
+    at a time, and every client waits for the broadcast of the command. Reports the commands per second, the broadcast
+    messages per second received by all clients and the p50/p99 latency from sending a command to receiving its
+    broadcast. The clients run in the same event loop as the server, so the numbers include their overhead.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.websocket_load`
+    """
+    parser = argparse.ArgumentParser(description="Load test the websocket broadcast path")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 10, 100, 500], help="numbers of clients")
+    parser.add_argument("--commands", type=int, default=500, help="commands per measurement")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="playSound=5,setSoundVolume=4,playMusic=1",
+        help="weights of the commands (default: %(default)s)",
+    )
+    parser.add_argument("--protocol", choices=["json", "msgpack"], default="json", help="wire protocol of the clients")
+    parser.add_argument("--groups", type=int, default=10, help="number of music and sound groups each")
+    parser.add_argument("--items", type=int, default=10, help="track lists or sounds per group")
+    parser.add_argument(
+        "--coalesce-window", type=float, default=0.0, help="coalescing window of the server (default: %(default)s)"
+    )
+    parser.add_argument("--play-seconds", type=float, default=60.0, help="duration of a stubbed track or sound")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # pygame initializes the mixer even if nothing is played
+    logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
+    logging.getLogger("src").setLevel(logging.WARNING)
+    random.seed(0)
+    print(f"{'clients':>8} {'commands (/s)':>14} {'broadcasts (/s)':>16} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    loop = asyncio.get_event_loop()
+    for n_clients in args.clients:
+        server = create_server(args.groups, args.items)
+        server.coalesce_window = args.coalesce_window
+        stub_audio(server, args.play_seconds)
+        print(loop.run_until_complete(run(server, n_clients, args.commands, args.mix, args)))
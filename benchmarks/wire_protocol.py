@@ -0,0 +1,68 @@
+import argparse
+import json
+import time
+
+import msgpack
+
+from src.websocket import binary_protocol
+
+
+SOUND_INFO = {
+    "groupIndex": 3,
+    "soundIndex": 12,
+    "groupName": "Scene 4 - The Haunted Mill",
+    "soundName": "Creaking Floorboards",
+    "volume": 0.75,
+    "repeatCount": 0,
+    "repeatDelay": "2000-8000",
+    "version": 1042,
+}
+
+EVENTS = [
+    {"action": "soundPlaying", **SOUND_INFO},
+    {"action": "setSoundVolume", **SOUND_INFO},
+    {"action": "setSoundMasterVolume", "volume": 0.5, "version": 1042},
+    {
+        "action": "nowPlaying",
+        "groupIndex": 0,
+        "trackListIndex": 1,
+        "groupName": "Scene 1 - Travel",
+        "trackName": "Forest Music",
+        "version": 1042,
+    },
+    {"action": "musicStopped", "version": 1042},
+]
+
+
+def measure_decode(decode, frame, repeats: int) -> float:
+    """
+    Returns the time to decode the frame in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode(frame)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+if __name__ == "__main__":
+    """
+    Compares the frame size and the decoding time of the JSON protocol with the binary protocol for common events.
+    The decoding is measured in Python, which only indicates the relative cost for the browser.
+
+    Run this script from the project root as follows:
+    `python -m benchmarks.wire_protocol`
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the websocket wire protocols")
+    parser.add_argument("--repeats", type=int, default=100000, help="number of times every frame is decoded")
+    args = parser.parse_args()
+
+    print(f"{'event':>22} {'JSON (B)':>9} {'binary (B)':>11} {'JSON (us)':>10} {'binary (us)':>12}")
+    for event in EVENTS:
+        json_frame = json.dumps(event)
+        binary_frame = binary_protocol.encode(event)
+        json_us = measure_decode(json.loads, json_frame, args.repeats)
+        binary_us = measure_decode(msgpack.unpackb, binary_frame, args.repeats)
+        print(
+            f"{event['action']:>22} {len(json_frame.encode()):>9} {len(binary_frame):>11} "
+            f"{json_us:>10.2f} {binary_us:>12.2f}"
+        )
@@ -0,0 +1,29 @@
+import argparse
+import logging
+
+from src import assets
+
+
+if __name__ == "__main__":
+    """
+    Builds the static assets: downloads the third-party files to `src/static/vendor` (unless they are there already)
+    and bundles them with the files in `src/static` into `src/static/dist`, where the server picks them up.
+
+    Accepts the following optional arguments:
+    --offline: only use the vendor files that have been downloaded before
+    --refresh: download the vendor files again
+
+    Run this script after changing any file in `src/static` as follows:
+    `python build_assets.py`
+    """
+    parser = argparse.ArgumentParser(description="Build the static assets")
+    parser.add_argument("--offline", action="store_true", help="do not download missing vendor files")
+    parser.add_argument("--refresh", action="store_true", help="download the vendor files again")
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+    if not args.offline:
+        assets.fetch_vendor_files(force=args.refresh)
+    manifest = assets.build()
+    for name, filename in manifest.items():
+        logging.info(f"Built {name} as {assets.DIST_DIRECTORY / filename}")
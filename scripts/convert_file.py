@@ -1,10 +1,10 @@
 import argparse
 import os
 
-import pydub
-
 
 def convert_file(file_path, _format, start=None, end=None, out=None):
+    import pydub  # imported on first use, since importing it takes long
+
     filename, file_extension = os.path.splitext(file_path)
     audio = pydub.audio_segment.AudioSegment.from_file(file_path)
     start = int(start) if start is not None else 0
@@ -0,0 +1,213 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import pathlib
+import re
+import shutil
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+STATIC_ROOT = pathlib.Path(__file__).parent / "static"
+DIST_DIRECTORY = STATIC_ROOT / "dist"
+VENDOR_DIRECTORY = STATIC_ROOT / "vendor"
+MANIFEST_FILENAME = "manifest.json"
+DOWNLOAD_TIMEOUT = 30  # seconds, for connecting and between two chunks of a vendor file
+
+# Third-party files as (url, path in `VENDOR_DIRECTORY`, subresource integrity or `None`)
+VENDOR_FILES: List[Tuple[str, str, Optional[str]]] = [
+    (
+        "https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css",
+        "bootstrap/bootstrap.min.css",
+        "sha384-ggOyR0iXCbMQv3Xipma34MD+dH/1fQ784/j6cY/iJTQUOhcWr7x9JvoRxT2MZw1T",
+    ),
+    (
+        "https://use.fontawesome.com/releases/v5.7.2/css/all.css",
+        "fontawesome/css/all.css",
+        "sha384-fnmOCqbTlWIlj8LyTjo7mOUStjsKC4pOpQbqyi7RrhN7udi9RwhKkMHpvLbHG9Sr",
+    ),
+    (
+        "https://cdnjs.cloudflare.com/ajax/libs/bootstrap-slider/10.6.1/css/bootstrap-slider.min.css",
+        "bootstrap-slider/bootstrap-slider.min.css",
+        None,
+    ),
+    (
+        "https://code.jquery.com/jquery-3.3.1.min.js",
+        "jquery/jquery.min.js",
+        "sha256-FgpCb/KJQlLNfOu91ta32o/NMZxltwRo8QtmkMRdAu8=",
+    ),
+    (
+        "https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/js/bootstrap.min.js",
+        "bootstrap/bootstrap.min.js",
+        "sha384-JjSmVgyd0p3pXB1rRibZUAYoIIy6OrQ6VrjIEaFf/nJGzIxFDsf4x0xIM+B07jRM",
+    ),
+    (
+        "https://cdnjs.cloudflare.com/ajax/libs/bootstrap-slider/10.6.1/bootstrap-slider.min.js",
+        "bootstrap-slider/bootstrap-slider.min.js",
+        None,
+    ),
+]
+
+# The files of the bundles relative to `STATIC_ROOT`, in the order they are loaded
+CSS_BUNDLE = [
+    "vendor/bootstrap/bootstrap.min.css",
+    "vendor/fontawesome/css/all.css",
+    "vendor/bootstrap-slider/bootstrap-slider.min.css",
+    "css/base.css",
+    "css/darkMode.css",
+    "css/inputField.css",
+]
+JS_BUNDLE = [
+    "vendor/jquery/jquery.min.js",
+    "vendor/bootstrap/bootstrap.min.js",
+    "vendor/bootstrap-slider/bootstrap-slider.min.js",
+    "js/binaryProtocol.js",
+    "js/webSocket.js",
+    "js/musicPlayerUtils.js",
+    "js/musicAPIUtils.js",
+    "js/soundPlayerUtils.js",
+    "js/soundAPIUtils.js",
+    "js/slider.js",
+    "js/collapse.js",
+    "js/darkMode.js",
+]
+
+CSS_URL_REGEX = re.compile(r"url\(\s*['\"]?([^'\")]+?)['\"]?\s*\)")
+
+
+def fingerprint(filename: str, content: bytes) -> str:
+    """
+    Returns the filename with a hash of the content before the extension, e.g., "app.js" becomes "app.1a2b3c4d5e6f.js".
+    """
+    path = pathlib.PurePosixPath(filename)
+    return f"{path.stem}.{hashlib.sha256(content).hexdigest()[:12]}{path.suffix}"
+
+
+def load_manifest(dist_directory: pathlib.Path = DIST_DIRECTORY) -> Optional[Dict[str, str]]:
+    """
+    Returns the mapping from bundle name (e.g., "app.js") to fingerprinted filename. Returns `None` if the assets have
+    not been built.
+    """
+    try:
+        with open(dist_directory / MANIFEST_FILENAME) as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+
+def fetch_vendor_files(vendor_directory: pathlib.Path = VENDOR_DIRECTORY, force: bool = False):
+    """
+    Downloads the third-party files that are missing from the vendor directory and verifies their integrity.
+    Files referenced by stylesheets, e.g., fonts, are downloaded next to them.
+    """
+    for url, path, integrity in VENDOR_FILES:
+        target = vendor_directory / path
+        if target.is_file() and not force:
+            continue
+        content = _download(url, integrity)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        logger.info(f"Downloaded {url}")
+        if target.suffix == ".css":
+            for reference in _local_css_references(content.decode()):
+                reference_target = (target.parent / reference).resolve()
+                if reference_target.is_file() and not force:
+                    continue
+                reference_url = urllib.parse.urljoin(url, reference)
+                reference_target.parent.mkdir(parents=True, exist_ok=True)
+                reference_target.write_bytes(_download(reference_url, None))
+                logger.info(f"Downloaded {reference_url}")
+
+
+def _download(url: str, integrity: Optional[str]) -> bytes:
+    """
+    Returns the content at the url. Raises a `RuntimeError` if it does not match the subresource integrity.
+    """
+    result = requests.get(url, timeout=DOWNLOAD_TIMEOUT)
+    result.raise_for_status()
+    if integrity is not None:
+        algorithm, expected_digest = integrity.split("-", 1)
+        digest = base64.b64encode(hashlib.new(algorithm, result.content).digest()).decode()
+        if digest != expected_digest:
+            raise RuntimeError(f"The integrity check for '{url}' failed.")
+    return result.content
+
+
+def _local_css_references(css: str) -> List[str]:
+    """
+    Returns the relative paths referenced by `url(...)` in the stylesheet, without query and fragment.
+    """
+    references = []
+    for url in CSS_URL_REGEX.findall(css):
+        if url.startswith(("data:", "http:", "https:", "/", "#")):
+            continue
+        path = re.split(r"[?#]", url, maxsplit=1)[0]
+        if path not in references:
+            references.append(path)
+    return references
+
+
+def build(static_root: pathlib.Path = STATIC_ROOT, dist_directory: pathlib.Path = DIST_DIRECTORY) -> Dict[str, str]:
+    """
+    Concatenates and minifies the files of `CSS_BUNDLE` and `JS_BUNDLE` into `dist_directory`. Every output file gets
+    a fingerprinted name and a gzipped copy next to it. Files referenced by the stylesheets are copied with a
+    fingerprinted name as well. Returns the manifest that is written to `MANIFEST_FILENAME`.
+    """
+    # The minifiers are only needed to build the assets, the server only loads the manifest
+    import rcssmin
+    import rjsmin
+
+    missing = [path for path in CSS_BUNDLE + JS_BUNDLE if not (static_root / path).is_file()]
+    if missing:
+        raise FileNotFoundError(f"Missing files, download the vendor files first: {', '.join(missing)}")
+    if dist_directory.exists():
+        shutil.rmtree(dist_directory)
+    dist_directory.mkdir(parents=True)
+    css = "\n".join(_read_css(static_root / path, dist_directory) for path in CSS_BUNDLE)
+    js = ";\n".join((static_root / path).read_text(encoding="utf-8") for path in JS_BUNDLE)
+    manifest = {
+        "app.css": _write_asset(dist_directory, "app.css", rcssmin.cssmin(css, keep_bang_comments=True).encode()),
+        "app.js": _write_asset(dist_directory, "app.js", rjsmin.jsmin(js, keep_bang_comments=True).encode()),
+    }
+    with open(dist_directory / MANIFEST_FILENAME, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def _read_css(path: pathlib.Path, dist_directory: pathlib.Path) -> str:
+    """
+    Returns the stylesheet with every local `url(...)` pointing to a fingerprinted copy in the dist directory.
+    """
+    css = path.read_text(encoding="utf-8")
+
+    def replace(match):
+        url = match.group(1)
+        if url.startswith(("data:", "http:", "https:", "/", "#")):
+            return match.group(0)
+        reference, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        reference_path = path.parent / reference
+        if not reference_path.is_file():
+            logger.warning(f"'{reference}' referenced by '{path.name}' does not exist.")
+            return match.group(0)
+        filename = _write_asset(dist_directory, reference_path.name, reference_path.read_bytes(), compress=False)
+        return f"url({filename}{suffix})"
+
+    return CSS_URL_REGEX.sub(replace, css)
+
+
+def _write_asset(dist_directory: pathlib.Path, filename: str, content: bytes, compress: bool = True) -> str:
+    """
+    Writes the content under its fingerprinted filename and, if `compress` is set, a gzipped copy with the ".gz"
+    extension that is served to clients that accept it. Returns the fingerprinted filename.
+    """
+    fingerprinted_filename = fingerprint(filename, content)
+    (dist_directory / fingerprinted_filename).write_bytes(content)
+    if compress:
+        (dist_directory / f"{fingerprinted_filename}.gz").write_bytes(gzip.compress(content, compresslevel=9))
+    return fingerprinted_filename
@@ -1,7 +1,7 @@
 import hashlib
 import json
 import os
-from typing import List
+from typing import Dict, List
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -29,6 +29,20 @@ def load_list(filename: str) -> List:
     return content
 
 
+def save_dict(content: Dict, filename: str):
+    with open(os.path.join(CACHE_DIR, filename), "w") as file:
+        json.dump(content, file, indent=4)
+
+
+def load_dict(filename: str) -> Dict:
+    path = os.path.join(CACHE_DIR, filename)
+    content = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            content = json.load(file)
+    return content
+
+
 def get_file_hash(file_path) -> str:
     sha256_hash = hashlib.sha3_256()
     with open(file_path, "rb") as file:
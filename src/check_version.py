@@ -1,19 +1,45 @@
 import logging
+import threading
+import time
 
-import pkg_resources
 import requests
 
+from src import cache
+from src.lazy_import import lazy_import
+
+
+pkg_resources = lazy_import("pkg_resources")
 
 logger = logging.getLogger(__name__)
 
+PYPI_URL = "https://pypi.org/pypi/youtube_dl/json"
+VERSION_CACHE = "youtube_dl_version.json"
+VERSION_CACHE_TTL = 24 * 60 * 60  # seconds
+REQUEST_TIMEOUT = 5  # seconds
+
+
+def get_latest_youtube_dl_version(ttl: float = VERSION_CACHE_TTL) -> str:
+    """
+    Returns the latest version of the 'youtube-dl' package on PyPI. The version is cached for `ttl` seconds, so PyPI is
+    asked at most once per `ttl`.
+    """
+    cached = cache.load_dict(VERSION_CACHE)
+    if cached and 0 <= time.time() - cached["checked_at"] < ttl:
+        return cached["version"]
+    result = requests.get(PYPI_URL, timeout=REQUEST_TIMEOUT)
+    latest_version = result.json()["info"]["version"]
+    cache.save_dict({"version": latest_version, "checked_at": time.time()}, VERSION_CACHE)
+    return latest_version
+
 
-def check_youtube_dl_version() -> bool:
+def check_youtube_dl_version(ttl: float = VERSION_CACHE_TTL) -> bool:
     """
     Returns `False` if a new version of the 'youtube-dl' package is available.
     If that is the case, this information will be logged.
+
+    :param ttl: seconds for which the latest version is cached, 0 always asks PyPI
     """
-    result = requests.get("https://pypi.org/pypi/youtube_dl/json")
-    latest_version = result.json()["info"]["version"]
+    latest_version = get_latest_youtube_dl_version(ttl)
     current_version = pkg_resources.get_distribution("youtube-dl").version
     is_latest_version = current_version == latest_version
     if not is_latest_version:
@@ -21,3 +47,28 @@ def check_youtube_dl_version() -> bool:
         logger.warning("YouTube support may not work if the package is not updated.")
         logger.warning("Type 'pip install --upgrade youtube-dl' to update it.")
     return is_latest_version
+
+
+def check_youtube_dl_version_in_background() -> threading.Thread:
+    """
+    Starts `check_youtube_dl_version()` in a daemon thread and returns the thread, such that the startup does not wait
+    for PyPI, e.g., if there is no internet connection. A failed check is logged.
+    """
+
+    def check():
+        try:
+            check_youtube_dl_version()
+        except Exception as ex:
+            logger.warning(f"Could not check the version of the 'youtube-dl' package: {ex!r}")
+
+    thread = threading.Thread(target=check, name="check-youtube-dl-version", daemon=True)
+    thread.start()
+    return thread
+
+
+async def check_youtube_dl_version_on_startup(app):
+    """
+    Starts `check_youtube_dl_version_in_background()` when the web application `app` starts, such that the check does
+    not delay loading the configuration and the audio backends.
+    """
+    check_youtube_dl_version_in_background()
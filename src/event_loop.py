@@ -0,0 +1,32 @@
+import asyncio
+import logging
+from enum import Enum
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoop(Enum):
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+def install_event_loop(event_loop: EventLoop) -> EventLoop:
+    """
+    Installs the policy of the event loop implementation and returns the installed implementation. Has to be called
+    before the first loop is created, i.e., before the server is initialized.
+
+    Falls back to the default loop of `asyncio` if `uvloop` is not installed (it is optional and not available on
+    Windows).
+    """
+    if event_loop == EventLoop.UVLOOP:
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning("The 'uvloop' package is not installed, falling back to the asyncio event loop.")
+            logger.warning("Type 'pip install uvloop' to install it (not available on Windows).")
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return EventLoop.UVLOOP
+    asyncio.set_event_loop_policy(None)
+    return EventLoop.ASYNCIO
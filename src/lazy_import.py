@@ -0,0 +1,39 @@
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+
+_load_lock = threading.RLock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the module without executing it. The module is executed on the first access of one of its attributes,
+    so slow imports, e.g., of media libraries, only cost time if they are used.
+
+    Parent packages of a submodule are imported right away, so prefer the top-level package.
+    Raises a `ModuleNotFoundError` if the module does not exist.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def ensure_loaded(module: ModuleType) -> ModuleType:
+    """
+    Executes the lazily imported module if it was not executed yet and returns it. Use it before accessing a lazily
+    imported module from a worker thread: the `LazyLoader` is not thread-safe, so a thread that accesses the module
+    while another one executes it can find it empty.
+    """
+    with _load_lock:
+        module.__dict__  # the first access of an attribute executes the module
+    return module
@@ -0,0 +1,155 @@
+import bisect
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+# Upper bounds in seconds, from fast in-memory operations to noticeable delays
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    """
+    Returns the labels in the exposition format, e.g., `{action="playSound"}`.
+    """
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """
+    A value that only increases, e.g., the number of received messages.
+    """
+
+    TYPE = "counter"
+
+    __slots__ = ("name", "help", "labels", "value")
+
+    def __init__(self, name: str, help: str, labels: Optional[Dict[str, str]] = None):
+        """
+        Initializes a `Counter` instance.
+
+        :param name: name of the metric, should end with "_total"
+        :param help: description of the metric
+        :param labels: label names mapped to their values (Optional)
+        """
+        self.name = name
+        self.help = help
+        self.labels = _format_labels(labels)
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self.labels} {self.value}"]
+
+
+class Gauge:
+    """
+    A value that goes up and down, e.g., the number of connected clients. The value is read from the function when
+    the metrics are collected, so keeping it up to date costs nothing.
+    """
+
+    TYPE = "gauge"
+
+    __slots__ = ("name", "help", "labels", "function")
+
+    def __init__(self, name: str, help: str, function: Callable[[], float], labels: Optional[Dict[str, str]] = None):
+        """
+        Initializes a `Gauge` instance.
+
+        :param name: name of the metric
+        :param help: description of the metric
+        :param function: returns the current value
+        :param labels: label names mapped to their values (Optional)
+        """
+        self.name = name
+        self.help = help
+        self.labels = _format_labels(labels)
+        self.function = function
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self.labels} {self.function()}"]
+
+
+class Histogram:
+    """
+    Counts observations, e.g., durations, in buckets with fixed upper bounds. Observing a value costs a binary search
+    and two additions, the cumulative counts are only computed when the metrics are collected.
+    """
+
+    TYPE = "histogram"
+
+    __slots__ = ("name", "help", "labels", "buckets", "counts", "sum")
+
+    def __init__(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS, labels: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initializes a `Histogram` instance.
+
+        :param name: name of the metric, should end with the unit, e.g., "_seconds"
+        :param help: description of the metric
+        :param buckets: sorted upper bounds of the buckets, the bucket "+Inf" is added
+        :param labels: label names mapped to their values (Optional)
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self) -> List[str]:
+        samples = []
+        cumulative_count = 0
+        for upper_bound, count in zip([*map(repr, self.buckets), "+Inf"], self.counts):
+            cumulative_count += count
+            labels = _format_labels({**self.labels, "le": upper_bound})
+            samples.append(f"{self.name}_bucket{labels} {cumulative_count}")
+        labels = _format_labels(self.labels)
+        samples.append(f"{self.name}_sum{labels} {self.sum}")
+        samples.append(f"{self.name}_count{labels} {cumulative_count}")
+        return samples
+
+
+class Registry:
+    """
+    This class collects metrics and renders them in the Prometheus text exposition format.
+    Metrics that share a name, e.g., the same counter with different labels, are rendered as one family.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """
+        Adds the metric and returns it.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns the current values of all metrics.
+        """
+        families: Dict[str, List] = {}
+        for metric in self._metrics:
+            families.setdefault(metric.name, []).append(metric)
+        lines = []
+        for name, metrics in families.items():
+            lines.append(f"# HELP {name} {metrics[0].help}")
+            lines.append(f"# TYPE {name} {metrics[0].TYPE}")
+            for metric in metrics:
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,74 @@
+import asyncio
+from collections import namedtuple
+
+
+Ramp = namedtuple("Ramp", ["start_volume", "volume", "start_time", "seconds", "future"])
+
+
+class Crossfader:
+    """
+    This class changes the volume of media players gradually. All ramps are driven by one scheduler task, such that
+    the ramps of two players that start together stay in lockstep, e.g., when one track list fades out while the next
+    one fades in.
+    """
+
+    INTERVAL = 0.05
+
+    def __init__(self):
+        """
+        Initializes a `Crossfader` instance. The scheduler task only runs while there are ramps.
+        """
+        self._ramps = {}
+        self._task = None
+
+    def fade(self, player, volume: int, seconds: float) -> asyncio.Future:
+        """
+        Changes the volume of the player linearly from its current volume to `volume` within `seconds`. A ramp that
+        is already running for the player is replaced. Returns a future that is resolved once the volume is reached.
+
+        :param player: the `vlc.MediaPlayer` instance
+        :param volume: the target volume, a value between 0 (mute) and 100 (max)
+        :param seconds: the duration of the ramp
+        """
+        loop = asyncio.get_event_loop()
+        self.stop(player)
+        start_volume = max(player.audio_get_volume(), 0)  # -1 if the player has no audio output yet
+        future = loop.create_future()
+        self._ramps[player] = Ramp(start_volume, volume, loop.time(), seconds, future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return future
+
+    def stop(self, player):
+        """
+        Stops the ramp of the player at its current volume, if there is one, and resolves its future.
+        """
+        ramp = self._ramps.pop(player, None)
+        if ramp is not None and not ramp.future.done():
+            ramp.future.set_result(None)
+
+    def is_fading(self, player) -> bool:
+        """
+        Returns whether the volume of the player is being changed.
+        """
+        return player in self._ramps
+
+    async def _run(self):
+        """
+        Sets the volume of every player with a ramp each `INTERVAL` until all ramps are finished. A ramp whose future
+        is cancelled, e.g., because the task that waited for it was cancelled, is dropped.
+        """
+        loop = asyncio.get_event_loop()
+        while self._ramps:
+            now = loop.time()
+            for player, ramp in list(self._ramps.items()):
+                if ramp.future.done():
+                    del self._ramps[player]
+                    continue
+                progress = min((now - ramp.start_time) / ramp.seconds, 1) if ramp.seconds > 0 else 1
+                player.audio_set_volume(round(ramp.start_volume + (ramp.volume - ramp.start_volume) * progress))
+                if progress == 1:
+                    del self._ramps[player]
+                    ramp.future.set_result(None)
+            if self._ramps:
+                await asyncio.sleep(self.INTERVAL)
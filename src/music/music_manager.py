@@ -1,29 +1,46 @@
 import asyncio
+import functools
 import logging
 from collections import namedtuple
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterator, List, Optional
 
-import vlc
 from aiohttp.web_request import Request
 
+from src.lazy_import import lazy_import
 from src.music import utils
+from src.music.crossfader import Crossfader
 from src.music.music_actions import MusicActions
 from src.music.music_callback_handler import MusicCallbackHandler
 from src.music.music_callback_info import MusicCallbackInfo
 from src.music.music_checker import MusicChecker
 from src.music.music_group import MusicGroup
+from src.music.player_events import PlayerEvents
+from src.music.stream_resolver import get_stream_resolver
 from src.music.track import Track
 from src.music.track_list import TrackList
+from src.tasks import cancel_and_wait
 
 
+vlc = lazy_import("vlc")
+
 logger = logging.getLogger(__name__)
 
 CurrentlyPlaying = namedtuple("CurrentlyPlaying", ["group_index", "track_list_index", "task"])
+PreparedTrack = namedtuple("PreparedTrack", ["track", "player", "media", "events"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_vlc_instance():
+    """
+    Returns the libvlc instance that is shared by every `MusicManager` of the process. It is created on first use,
+    since initializing libvlc takes long.
+    """
+    return vlc.Instance("--novideo")
 
 
 class MusicManager:
 
-    SLEEP_TIME = 0.01
+    CANCEL_TIMEOUT = 5  # the track list fades out when it is cancelled
     VALID_YOUTUBE_TRACKS_CACHE = "valid_youtube_tracks.json"
 
     def __init__(self, config: Dict, callback_fn: Callable[[MusicActions, Request, MusicCallbackInfo], None] = None):
@@ -34,6 +51,8 @@ class MusicManager:
         - "volume": an integer between 0 (mute) and 100 (max)
         - "directory": the default directory to use if no directory is further specified (Optional)
         - "sort": whether to sort the groups alphabetically (Optional, default=True)
+        - "crossfade": seconds to crossfade from one track list to the next, 0 fades out the track list before the
+          next one fades in (Optional, default=0)
         - "groups": a list of configs for `MusicGroup` instances. See `MusicGroup` class for more information
 
         The `callback_fn` is an async function that should accept the following arguments:
@@ -46,12 +65,20 @@ class MusicManager:
         """
         self.volume = int(config["volume"])
         self.directory = config["directory"] if "directory" in config else None
+        self.crossfade = float(config["crossfade"]) if "crossfade" in config else 0
         groups = [MusicGroup(group_config) for group_config in config["groups"]]
         if "sort" not in config or ("sort" in config and config["sort"]):
             groups = sorted(groups, key=lambda x: x.name)
         self.groups = tuple(groups)
         self._currently_playing = None
         self._current_player = None
+        self._current_track = None
+        self._players = []
+        self._preloading = None  # the track that is preloaded and the task that prepares it
+        self._outgoing_tracks = []  # tracks of the previous track list that fade out once the next one is ready
+        self._fading_tracks = []
+        self._crossfader = Crossfader()
+        self.stream_resolver = get_stream_resolver()
         self.callback_handler = MusicCallbackHandler(callback_fn=callback_fn)
         MusicChecker().do_all_checks(self.groups, self.directory)
 
@@ -60,6 +87,7 @@ class MusicManager:
             attrs_are_the_same = (
                 self.volume == other.volume
                 and self.directory == other.directory
+                and self.crossfade == other.crossfade
                 and self._currently_playing == other._currently_playing
             )
             if not attrs_are_the_same:
@@ -88,30 +116,40 @@ class MusicManager:
             )
         return MusicCallbackInfo(None, None, None, None, self.volume, None)
 
-    async def cancel(self):
+    async def cancel(self) -> bool:
         """
-        If a track is currently being played, the replay will be cancelled.
+        If a track is currently being played, the replay will be cancelled. Waits until the track list finished
+        cancelling, at most `CANCEL_TIMEOUT` seconds. Returns `False` if the track list is stuck and was abandoned.
         """
-        if self._currently_playing is not None:
-            self._currently_playing.task.cancel()
-            while self._currently_playing is not None:  # wait till track list finishes cancelling
-                await asyncio.sleep(self.SLEEP_TIME)
+        if self._currently_playing is None:
+            return True
+        track_list = self.currently_playing.track_list_name
+        return await cancel_and_wait(self._currently_playing.task, self.CANCEL_TIMEOUT, f"track list '{track_list}'")
 
     async def play_track_list(self, request, group_index, track_list_index):
         """
         Creates an asynchronous task to play the track list at the given index.
-        If a track list is already being played, it will be cancelled and the new track list will be played.
+        If a track list is already being played, it will be cancelled and the new track list will be played. If the
+        new track list crossfades, the track that is playing keeps playing until the new track list starts and then
+        fades out while the new one fades in.
+
+        Returns the created task, e.g., to wait until the track list finished.
         """
         logger.debug(f"Received request to play music from group {group_index} at index " f"{track_list_index}")
-        await self.cancel()
+        track_list = self.groups[group_index].track_lists[track_list_index]
+        outgoing_tracks = self._take_playing_tracks() if self._get_crossfade(track_list) > 0 else []
+        if not await self.cancel():
+            # The stuck track list no longer owns its tracks, they are stopped such that they do not play along
+            for prepared_track in self._take_playing_tracks():
+                self._release_track(prepared_track)
+            self._discard_preloaded_track()
+        self._outgoing_tracks = outgoing_tracks
         loop = asyncio.get_event_loop()
-        self._currently_playing = CurrentlyPlaying(
-            group_index,
-            track_list_index,
-            loop.create_task(self._play_track_list(request, group_index, track_list_index)),
-        )
+        task = loop.create_task(self._play_track_list(request, group_index, track_list_index))
+        self._currently_playing = CurrentlyPlaying(group_index, track_list_index, task)
         logger.debug(f"Created a task to play music from group {group_index} at index " f"{track_list_index}")
-        await asyncio.sleep(self.SLEEP_TIME)  # Return to the event loop that will start the task
+        await asyncio.sleep(0)  # Return to the event loop that will start the task
+        return task
 
     async def _play_track_list(self, request, group_index, track_list_index):
         """
@@ -123,11 +161,12 @@ class MusicManager:
         try:
             logger.info(f"Loading '{track_list.name}'")
             await self.callback_handler(action=MusicActions.START, request=request, music_info=self.currently_playing)
-            while True:
-                for track in track_list.tracks:
-                    await self._play_track(group, track_list, track)
-                if not track_list.loop:
-                    break
+            tracks = self._get_track_order(track_list)
+            track = next(tracks, None)
+            while track is not None:
+                next_track = next(tracks, None)
+                await self._play_track(group, track_list, track, next_track)
+                track = next_track
             logger.info(f"Finished '{track_list.name}'")
             await self.callback_handler(action=MusicActions.FINISH, request=request, music_info=self.currently_playing)
         except asyncio.CancelledError:
@@ -136,51 +175,237 @@ class MusicManager:
             cancelled = True
             raise
         finally:
-            if self._current_player is not None:
-                self._current_player.stop()
-            self._currently_playing = None
-            self._current_player = None
-            if not cancelled and track_list.next is not None:
-                await self._play_next_track_list(request, track_list)
+            # A track list that was abandoned by `cancel()` because it got stuck may only finish after the next track
+            # list started, the state and the players belong to the next track list then
+            if self._currently_playing is not None and self._currently_playing.task is asyncio.current_task():
+                self._discard_preloaded_track()
+                self._fade_out_outgoing_tracks(self._get_crossfade(track_list))
+                if self._current_player is not None:
+                    self._current_player.stop()
+                self._currently_playing = None
+                self._current_player = None
+                if not cancelled and track_list.next is not None:
+                    await self._play_next_track_list(request, track_list)
+            else:
+                logger.warning(f"'{track_list.name}' finished after it was abandoned, leaving the music as it is")
+
+    @staticmethod
+    def _get_track_order(track_list: TrackList) -> Iterator[Track]:
+        """
+        Yields the tracks of the track list in the order they are played. A shuffled track list is shuffled once per
+        pass, the order of the next pass is decided as soon as its first track is preloaded.
+        """
+        while True:
+            tracks = track_list.tracks
+            if not tracks:
+                return
+            yield from tracks
+            if not track_list.loop:
+                return
+
+    async def _play_track(
+        self, group: MusicGroup, track_list: TrackList, track: Track, next_track: Optional[Track] = None
+    ):
+        """
+        Plays the given track from the given track list and group. Once it plays, the `next_track` is preloaded such
+        that it starts the moment this track ends. If the cached stream of a YouTube link fails to play, the link is
+        resolved again.
+        """
+        prepared_track = await self._take_preloaded_track(track)
+        if prepared_track is None:
+            prepared_track = await self._prepare_track(group, track_list, track)
+        fade_in = self._current_player is None  # a track that directly follows another one starts at full volume
+        self._current_player = prepared_track.player
+        self._current_track = prepared_track
+        try:
+            logger.info(f"Now Playing: {track.file}")
+            buffered = await prepared_track.events.wait_until_paused()
+            if not buffered and track.is_youtube_link and self.stream_resolver.invalidate(track.file):
+                logger.warning(f"Failed to play the cached stream of {track.file}, resolving it again")
+                self._current_track = None
+                self._release_track(prepared_track)
+                prepared_track = await self._prepare_track(group, track_list, track)
+                self._current_player = prepared_track.player
+                self._current_track = prepared_track
+                buffered = await prepared_track.events.wait_until_paused()
+            if not buffered:
+                logger.error(f"Failed to play {track.file}")
+                return
+            if fade_in:
+                self._current_player.set_pause(0)
+                await self._fade_in(track_list)
+            else:
+                await self._set_master_volume(self.volume, set_global=False, smooth=False)
+                self._current_player.set_pause(0)
+            if next_track is not None:
+                self._preload_track(group, track_list, next_track)
+            await self._wait_for_current_player_to_end(prepared_track.events, track)
+        finally:
+            if self._current_track is prepared_track:  # else it fades out, see `play_track_list()`
+                self._current_track = None
+                self._release_track(prepared_track)
+        logger.info(f"Finished playing: {track.file}")
 
-    async def _play_track(self, group: MusicGroup, track_list: TrackList, track: Track):
+    async def _prepare_track(self, group: MusicGroup, track_list: TrackList, track: Track) -> PreparedTrack:
         """
-        Plays the given track from the given track list and group.
+        Resolves the path of the track and opens it paused on a player that is not playing the current track, such
+        that it is buffered and starts without delay once it is unpaused.
+        Raises a `CancelledError` if the track cannot be played.
         """
         try:
-            path = utils.get_track_path(group, track_list, track, default_dir=self.directory)
+            path = await self._get_track_path(group, track_list, track)
         except ValueError:
             logger.error(f"Failed to play '{track.file}'.")
             raise asyncio.CancelledError()
-        self._current_player = vlc.MediaPlayer(vlc.Instance("--novideo"), path)
-        self._current_player.audio_set_volume(0)
-        success = self._current_player.play()
-        if success == -1:
+        player = self._get_idle_player()
+        options = ["start-paused"]
+        if track.start_at is not None:
+            options.append(f"start-time={track.start_at / 1000}")
+        media = get_vlc_instance().media_new(path, *options)
+        player.set_media(media)
+        player.audio_set_volume(0)
+        prepared_track = PreparedTrack(track, player, media, PlayerEvents(player))
+        if player.play() == -1:
             logger.error(f"Failed to play {path}")
+            self._release_track(prepared_track)
             raise asyncio.CancelledError
-        if track.start_at is not None:
-            self._current_player.set_time(track.start_at)
-        logger.info(f"Now Playing: {track.file}")
-        await self._wait_for_current_player_to_be_playing()
-        await self._set_master_volume(self.volume, set_global=False)
-        while self._current_player.is_playing():
-            try:
-                if track.end_at is not None and self._current_player.get_time() >= track.end_at:
-                    self._current_player.stop()
-                await asyncio.sleep(self.SLEEP_TIME)
-            except asyncio.CancelledError:
-                logger.debug(f"Received cancellation request for {track.file}")
-                await self._set_master_volume(0, set_global=False)
-                raise
-        logger.info(f"Finished playing: {track.file}")
+        return prepared_track
 
-    async def _wait_for_current_player_to_be_playing(self):
+    async def _get_track_path(self, group: MusicGroup, track_list: TrackList, track: Track) -> str:
         """
-        Waits until the `current_player` is playing.
+        Returns the path of the track that VLC can play. A YouTube link is resolved by the `stream_resolver` without
+        blocking the event loop. Raises a `ValueError` if the track cannot be found.
         """
-        if self._current_player is not None:
-            while not self._current_player.is_playing():
-                await asyncio.sleep(self.SLEEP_TIME)
+        if track.is_youtube_link:
+            return await self.stream_resolver.resolve(track.file)
+        return utils.get_track_path(group, track_list, track, default_dir=self.directory)
+
+    def _get_idle_player(self):
+        """
+        Returns a media player that is not in use. The players take turns, one plays the current track while the
+        other one preloads the next track. Players of the previous track list are in use until they faded out.
+        """
+        busy_players = [self._current_player]
+        busy_players.extend(prepared_track.player for prepared_track in self._outgoing_tracks + self._fading_tracks)
+        for player in self._players:
+            if player not in busy_players:
+                return player
+        player = get_vlc_instance().media_player_new()
+        self._players.append(player)
+        return player
+
+    def _preload_track(self, group: MusicGroup, track_list: TrackList, track: Track):
+        """
+        Starts to prepare the track in the background, see `_prepare_track()`.
+        """
+        self._discard_preloaded_track()
+        self._preloading = (track, asyncio.ensure_future(self._prepare_track(group, track_list, track)))
+
+    async def _take_preloaded_track(self, track: Track) -> Optional[PreparedTrack]:
+        """
+        Returns the prepared track if the track was preloaded, else `None`. Waits if it is still being prepared.
+        """
+        if self._preloading is None or self._preloading[0] is not track:
+            self._discard_preloaded_track()
+            return None
+        _, task = self._preloading
+        self._preloading = None
+        return await task
+
+    def _discard_preloaded_track(self):
+        """
+        Cancels the preloading of a track or releases the track if it was prepared already.
+        """
+        if self._preloading is None:
+            return
+        _, task = self._preloading
+        self._preloading = None
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled() and task.exception() is None:
+            self._release_track(task.result())
+
+    @staticmethod
+    def _release_track(prepared_track: PreparedTrack):
+        """
+        Detaches from the events of the player, stops it and releases the media of the track.
+        """
+        prepared_track.events.detach()
+        prepared_track.player.stop()
+        prepared_track.player.set_media(None)
+        prepared_track.media.release()
+
+    def _get_crossfade(self, track_list: TrackList) -> float:
+        """
+        Returns the seconds to crossfade to the track list, the track list may override the global setting.
+        """
+        return track_list.crossfade if track_list.crossfade is not None else self.crossfade
+
+    def _take_playing_tracks(self) -> List[PreparedTrack]:
+        """
+        Takes the current track and the tracks that wait to fade out away from the track list that plays, such that
+        they keep playing when it is cancelled. Returns the tracks.
+        """
+        playing_tracks, self._outgoing_tracks = self._outgoing_tracks, []
+        if self._current_track is not None:
+            playing_tracks.append(self._current_track)
+            self._current_track = None
+            self._current_player = None
+        return playing_tracks
+
+    async def _fade_in(self, track_list: TrackList):
+        """
+        Fades in the current player. If the track list crossfades, the tracks of the previous track list fade out at
+        the same time, otherwise the player fades in with `_set_master_volume()`.
+        """
+        crossfade = self._get_crossfade(track_list)
+        if crossfade <= 0:
+            await self._set_master_volume(self.volume, set_global=False)
+            return
+        self._fade_out_outgoing_tracks(crossfade)
+        await self._crossfader.fade(self._current_player, (self.volume * track_list.volume) // 100, crossfade)
+
+    def _fade_out_outgoing_tracks(self, seconds: float):
+        """
+        Fades out the tracks of the previous track list and releases them once they are silent.
+        """
+        for prepared_track in self._outgoing_tracks:
+            self._fading_tracks.append(prepared_track)
+            fade_out = self._crossfader.fade(prepared_track.player, 0, seconds)
+            fade_out.add_done_callback(functools.partial(self._on_faded_out, prepared_track))
+        self._outgoing_tracks = []
+
+    def _on_faded_out(self, prepared_track: PreparedTrack, future: asyncio.Future):
+        self._fading_tracks.remove(prepared_track)
+        self._release_track(prepared_track)
+
+    async def _wait_for_current_player_to_end(self, player_events: PlayerEvents, track: Track):
+        """
+        Waits until the `current_player` reached the end of the track, the `end_at` of the track or failed.
+        If the wait is cancelled, the volume is set to zero before the cancellation is re-raised.
+        """
+        stop_handle = None
+        if track.end_at is not None:
+            delay = max(track.end_at - self._current_player.get_time(), 0) / 1000
+            stop_handle = asyncio.get_event_loop().call_later(delay, self._current_player.stop)
+        try:
+            if not await player_events.wait_until_ended():
+                logger.error(f"Failed while playing {track.file}")
+        except asyncio.CancelledError:
+            logger.debug(f"Received cancellation request for {track.file}")
+            await self._set_master_volume(0, set_global=False)
+            raise
+        finally:
+            if stop_handle is not None:
+                stop_handle.cancel()
+
+    async def refresh_streams(self):
+        """
+        Keeps the cached streams of the YouTube tracks valid, such that a track that was played before starts without
+        waiting on the extraction. Runs until cancelled, see `StreamResolver.refresh_periodically()`.
+        """
+        youtube_urls = {track.file for _, _, track in utils.music_tuple_generator(self.groups) if track.is_youtube_link}
+        await self.stream_resolver.refresh_periodically(youtube_urls)
 
     async def _play_next_track_list(self, request, current_track_list: TrackList):
         """
@@ -222,6 +447,7 @@ class MusicManager:
         :param seconds: the time in which the transitions takes place
         """
         if self._current_player is not None:
+            self._crossfader.stop(self._current_player)  # the new volume takes precedence over a fade in
             track_list = self.groups[self._currently_playing.group_index].track_lists[
                 self.currently_playing.track_list_index
             ]
@@ -258,6 +484,7 @@ class MusicManager:
             and self._currently_playing.track_list_index == track_list_index
         ):
             new_volume = (self.volume * track_list.volume) // 100
+            self._crossfader.stop(self._current_player)
             self._current_player.audio_set_volume(new_volume)
         await self.callback_handler(
             action=MusicActions.TRACK_LIST_VOLUME,
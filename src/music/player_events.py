@@ -0,0 +1,92 @@
+import asyncio
+
+from src.lazy_import import lazy_import
+
+
+vlc = lazy_import("vlc")
+
+
+class PlayerEvents:
+    """
+    This class bridges the events of a VLC media player into asyncio, such that waiting for a track to start or to end
+    costs nothing while it plays. VLC calls the callbacks from its own thread, so they are handed to the event loop
+    with `call_soon_threadsafe`.
+    """
+
+    def __init__(self, player, loop: asyncio.AbstractEventLoop = None):
+        """
+        Initializes a `PlayerEvents` instance and attaches it to the events of the player. Has to be created before
+        the player is started to not miss any event.
+
+        :param player: the `vlc.MediaPlayer` instance
+        :param loop: the event loop to resolve the futures in, defaults to the current event loop
+        """
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        self.playing = self._loop.create_future()
+        self.paused = self._loop.create_future()
+        self.ended = self._loop.create_future()
+        self._event_manager = player.event_manager()
+        self._callbacks = (
+            (vlc.EventType.MediaPlayerPlaying, self._on_playing),
+            (vlc.EventType.MediaPlayerPaused, self._on_paused),
+            (vlc.EventType.MediaPlayerEndReached, self._on_ended),
+            (vlc.EventType.MediaPlayerStopped, self._on_ended),
+            (vlc.EventType.MediaPlayerEncounteredError, self._on_error),
+        )
+        for event_type, callback in self._callbacks:
+            self._event_manager.event_attach(event_type, callback)
+
+    async def wait_until_playing(self) -> bool:
+        """
+        Waits until the player is playing. Returns `False` if it ended or failed before.
+        """
+        return await self.playing
+
+    async def wait_until_paused(self) -> bool:
+        """
+        Waits until the player is paused, e.g., a media with the option "start-paused" is buffered and ready to start.
+        Returns `False` if it ended or failed before.
+        """
+        return await self.paused
+
+    async def wait_until_ended(self) -> bool:
+        """
+        Waits until the player reached the end of the track or was stopped. Returns `False` if the player failed.
+        """
+        return await self.ended
+
+    def detach(self):
+        """
+        Detaches from the events of the player. Futures that are not done yet are cancelled.
+        """
+        for event_type, _ in self._callbacks:
+            self._event_manager.event_detach(event_type)
+        self.playing.cancel()
+        self.paused.cancel()
+        self.ended.cancel()
+
+    def _on_playing(self, event):
+        self._loop.call_soon_threadsafe(self._resolve, self.playing, True)
+
+    def _on_paused(self, event):
+        self._loop.call_soon_threadsafe(self._resolve, self.paused, True)
+
+    def _on_ended(self, event):
+        self._loop.call_soon_threadsafe(self._resolve_end, True)
+
+    def _on_error(self, event):
+        self._loop.call_soon_threadsafe(self._resolve_end, False)
+
+    def _resolve_end(self, success: bool):
+        """
+        Resolves the wait for the end with `success`. A player that ended will not start anymore, so the waits for the
+        start are resolved with `False` unless they are done.
+        """
+        self._resolve(self.playing, False)
+        self._resolve(self.paused, False)
+        self._resolve(self.ended, success)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: bool):
+        if not future.done():
+            future.set_result(result)
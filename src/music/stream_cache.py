@@ -0,0 +1,100 @@
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src import cache
+from src.metrics import Counter
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_expiry(stream_url: str, default_ttl: float) -> float:
+    """
+    Returns the time at which the URL of a stream expires. The URLs of YouTube streams carry it as `expire` parameter,
+    either in the query or as path segment. Falls back to `default_ttl` seconds from now.
+    """
+    match = re.search(r"[?&/]expire[=/](\d+)", stream_url)
+    if match is None:
+        return time.time() + default_ttl
+    return float(match.group(1))
+
+
+class StreamCache:
+    """
+    This class caches the URLs of the audio streams of YouTube links on disk, such that a track that was played before
+    starts without waiting on the extraction, also after a restart. The URLs expire after a few hours, so every entry
+    keeps its expiry and is not used shortly before it lapses. The least recently used entries are dropped first.
+    """
+
+    FILENAME = "youtube_streams.json"
+    MAX_ENTRIES = 50
+    DEFAULT_TTL = 60 * 60  # seconds, for a URL without `expire` parameter
+    EXPIRY_MARGIN = 10 * 60  # seconds, a stream that lapses sooner could lapse while it plays
+
+    def __init__(self, filename: str = FILENAME):
+        """
+        Initializes a `StreamCache` instance. The entries are loaded from the file in the cache directory on first use.
+
+        :param filename: the name of the file in the cache directory
+        """
+        self.filename = filename
+        self._entries: Optional[Dict[str, Dict]] = None
+        self.hits = Counter("dndj_stream_cache_hits_total", "Lookups of YouTube streams served from the cache.")
+        self.misses = Counter(
+            "dndj_stream_cache_misses_total", "Lookups of YouTube streams that were missing or lapsed in the cache."
+        )
+
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        """
+        Returns the entries as mapping from the YouTube link to the "url" of its stream and when it "expires_at",
+        ordered from the least to the most recently used.
+        """
+        if self._entries is None:
+            try:
+                self._entries = cache.load_dict(self.filename)
+            except ValueError:
+                logger.warning(f"Ignoring the corrupt cache of YouTube streams '{self.filename}'")
+                self._entries = {}
+        return self._entries
+
+    def get(self, youtube_url: str) -> Optional[str]:
+        """
+        Returns the URL of the stream of the YouTube link, or `None` if there is none that is valid long enough.
+        """
+        entry = self.entries.get(youtube_url)
+        if entry is None or entry["expires_at"] - time.time() < self.EXPIRY_MARGIN:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        self.entries[youtube_url] = self.entries.pop(youtube_url)  # most recently used
+        return entry["url"]
+
+    def put(self, youtube_url: str, stream_url: str):
+        """
+        Stores the URL of the stream of the YouTube link and saves the cache.
+        """
+        self.entries.pop(youtube_url, None)
+        self.entries[youtube_url] = {"url": stream_url, "expires_at": get_expiry(stream_url, self.DEFAULT_TTL)}
+        for least_recently_used in list(self.entries)[: -self.MAX_ENTRIES]:
+            del self.entries[least_recently_used]
+        cache.save_dict(self.entries, self.filename)
+
+    def invalidate(self, youtube_url: str) -> bool:
+        """
+        Removes the stream of the YouTube link, e.g., because it failed to play. Returns whether there was one.
+        """
+        if self.entries.pop(youtube_url, None) is None:
+            return False
+        cache.save_dict(self.entries, self.filename)
+        return True
+
+    def get_lapsing(self, youtube_urls: Iterable[str], within: float) -> List[str]:
+        """
+        Returns the YouTube links among `youtube_urls` that have a stream in the cache which lapses within `within`
+        seconds or already lapsed.
+        """
+        lapse_at = time.time() + within
+        return [url for url in youtube_urls if url in self.entries and self.entries[url]["expires_at"] < lapse_at]
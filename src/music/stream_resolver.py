@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+
+from src.music import utils
+from src.music.stream_cache import StreamCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class StreamResolver:
+    """
+    This class resolves YouTube links to the URLs of their audio streams in a pool of worker threads, such that the
+    event loop keeps serving websockets and sounds while `pafy` extracts a stream. Concurrent requests for the same
+    link share one lookup. The resolved streams are kept in a `StreamCache` on disk.
+    """
+
+    MAX_WORKERS = 4
+    REFRESH_INTERVAL = 5 * 60  # seconds
+    REFRESH_MARGIN = 30 * 60  # seconds, streams that lapse sooner are resolved again in the background
+
+    def __init__(
+        self, resolve_fn: Callable[[str], str] = None, max_workers: int = None, stream_cache: StreamCache = None
+    ):
+        """
+        Initializes a `StreamResolver` instance. The worker threads are started on first use.
+
+        :param resolve_fn: the blocking function that returns the stream URL of a link, defaults to
+            `utils.get_audio_stream()`
+        :param max_workers: the maximum number of concurrent lookups, defaults to `MAX_WORKERS`
+        :param stream_cache: the `StreamCache` to use, defaults to one in the cache directory
+        """
+        self.stream_cache = stream_cache if stream_cache is not None else StreamCache()
+        self._resolve_fn = resolve_fn if resolve_fn is not None else utils.get_audio_stream
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers if max_workers is not None else self.MAX_WORKERS,
+            thread_name_prefix="stream-resolver",
+        )
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def resolve(self, youtube_url: str) -> str:
+        """
+        Returns the URL of the audio stream of the YouTube link. Returns the cached stream if it is valid long enough,
+        else joins the lookup for the link or starts one.
+
+        Cancelling the call only cancels the caller, other callers still get the result of the lookup. If no caller
+        waits for the lookup anymore, it is dropped if it did not start yet. A lookup that runs cannot be interrupted,
+        but its result is cached for the next time.
+        """
+        stream_url = self.stream_cache.get(youtube_url)
+        if stream_url is not None:
+            return stream_url
+        future = self._start_lookup(youtube_url)
+        self._waiters[youtube_url] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if not future.done():  # the caller was cancelled
+                self._waiters[youtube_url] -= 1
+                if self._waiters[youtube_url] == 0:
+                    logger.debug(f"Dropping the lookup of {youtube_url}, nobody waits for it")
+                    future.cancel()
+
+    def invalidate(self, youtube_url: str) -> bool:
+        """
+        Removes the cached stream of the YouTube link, e.g., because it failed to play, such that the next call of
+        `resolve()` looks it up again. Returns whether there was a cached stream.
+        """
+        return self.stream_cache.invalidate(youtube_url)
+
+    def refresh(self, youtube_urls: Iterable[str]):
+        """
+        Starts a lookup in the background for every YouTube link among `youtube_urls` whose cached stream lapses within
+        `REFRESH_MARGIN` seconds.
+        """
+        for youtube_url in self.stream_cache.get_lapsing(youtube_urls, self.REFRESH_MARGIN):
+            logger.debug(f"Refreshing the stream of {youtube_url}")
+            self._start_lookup(youtube_url)
+
+    async def refresh_periodically(self, youtube_urls: Iterable[str]):
+        """
+        Refreshes the cached streams of the YouTube links every `REFRESH_INTERVAL` seconds, starting right away, such
+        that the streams of tracks that were played before are valid when they are played again. Runs until cancelled.
+        """
+        youtube_urls = list(youtube_urls)
+        while True:
+            self.refresh(youtube_urls)
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+
+    def _start_lookup(self, youtube_url: str) -> asyncio.Future:
+        """
+        Returns the lookup for the YouTube link, it is started if there is none.
+        """
+        future = self._in_flight.get(youtube_url)
+        if future is None:
+            future = asyncio.get_event_loop().run_in_executor(self._executor, self._resolve_fn, youtube_url)
+            future.add_done_callback(functools.partial(self._on_done, youtube_url))
+            self._in_flight[youtube_url] = future
+            self._waiters[youtube_url] = 0
+        return future
+
+    def _on_done(self, youtube_url: str, future: asyncio.Future):
+        """
+        Removes the finished lookup, such that the next call starts a new one or hits the cache, and caches its result.
+        """
+        n_waiters = 0
+        if self._in_flight.get(youtube_url) is future:
+            del self._in_flight[youtube_url]
+            n_waiters = self._waiters.pop(youtube_url)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            if n_waiters == 0:  # else it is raised to the callers
+                logger.warning(f"Failed to refresh the stream of {youtube_url}: {future.exception()}")
+            return
+        self.stream_cache.put(youtube_url, future.result())
+
+
+@functools.lru_cache(maxsize=None)
+def get_stream_resolver() -> StreamResolver:
+    """
+    Returns the `StreamResolver` that is shared by every `MusicManager` of the process. The sessions thereby share the
+    cached streams in one file and the lookups of the links they have in common. Its worker threads run as long as
+    the process.
+    """
+    return StreamResolver()
@@ -16,6 +16,8 @@ class TrackList:
         - "loop": bool indicating whether to loop once all tracks have been played (Optional, default=True)
         - "shuffle": bool indicating whether to shuffle the tracks (Optional, default=True)
         - "next": name of the track list to play after this one finishes (Optional)
+        - "crossfade": seconds to crossfade from the previous track list to this one, overrides the "crossfade" of the
+          music config (Optional)
         - "tracks": a list of track configs. See `Track` class for more information.
 
         :param config: `dict`
@@ -26,6 +28,7 @@ class TrackList:
         self.loop = config["loop"] if "loop" in config else True
         self.shuffle = config["shuffle"] if "shuffle" in config else True
         self.next = config["next"] if "next" in config else None
+        self.crossfade = float(config["crossfade"]) if "crossfade" in config else None
         tracks = [Track(track_config) for track_config in config["tracks"]]
         self._tracks = tuple(tracks)  # immutable
 
@@ -48,6 +51,7 @@ class TrackList:
                 and self.shuffle == other.shuffle
                 and self.volume == other.volume
                 and self.next == other.next
+                and self.crossfade == other.crossfade
             )
             if not attrs_are_the_same:
                 return False
@@ -1,15 +1,15 @@
 import logging
 import os
-from functools import lru_cache
 from typing import Generator, Iterable, Tuple
 
-import pafy
-
+from src.lazy_import import ensure_loaded, lazy_import
 from src.music.music_group import MusicGroup
 from src.music.track import Track
 from src.music.track_list import TrackList
 
 
+pafy = lazy_import("pafy")  # imports 'youtube-dl', which takes long
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,12 +24,12 @@ def music_tuple_generator(groups: Iterable[MusicGroup]) -> Generator[Tuple[Music
                 yield (group, track_list, track)
 
 
-@lru_cache(maxsize=50)
 def get_audio_stream(youtube_url: str):
     """
-    Returns the url to the audio stream of the given url corresponding to a YouTube video.
+    Returns the url to the audio stream of the given url corresponding to a YouTube video. Every call extracts the
+    stream anew, use a `StreamResolver` to cache it. Safe to call from several threads at once.
     """
-    youtube_video = pafy.new(youtube_url)
+    youtube_video = ensure_loaded(pafy).new(youtube_url)
     best_audio_stream = youtube_video.getbestaudio()
     return best_audio_stream.url
 
@@ -1,19 +1,35 @@
+import asyncio
+import functools
 import json
 import logging
 import pathlib
+import time
 import uuid
-from typing import Optional
+from collections import namedtuple
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 import aiohttp
 import aiohttp_jinja2
 import jinja2
 import yaml
-from aiohttp import web
+from aiohttp import hdrs, web
 from aiohttp.web_request import Request
 
+from src import assets
 from src.loader import CustomLoader
+from src.metrics import Counter, Gauge, Histogram, Registry
 from src.music import MusicActions, MusicCallbackInfo, MusicManager
 from src.sound import SoundActions, SoundCallbackInfo, SoundManager
+from src.websocket import (
+    ActionHandler,
+    Broadcaster,
+    EventLog,
+    MessageCoalescer,
+    MessageDispatcher,
+    OverflowPolicy,
+    binary_protocol,
+)
 
 
 logging.basicConfig(
@@ -23,9 +39,82 @@ logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = pathlib.Path(__file__).parent
 
+# The metrics that are updated for every message or event, preallocated such that updating them is cheap
+ServerMetrics = namedtuple(
+    "ServerMetrics", ["registry", "messages", "messages_dropped", "message_duration", "broadcast_duration"]
+)
+
+# The `Batch` that is being executed, the tasks a batch starts inherit it, see `Server._batch()`
+current_batch = ContextVar("current_batch", default=None)
+
+
+class Batch:
+    """
+    Collects the messages of the events that a batch causes, including those of the tasks it starts, until it is
+    closed. The messages are stamped with their versions when the batch is closed, such that the versions increase in
+    the order in which the events are sent, also if other events are sent while the batch is being executed.
+    """
+
+    def __init__(self):
+        self.messages: List[Dict] = []
+        self.is_open = True
+
+
+def add_static_routes(app: web.Application, manifest: Optional[Dict[str, str]]):
+    """
+    Serves the static files under "/static/" and, if the assets were built (see `assets.load_manifest`), the built
+    assets under "/static/dist/".
+    """
+    if manifest is not None:
+        app.router.add_static("/static/dist/", path=assets.DIST_DIRECTORY, name="dist")
+    app.router.add_static("/static/", path=PROJECT_ROOT / "static", name="static")
+    app.on_response_prepare.append(_add_cache_headers)
+
+
+async def _add_cache_headers(request, response):
+    """
+    Lets browsers cache the built assets forever. Their filenames change whenever their content changes.
+    """
+    if request.path.startswith("/static/dist/") and response.status == 200:
+        response.headers[hdrs.CACHE_CONTROL] = "public, max-age=31536000, immutable"
+
 
 class Server:
-    def __init__(self, config_path, host, port):
+
+    SEND_TIMEOUT = 5
+    EVENT_LOG_SIZE = 256
+    MAX_BATCH_SIZE = 64
+    UNBATCHABLE_ACTIONS = ("batch", "sync")
+
+    def __init__(
+        self,
+        config_path,
+        host,
+        port,
+        max_client_queue_size=100,
+        slow_client_policy: OverflowPolicy = OverflowPolicy.RESYNC,
+        coalesce_window=0.1,
+        heartbeat: Optional[float] = 30.0,
+        idle_timeout: Optional[float] = 90.0,
+        compression: bool = False,
+        compression_threshold: int = 32,
+    ):
+        """
+        Initializes a `Server` instance.
+
+        :param config_path: path to the YAML config file
+        :param host: the host
+        :param port: the port
+        :param max_client_queue_size: number of messages that may wait to be sent to a single client
+        :param slow_client_policy: what to do with a client whose queue is full
+        :param coalesce_window: seconds in which bursts of volume and repeat commands are applied at most once
+        :param heartbeat: seconds between pings, the pongs of a live client keep it from becoming idle (`None` to
+            disable)
+        :param idle_timeout: seconds without any message or pong after which a client is disconnected, should be well
+            above the heartbeat (`None` to disable)
+        :param compression: whether to compress the websocket messages (permessage-deflate) for clients that support it
+        :param compression_threshold: messages shorter than this many characters or bytes are not compressed
+        """
         with open(config_path) as config_file:
             config = yaml.load(config_file, Loader=CustomLoader)
         self.music = MusicManager(config["music"], callback_fn=self.on_music_changes)
@@ -33,40 +122,101 @@ class Server:
         self.app = None
         self.host = host
         self.port = port
+        self.max_client_queue_size = max_client_queue_size
+        self.slow_client_policy = slow_client_policy
+        self.coalesce_window = coalesce_window
+        self.heartbeat = heartbeat
+        self.idle_timeout = idle_timeout
+        self.compression = compression
+        self.compression_threshold = compression_threshold
 
-    def start(self):
+    def start(self, on_startup: Iterable[Callable[[web.Application], Awaitable[None]]] = ()):
         """
         Starts the web server.
+
+        :param on_startup: further coroutine functions that are called with the app when it starts
         """
-        self.app = self._init_app()
+        self.app = self._init_app(on_startup=on_startup)
         logger.info(f"Server started on http://{self.host}:{self.port}")
         web.run_app(self.app, host=self.host, port=self.port)
 
-    async def _init_app(self):
+    async def _init_app(
+        self, serve_static: bool = True, on_startup: Iterable[Callable[[web.Application], Awaitable[None]]] = ()
+    ):
         """
         Initializes the web application.
+
+        :param serve_static: whether to serve the static files, disable it if the app is a sub application of an app
+            that already serves them (see `SessionRouter`)
+        :param on_startup: further coroutine functions that are called with the app when it starts
         """
         app = web.Application()
-        app["websockets"] = {}
+        app["broadcaster"] = Broadcaster(
+            send_timeout=self.SEND_TIMEOUT,
+            max_queue_size=self.max_client_queue_size,
+            overflow_policy=self.slow_client_policy,
+            compress_threshold=self.compression_threshold,
+        )
+        app["event_log"] = EventLog(max_size=self.EVENT_LOG_SIZE)
+        app["page_cache"] = {}
+        app["assets"] = assets.load_manifest(assets.DIST_DIRECTORY)
+        app["coalescer"] = MessageCoalescer(window=self.coalesce_window)
+        app["dispatcher"] = self._create_dispatcher(app["coalescer"])
+        app["metrics"] = self._create_metrics(app)
+        app.on_startup.append(self._start_app)
+        app.on_startup.extend(on_startup)
         app.on_shutdown.append(self._shutdown_app)
         aiohttp_jinja2.setup(app, loader=jinja2.PackageLoader("src", "templates"))
         app.router.add_get("/", self.index)
-        app.router.add_static("/static/", path=PROJECT_ROOT / "static", name="static")
+        app.router.add_get("/status", self.status)
+        app.router.add_get("/metrics", self.metrics)
+        if serve_static:
+            add_static_routes(app, app["assets"])
         return app
 
+    async def _start_app(self, app):
+        """
+        Called when the app starts. Starts the background tasks.
+        """
+        app["stream_refresher"] = asyncio.ensure_future(self.music.refresh_streams())
+
     async def _shutdown_app(self, app):
         """
         Called when the app shut downs. Perform clean-up.
         """
-        for ws in app["websockets"].values():
-            await ws.close()
-        app["websockets"].clear()
+        app["stream_refresher"].cancel()
+        app["coalescer"].close()
+        await app["broadcaster"].close()
 
     def _get_page(self, request):
         """
         Returns the index page.
+
+        The rendered page only changes with the state version of the event log, so it is rendered once per version and
+        cached. The version doubles as ETag, a client that already has the current page receives `304 Not Modified`.
+        """
+        event_log = request.app["event_log"]
+        etag = f'"{event_log.epoch}-{event_log.version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = {tag.strip() for tag in request.headers.get(hdrs.IF_NONE_MATCH, "").split(",")}
+        if etag in if_none_match or f"W/{etag}" in if_none_match or "*" in if_none_match:
+            return web.Response(status=304, headers=headers)
+        page_cache = request.app["page_cache"]
+        body = page_cache.get(etag)
+        if body is None:
+            body = self._render_page(request).encode()
+            page_cache.clear()  # only the current version is ever served
+            page_cache[etag] = body
+        return web.Response(body=body, content_type="text/html", headers=headers)
+
+    def _render_page(self, request) -> str:
+        """
+        Renders the index page.
         """
         context = {
+            "assets": request.app["assets"],
+            "epoch": request.app["event_log"].epoch,
+            "version": request.app["event_log"].version,
             "music": {
                 "volume": self.music.volume,
                 "currently_playing": self.music.currently_playing,
@@ -81,86 +231,201 @@ class Server:
                 ],
             },
         }
-        return aiohttp_jinja2.render_template("index.html", request, context)
+        return aiohttp_jinja2.render_string("index.html", request, context)
 
     async def index(self, request):
         """
         Handles the client connection.
         """
-        ws_current = web.WebSocketResponse()
+        ws_current = web.WebSocketResponse(
+            protocols=(binary_protocol.SUBPROTOCOL,),
+            heartbeat=self.heartbeat,
+            receive_timeout=self.idle_timeout,
+            compress=self.compression,
+        )
         ws_ready = ws_current.can_prepare(request)
         if not ws_ready.ok:
             return self._get_page(request)
         await ws_current.prepare(request)
 
         ws_identifier = str(uuid.uuid4())
-        request.app["websockets"][ws_identifier] = ws_current
-        logger.info(f"Client {ws_identifier} connected.")
+        binary = ws_current.ws_protocol == binary_protocol.SUBPROTOCOL
+        request["ws_identifier"] = ws_identifier
+        broadcaster = request.app["broadcaster"]
+        message_duration = request.app["metrics"].message_duration
+        broadcaster.register(ws_identifier, ws_current, binary=binary)
+        logger.info(
+            f"Client {ws_identifier} connected{' (binary protocol)' if binary else ''}"
+            f"{' (compressed)' if ws_current.compress else ''}, {broadcaster.client_count} clients connected."
+        )
         try:
             while True:
                 msg = await ws_current.receive()
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
+                    break
+                if msg.type == aiohttp.WSMsgType.ERROR:
+                    logger.info(f"Client {ws_identifier} failed: {ws_current.exception()!r}")
+                    break
+                start = time.perf_counter()
                 await self._handle_message(request, msg)
-        except RuntimeError:
-            logger.info(f"Client {ws_identifier} disconnected.")
-            del request.app["websockets"][ws_identifier]
-            return ws_current
+                message_duration.observe(time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            logger.info(f"Client {ws_identifier} was idle for too long.")
+        except RuntimeError:  # the connection was lost, e.g., no pong was received in time
+            pass
+        finally:
+            broadcaster.unregister(ws_identifier)
+        await ws_current.close()
+        logger.info(f"Client {ws_identifier} disconnected, {broadcaster.client_count} clients connected.")
+        return ws_current
+
+    async def status(self, request):
+        """
+        Returns the number of connected clients and the state version as JSON.
+        """
+        return web.json_response(
+            {"clients": request.app["broadcaster"].client_count, "version": request.app["event_log"].version}
+        )
+
+    async def metrics(self, request):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        return web.Response(
+            text=request.app["metrics"].registry.render(), headers={hdrs.CONTENT_TYPE: Registry.CONTENT_TYPE}
+        )
+
+    def _create_metrics(self, app) -> ServerMetrics:
+        """
+        Returns the metrics of the application. The gauges are read when the metrics are requested.
+        """
+        registry = Registry()
+        messages = {
+            action: registry.register(
+                Counter("dndj_websocket_messages_total", "Handled websocket messages by action.", {"action": action})
+            )
+            for action in app["dispatcher"].actions
+        }
+        messages_dropped = registry.register(
+            Counter("dndj_websocket_messages_dropped_total", "Websocket messages that were malformed or invalid.")
+        )
+        message_duration = registry.register(
+            Histogram("dndj_message_handling_seconds", "Seconds spent handling a websocket message.")
+        )
+        broadcast_duration = registry.register(
+            Histogram("dndj_broadcast_seconds", "Seconds spent encoding and queueing a broadcast event.")
+        )
+        registry.register(self.sound.play_latency)
+        registry.register(self.music.stream_resolver.stream_cache.hits)
+        registry.register(self.music.stream_resolver.stream_cache.misses)
+        registry.register(
+            Gauge("dndj_websocket_clients", "Connected websocket clients.", lambda: app["broadcaster"].client_count)
+        )
+        registry.register(
+            Gauge("dndj_active_sounds", "Sounds that are being played.", lambda: len(self.sound.tracker.sound_to_task))
+        )
+        return ServerMetrics(registry, messages, messages_dropped, message_duration, broadcast_duration)
+
+    def _create_dispatcher(self, coalescer: MessageCoalescer) -> MessageDispatcher:
+        """
+        Returns a `MessageDispatcher` with a handler for every action a client can request.
+        """
+        dispatcher = MessageDispatcher(coalescer=coalescer)
+        dispatcher.register(
+            "playMusic",
+            self._play_music,
+            fields=(("groupIndex", int), ("trackListIndex", int)),
+            validator=self._is_valid_track_list,
+        )
+        dispatcher.register("stopMusic", self._stop_music)
+        dispatcher.register(
+            "setMusicMasterVolume", self._set_music_master_volume, fields=(("volume", int),), coalesce_by=()
+        )
+        dispatcher.register(
+            "setTrackListVolume",
+            self._set_track_list_volume,
+            fields=(("groupIndex", int), ("trackListIndex", int), ("volume", int)),
+            validator=lambda group_index, track_list_index, _: self._is_valid_track_list(group_index, track_list_index),
+            coalesce_by=("groupIndex", "trackListIndex"),
+        )
+        dispatcher.register(
+            "playSound",
+            self._play_sound,
+            fields=(("groupIndex", int), ("soundIndex", int)),
+            validator=self._is_valid_sound,
+        )
+        dispatcher.register(
+            "stopSound",
+            self._stop_sound,
+            fields=(("groupIndex", int), ("soundIndex", int)),
+            validator=self._is_valid_sound,
+        )
+        dispatcher.register(
+            "setSoundMasterVolume", self._set_sound_master_volume, fields=(("volume", float),), coalesce_by=()
+        )
+        for action, handler, field in [
+            ("setSoundVolume", self._set_sound_volume, ("volume", float)),
+            ("setSoundRepeatCount", self._set_sound_repeat_count, ("repeatCount", int)),
+            ("setSoundRepeatDelay", self._set_sound_repeat_delay, ("repeatDelay", str)),
+        ]:
+            dispatcher.register(
+                action,
+                handler,
+                fields=(("groupIndex", int), ("soundIndex", int), field),
+                validator=lambda group_index, sound_index, _: self._is_valid_sound(group_index, sound_index),
+                coalesce_by=("groupIndex", "soundIndex"),
+            )
+        dispatcher.register("sync", self._sync, fields=(("epoch", str), ("version", int)))
+        dispatcher.register(
+            "batch", self._batch, fields=(("commands", functools.partial(self._parse_batch, dispatcher)),)
+        )
+        return dispatcher
+
+    def _is_valid_track_list(self, group_index: int, track_list_index: int) -> bool:
+        """
+        Returns whether the indices point to an existing track list.
+        """
+        return 0 <= group_index < len(self.music.groups) and 0 <= track_list_index < len(
+            self.music.groups[group_index].track_lists
+        )
+
+    def _is_valid_sound(self, group_index: int, sound_index: int) -> bool:
+        """
+        Returns whether the indices point to an existing sound.
+        """
+        return 0 <= group_index < len(self.sound.groups) and 0 <= sound_index < len(
+            self.sound.groups[group_index].sounds
+        )
 
     async def _handle_message(self, request, msg):
-        if msg.type != aiohttp.WSMsgType.text:
+        """
+        Parses the message and passes it to the dispatcher. Malformed messages are dropped.
+
+        Text messages are JSON, binary messages use the binary protocol (see `binary_protocol`).
+        """
+        metrics = request.app["metrics"]
+        if msg.type == aiohttp.WSMsgType.text:
+            try:
+                data_dict = json.loads(msg.data)
+            except ValueError:
+                logger.debug("Dropped message that is not valid JSON.")
+                metrics.messages_dropped.inc()
+                return
+        elif msg.type == aiohttp.WSMsgType.binary:
+            try:
+                data_dict = binary_protocol.decode(msg.data)
+            except ValueError as ex:
+                logger.debug(f"Dropped binary message: {ex}")
+                metrics.messages_dropped.inc()
+                return
+        else:
             return
-        data_dict = json.loads(msg.data)
-        if "action" not in data_dict:
+        handling = request.app["dispatcher"].dispatch(request, data_dict) if isinstance(data_dict, dict) else None
+        if handling is None:
+            metrics.messages_dropped.inc()
             return
-        action = data_dict["action"]
-        if action == "playMusic":
-            if "groupIndex" in data_dict and "trackListIndex" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                track_list_index = int(data_dict["trackListIndex"])
-                await self._play_music(request, group_index, track_list_index)
-        elif action == "stopMusic":
-            await self._stop_music()
-        elif action == "setMusicMasterVolume":
-            if "volume" in data_dict:
-                volume = int(data_dict["volume"])
-                await self._set_music_master_volume(request, volume)
-        elif action == "setTrackListVolume":
-            if "groupIndex" in data_dict and "trackListIndex" in data_dict and "volume" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                track_list_index = int(data_dict["trackListIndex"])
-                volume = int(data_dict["volume"])
-                await self._set_track_list_volume(request, group_index, track_list_index, volume)
-        elif action == "playSound":
-            if "groupIndex" in data_dict and "soundIndex" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                sound_index = int(data_dict["soundIndex"])
-                await self._play_sound(request, group_index, sound_index)
-        elif action == "stopSound":
-            if "groupIndex" in data_dict and "soundIndex" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                sound_index = int(data_dict["soundIndex"])
-                await self._stop_sound(group_index, sound_index)
-        elif action == "setSoundMasterVolume":
-            if "volume" in data_dict:
-                volume = float(data_dict["volume"])
-                await self._set_sound_master_volume(request, volume)
-        elif action == "setSoundVolume":
-            if "groupIndex" in data_dict and "soundIndex" in data_dict and "volume" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                sound_index = int(data_dict["soundIndex"])
-                volume = float(data_dict["volume"])
-                await self._set_sound_volume(request, group_index, sound_index, volume)
-        elif action == "setSoundRepeatCount":
-            if "groupIndex" in data_dict and "soundIndex" in data_dict and "repeatCount" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                sound_index = int(data_dict["soundIndex"])
-                repeat_count = int(data_dict["repeatCount"])
-                await self._set_sound_repeat_count(request, group_index, sound_index, repeat_count)
-        elif action == "setSoundRepeatDelay":
-            if "groupIndex" in data_dict and "soundIndex" in data_dict and "repeatDelay" in data_dict:
-                group_index = int(data_dict["groupIndex"])
-                sound_index = int(data_dict["soundIndex"])
-                repeat_delay = data_dict["repeatDelay"]
-                await self._set_sound_repeat_delay(request, group_index, sound_index, repeat_delay)
+        await handling
+        metrics.messages[data_dict["action"]].inc()
 
     async def _play_music(self, request, group_index, track_list_index):
         """
@@ -168,7 +433,7 @@ class Server:
         """
         await self.music.play_track_list(request, group_index, track_list_index)
 
-    async def _stop_music(self):
+    async def _stop_music(self, request):
         """
         Stops the music.
         """
@@ -192,7 +457,7 @@ class Server:
         """
         await self.sound.play_sound(request, group_index, sound_index)
 
-    async def _stop_sound(self, group_index, sound_index):
+    async def _stop_sound(self, request, group_index, sound_index):
         """
         Stops the sound.
         """
@@ -222,6 +487,109 @@ class Server:
         """
         await self.sound.set_sound_repeat_delay(request, group_index, sound_index, repeat_delay)
 
+    def _parse_batch(self, dispatcher: MessageDispatcher, commands) -> List[Tuple[ActionHandler, Tuple]]:
+        """
+        Parses the commands of a batch with the dispatcher. Raises a `ValueError` if any of them would be dropped, so
+        a batch is either executed as a whole or not at all.
+        """
+        if not isinstance(commands, list) or not 0 < len(commands) <= self.MAX_BATCH_SIZE:
+            raise ValueError(f"A batch must be a list of 1 to {self.MAX_BATCH_SIZE} commands.")
+        parsed_commands = []
+        for command in commands:
+            parsed = dispatcher.parse(command) if isinstance(command, dict) else None
+            if parsed is None or parsed[0].action in self.UNBATCHABLE_ACTIONS:
+                raise ValueError(f"Invalid command in batch: {command!r}")
+            parsed_commands.append(parsed)
+        return parsed_commands
+
+    async def _batch(self, request, commands: List[Tuple[ActionHandler, Tuple]]):
+        """
+        Executes the commands of a batch in order, except that the sounds are started together after the other
+        commands. Commands are not coalesced. The resulting events are sent as one "batch" message, events that other
+        requests cause meanwhile are sent on their own.
+        """
+        batch = Batch()
+        token = current_batch.set(batch)
+        try:
+            sounds = []
+            for action_handler, values in commands:
+                if action_handler.action == "playSound":
+                    sounds.append(values)
+                else:
+                    await action_handler.handler(request, *values)
+            if sounds:
+                await self.sound.play_sounds(request, sounds)
+        finally:
+            current_batch.reset(token)
+            batch.is_open = False
+            if batch.messages:  # also if a command failed, the clients must learn about the changes of the others
+                start = time.perf_counter()
+                events = [request.app["event_log"].append(message) for message in batch.messages]
+                request.app["broadcaster"].broadcast(
+                    {"action": "batch", "events": events, "version": events[-1]["version"]}
+                )
+                request.app["metrics"].broadcast_duration.observe(time.perf_counter() - start)
+
+    async def _sync(self, request, epoch, version):
+        """
+        Sends the events the client missed since the given version. Sends a snapshot of the current state instead if
+        the events are no longer available.
+        """
+        broadcaster = request.app["broadcaster"]
+        missed_events = request.app["event_log"].since(epoch, version)
+        if missed_events is None:
+            logger.debug(f"Sending snapshot to client {request['ws_identifier']}")
+            broadcaster.send(request["ws_identifier"], self._get_snapshot(request.app["event_log"]))
+            return
+        for event in missed_events:
+            broadcaster.send(request["ws_identifier"], event)
+
+    def _get_snapshot(self, event_log: EventLog):
+        """
+        Returns the compact state of the music and sound at the current version of the event log.
+        """
+        currently_playing = self.music.currently_playing
+        now_playing = None
+        if currently_playing.group_index is not None:
+            now_playing = [
+                currently_playing.group_index,
+                currently_playing.track_list_index,
+                currently_playing.group_name,
+                currently_playing.track_list_name,
+            ]
+        return {
+            "action": "snapshot",
+            "epoch": event_log.epoch,
+            "version": event_log.version,
+            "musicVolume": self.music.volume,
+            "nowPlaying": now_playing,
+            "trackListVolumes": [
+                [track_list.volume for track_list in group.track_lists] for group in self.music.groups
+            ],
+            "soundVolume": self.sound.volume,
+            "sounds": [
+                [[sound.volume, sound.repeat_count, sound.repeat_delay_config] for sound in group.sounds]
+                for group in self.sound.groups
+            ],
+            "soundsPlaying": [
+                [sound_info.group_index, sound_info.sound_index] for sound_info in self.sound.currently_playing
+            ],
+        }
+
+    def _broadcast_event(self, request, message):
+        """
+        Stamps the message with the next version, keeps it in the event log and sends it to all connected web sockets.
+        If the event is caused by a batch that is being executed, it is sent with the other events of the batch instead.
+        """
+        batch = current_batch.get()
+        if batch is not None and batch.is_open:
+            batch.messages.append(message)
+            return
+        event = request.app["event_log"].append(message)
+        start = time.perf_counter()
+        request.app["broadcaster"].broadcast(event)
+        request.app["metrics"].broadcast_duration.observe(time.perf_counter() - start)
+
     async def on_music_changes(self, action: MusicActions, request: Request, music_info: MusicCallbackInfo):
         """
         Callback function used by the `MusicManager` at `self.music`.
@@ -230,39 +598,36 @@ class Server:
         """
         if action == MusicActions.START:
             logger.debug("Music Callback: Start")
-            for ws in request.app["websockets"].values():
-                await ws.send_json(
-                    {
-                        "action": "nowPlaying",
-                        "groupIndex": music_info.group_index,
-                        "trackListIndex": music_info.track_list_index,
-                        "groupName": music_info.group_name,
-                        "trackName": music_info.track_list_name,
-                    }
-                )
+            self._broadcast_event(
+                request,
+                {
+                    "action": "nowPlaying",
+                    "groupIndex": music_info.group_index,
+                    "trackListIndex": music_info.track_list_index,
+                    "groupName": music_info.group_name,
+                    "trackName": music_info.track_list_name,
+                },
+            )
         elif action == MusicActions.STOP:
             logger.debug("Music Callback: Stop")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "musicStopped"})
+            self._broadcast_event(request, {"action": "musicStopped"})
         elif action == MusicActions.FINISH:
             logger.debug("Music Callback: Finish")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "musicFinished"})
+            self._broadcast_event(request, {"action": "musicFinished"})
         elif action == MusicActions.MASTER_VOLUME:
             logger.debug("Music Callback: Master Volume")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "setMusicMasterVolume", "volume": music_info.master_volume})
+            self._broadcast_event(request, {"action": "setMusicMasterVolume", "volume": music_info.master_volume})
         elif action == MusicActions.TRACK_LIST_VOLUME:
             logger.debug("Music Callback: Track List Volume")
-            for ws in request.app["websockets"].values():
-                await ws.send_json(
-                    {
-                        "action": "setTrackListVolume",
-                        "groupIndex": music_info.group_index,
-                        "trackListIndex": music_info.track_list_index,
-                        "volume": music_info.track_list_volume,
-                    }
-                )
+            self._broadcast_event(
+                request,
+                {
+                    "action": "setTrackListVolume",
+                    "groupIndex": music_info.group_index,
+                    "trackListIndex": music_info.track_list_index,
+                    "volume": music_info.track_list_volume,
+                },
+            )
 
     async def on_sound_changes(
         self, action: SoundActions, request: Request, sound_info: Optional[SoundCallbackInfo], master_volume: float
@@ -286,29 +651,22 @@ class Server:
             sound_info_dict = {}
         if action == SoundActions.START:
             logger.debug("Sound Callback: Start")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "soundPlaying", **sound_info_dict})
+            self._broadcast_event(request, {"action": "soundPlaying", **sound_info_dict})
         elif action == SoundActions.STOP:
             logger.debug("Sound Callback: Stop")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "soundStopped", **sound_info_dict})
+            self._broadcast_event(request, {"action": "soundStopped", **sound_info_dict})
         elif action == SoundActions.FINISH:
             logger.debug("Sound Callback: Finish")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "soundFinished", **sound_info_dict})
+            self._broadcast_event(request, {"action": "soundFinished", **sound_info_dict})
         elif action == SoundActions.MASTER_VOLUME:
             logger.debug("Sound Callback: Master Volume")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "setSoundMasterVolume", "volume": master_volume})
+            self._broadcast_event(request, {"action": "setSoundMasterVolume", "volume": master_volume})
         elif action == SoundActions.VOLUME:
             logger.debug("Sound Callback: Volume")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "setSoundVolume", **sound_info_dict})
+            self._broadcast_event(request, {"action": "setSoundVolume", **sound_info_dict})
         elif action == SoundActions.REPEAT_COUNT:
             logger.debug("Sound Callback: Repeat Count")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "setSoundRepeatCount", **sound_info_dict})
+            self._broadcast_event(request, {"action": "setSoundRepeatCount", **sound_info_dict})
         elif action == SoundActions.REPEAT_DELAY:
             logger.debug("Sound Callback: Repeat Delay")
-            for ws in request.app["websockets"].values():
-                await ws.send_json({"action": "setSoundRepeatDelay", **sound_info_dict})
+            self._broadcast_event(request, {"action": "setSoundRepeatDelay", **sound_info_dict})
@@ -0,0 +1,91 @@
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Iterable
+
+import aiohttp_jinja2
+import jinja2
+from aiohttp import web
+
+from src import assets
+from src.server import Server, add_static_routes
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRouter:
+    """
+    This class hosts several campaigns in one process, e.g., one for every table of a shop. Every session is a
+    `Server` that is served as sub application under "/s/<name>/" with its own clients, broadcasts and state.
+
+    The sessions share the process and thereby the audio backends and the checks of the files they have in common.
+    """
+
+    PREFIX = "/s"
+    NAME_REGEX = re.compile(r"^[A-Za-z0-9_-]+$")
+
+    def __init__(self, servers: Dict[str, Server], host, port):
+        """
+        Initializes a `SessionRouter` instance.
+
+        :param servers: the server of every session by the name that is used in its URL
+        :param host: the host
+        :param port: the port
+        """
+        for name in servers:
+            if not self.NAME_REGEX.match(name):
+                raise ValueError(f"Invalid session name '{name}', only letters, digits, '-' and '_' are allowed.")
+        self.servers = servers
+        self.app = None
+        self.host = host
+        self.port = port
+
+    def start(self, on_startup: Iterable[Callable[[web.Application], Awaitable[None]]] = ()):
+        """
+        Starts the web server.
+
+        :param on_startup: further coroutine functions that are called with the app when it starts
+        """
+        self.app = self._init_app(on_startup=on_startup)
+        for name in self.servers:
+            logger.info(f"Session '{name}' started on http://{self.host}:{self.port}{self.PREFIX}/{name}/")
+        web.run_app(self.app, host=self.host, port=self.port)
+
+    async def _init_app(self, on_startup: Iterable[Callable[[web.Application], Awaitable[None]]] = ()):
+        """
+        Initializes the web application with a sub application for every session.
+
+        :param on_startup: further coroutine functions that are called with the app when it starts
+        """
+        app = web.Application()
+        app.on_startup.extend(on_startup)
+        aiohttp_jinja2.setup(app, loader=jinja2.PackageLoader("src", "templates"))
+        app.router.add_get("/", self.index)
+        for name in self.servers:
+            app.router.add_get(f"{self.PREFIX}/{name}", self._redirect_to_session)
+        # A sub application matches every path that starts with its prefix, e.g., "/s/table" also matches "/s/table-2/".
+        # The longer names are added first such that they are matched first.
+        for name in sorted(self.servers, key=len, reverse=True):
+            app.add_subapp(f"{self.PREFIX}/{name}/", await self.servers[name]._init_app(serve_static=False))
+        app["assets"] = assets.load_manifest(assets.DIST_DIRECTORY)
+        add_static_routes(app, app["assets"])
+        return app
+
+    async def index(self, request):
+        """
+        Lists the sessions.
+        """
+        context = {
+            "assets": request.app["assets"],
+            "sessions": [(name, f"{self.PREFIX}/{name}/") for name in sorted(self.servers)],
+        }
+        return aiohttp_jinja2.render_template("sessions.html", request, context)
+
+    async def _redirect_to_session(self, request):
+        """
+        Redirects to the path with a trailing slash that the sub application of the session is served under.
+        """
+        location = f"{request.path}/"
+        if request.query_string:
+            location += f"?{request.query_string}"
+        raise web.HTTPFound(location)
@@ -1,19 +1,43 @@
 import logging
 import os
-from typing import Iterable
+from typing import Dict, Iterable, Set, Tuple
 
-import pygame.mixer
-from pydub.utils import mediainfo
 from scripts.convert_file import convert_file
 
 from src import cache
+from src.lazy_import import lazy_import
 from src.sound import SoundGroup, utils
 
 
+pygame = lazy_import("pygame")
+
 logger = logging.getLogger(__name__)
 
 
+def mediainfo(file_path: str) -> Dict:
+    """
+    Returns the media info of the file. Imports `pydub` on first use.
+    """
+    from pydub import utils as pydub_utils
+
+    return pydub_utils.mediainfo(file_path)
+
+
+def _get_file_key(file_path: str) -> Tuple[str, int, int]:
+    """
+    Returns a key that changes whenever the file changes, i.e., its absolute path, size and modification time.
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
 class SoundChecker:
+
+    # The results of probing and decoding files are shared by all instances, such that campaigns that are hosted by
+    # the same process (see `SessionRouter`) check a file that they have in common only once
+    _media_info_cache: Dict[Tuple[str, int, int], Dict] = {}
+    _playable_files: Set[Tuple[str, int, int]] = set()
+
     def __init__(self, groups: Iterable[SoundGroup], default_dir):
         """
         Initializes a `SoundChecker` instance.
@@ -62,7 +86,7 @@ class SoundChecker:
         for group, sound, sound_file in utils.sound_tuple_generator(self.groups):
             root_directory = utils.get_sound_root_directory(group, sound, default_dir=self.default_dir)
             sound_file_path = os.path.join(root_directory, sound_file.file)
-            file_info = mediainfo(sound_file_path)
+            file_info = self._get_media_info(sound_file_path)
             if file_info["format_name"] == "wav" and file_info["sample_fmt"] != "s16":
                 file_hash = cache.get_file_hash(sound_file_path)
                 path_in_cache = os.path.join(cache.CONVERSION_CACHE_DIR, file_hash)
@@ -74,6 +98,15 @@ class SoundChecker:
                 sound_file.file = f"{path_in_cache}.wav"
         logger.info("Success! All .wav files should have compatible formats.")
 
+    def _get_media_info(self, file_path: str) -> Dict:
+        """
+        Returns the media info of the file, probing the file only if it changed since the last time.
+        """
+        file_key = _get_file_key(file_path)
+        if file_key not in self._media_info_cache:
+            self._media_info_cache[file_key] = mediainfo(file_path)
+        return self._media_info_cache[file_key]
+
     def check_sound_files_can_be_played(self):
         """
         Iterates through every sound file and attempts to create a player that uses this file. Logs any error and
@@ -83,8 +116,12 @@ class SoundChecker:
         for group, sound, sound_file in utils.sound_tuple_generator(self.groups):
             root_directory = utils.get_sound_root_directory(group, sound, default_dir=self.default_dir)
             sound_file_path = os.path.join(root_directory, sound_file.file)
+            file_key = _get_file_key(sound_file_path)
+            if file_key in self._playable_files:
+                continue
             try:
                 pygame.mixer.Sound(sound_file_path)
+                self._playable_files.add(file_key)
             except pygame.error:
                 logger.error(f"File {sound_file_path} cannot be played. Its format is unsupported.")
                 file_info = mediainfo(sound_file_path)
@@ -2,11 +2,13 @@ import asyncio
 import logging
 import os
 import random
-from typing import Callable, Dict, List
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
 
-import pygame.mixer
 from aiohttp.web_request import Request
 
+from src.lazy_import import lazy_import
+from src.metrics import Histogram
 from src.sound import utils
 from src.sound.sound_actions import SoundActions
 from src.sound.sound_callback_handler import SoundCallbackHandler
@@ -16,13 +18,12 @@ from src.sound.sound_group import SoundGroup
 from src.sound.sound_tracker import SoundTracker
 
 
+pygame = lazy_import("pygame")
+
 logger = logging.getLogger(__name__)
 
 
 class SoundManager:
-
-    SLEEP_TIME = 0.01
-
     def __init__(self, config: Dict, callback_fn: Callable = None):
         """
         Initializes a `SoundManager` instance.
@@ -52,6 +53,10 @@ class SoundManager:
         self.callback_handler = SoundCallbackHandler(callback_fn=callback_fn)
         self.tracker = SoundTracker()
         self.players = {}
+        self.play_latency = Histogram(
+            "dndj_sound_play_latency_seconds", "Seconds from the request to play a sound until its playback started."
+        )
+        self._play_requested_at: Dict[str, float] = {}
         SoundChecker(self.groups, self.directory).do_all_checks()
 
     def _get_player_key(self, group_index: int, sound_index: int):
@@ -93,11 +98,24 @@ class SoundManager:
         Creates an asynchronous task to play the sound from the given group at the given index.
         If the sound is already being played, it will be cancelled and restarted.
         """
-        await self.cancel_sound(group_index, sound_index)
+        await self.play_sounds(request, [(group_index, sound_index)])
+
+    async def play_sounds(self, request: Request, sounds: Iterable[Tuple[int, int]]):
+        """
+        Creates an asynchronous task for every sound given as `(group_index, sound_index)`. The tasks are created
+        together, so the sounds start in the same iteration of the event loop. Sounds that are already being played are
+        cancelled and restarted.
+        """
+        sounds = list(dict.fromkeys(sounds))  # every sound once, in order
+        requested_at = time.perf_counter()
+        for group_index, sound_index in sounds:
+            self._play_requested_at[self._get_player_key(group_index, sound_index)] = requested_at
+            await self.cancel_sound(group_index, sound_index)
         loop = asyncio.get_event_loop()
-        task = loop.create_task(self._play_repeating_sound(request, group_index, sound_index))
-        self.tracker.register_sound(group_index, sound_index, task)
-        await asyncio.sleep(self.SLEEP_TIME)  # Return to the event loop that will start the task
+        for group_index, sound_index in sounds:
+            task = loop.create_task(self._play_repeating_sound(request, group_index, sound_index))
+            self.tracker.register_sound(group_index, sound_index, task)
+        await asyncio.sleep(0)  # Return to the event loop that will start the tasks
 
     async def _play_repeating_sound(self, request: Request, group_index: int, sound_index: int):
         """
@@ -120,9 +138,11 @@ class SoundManager:
                 if delay == 0:
                     continue
                 await asyncio.sleep(delay / 1000.0)
+            self.tracker.unregister_sound(group_index, sound_index, asyncio.current_task())
             await self.callback_handler(SoundActions.FINISH, request, sound_info, self.volume)
             logger.info(f"Finished sound on repeat: {sound.name}")
         except asyncio.CancelledError:
+            self.tracker.unregister_sound(group_index, sound_index, asyncio.current_task())
             await self.callback_handler(SoundActions.STOP, request, sound_info, self.volume)
             logger.info(f"Cancelled sound on repeat: {sound.name}")
 
@@ -155,9 +175,11 @@ class SoundManager:
             pygame_sound.set_volume(self.volume * sound.volume)
             if sound_file.end_at is not None:
                 pygame_sound.play(maxtime=sound_file.end_at)
+                self._observe_play_latency(group_index, sound_index)
                 await asyncio.sleep(sound_file.end_at / 1000)
             else:
                 pygame_sound.play()
+                self._observe_play_latency(group_index, sound_index)
                 await asyncio.sleep(pygame_sound.get_length())
         except asyncio.CancelledError:
             if pygame_sound is not None:
@@ -165,6 +187,14 @@ class SoundManager:
                 del self.players[self._get_player_key(group_index, sound_index)]
                 raise
 
+    def _observe_play_latency(self, group_index: int, sound_index: int):
+        """
+        Records the time since `play_sound()` was called for the sound. Repetitions are not recorded.
+        """
+        requested_at = self._play_requested_at.pop(self._get_player_key(group_index, sound_index), None)
+        if requested_at is not None:
+            self.play_latency.observe(time.perf_counter() - requested_at)
+
     async def set_master_volume(self, request: Request, volume: float):
         """
         Sets the master volume for the sounds. If sounds are currently being played, the volume of the players
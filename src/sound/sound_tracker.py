@@ -4,6 +4,8 @@ import functools
 import logging
 from typing import Dict, List
 
+from src.tasks import cancel_and_wait
+
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,8 @@ class SoundTracker:
     This class tracks the `asyncio.Task` instances for playing sounds.
     """
 
+    CANCEL_TIMEOUT = 1
+
     def __init__(self):
         self.sound_to_task: Dict[str, asyncio.Task] = {}
 
@@ -49,9 +53,27 @@ class SoundTracker:
         key = self._get_sound_key(group_index, sound_index)
         if task.done():
             raise RuntimeError(f"Task for group={group_index}, sound={sound_index} is done, but was registered!")
-        task.add_done_callback(functools.partial(self._unregister_sound, group_index, sound_index))
+        task.add_done_callback(functools.partial(self._on_task_done, group_index, sound_index))
         self.sound_to_task[key] = task
 
+    def unregister_sound(self, group_index: int, sound_index: int, task: asyncio.Task):
+        """
+        Unregister the task before it is done, e.g., right before the sound reports that it finished, such that the
+        state that is sent along with the report no longer lists the sound. Does nothing if the task is not registered
+        for the given group_index and sound_index, e.g., because the sound was restarted.
+        """
+        key = self._get_sound_key(group_index, sound_index)
+        if self.sound_to_task.get(key) is task:
+            logger.debug(f"Unregistering finishing task for group={group_index}, sound={sound_index}")
+            del self.sound_to_task[key]
+
+    def _on_task_done(self, group_index: int, sound_index: int, task: asyncio.Task):
+        """
+        Unregister the task that is done, unless it was already unregistered with `unregister_sound()`.
+        """
+        if self.sound_to_task.get(self._get_sound_key(group_index, sound_index)) is task:
+            self._unregister_sound(group_index, sound_index, task)
+
     def _unregister_sound(self, group_index: int, sound_index: int, _):
         """
         Unregister the task that belongs to the given group_index and sound_index.
@@ -67,13 +89,12 @@ class SoundTracker:
 
     async def cancel_sound(self, group_index: int, sound_index: int):
         """
-        Cancels a task that has previously been registered for the given sound. Does nothing if there is no such task.
+        Cancels a task that has previously been registered for the given sound and waits until it is done, at most
+        `CANCEL_TIMEOUT` seconds. Does nothing if there is no such task.
         """
         logger.debug(f"Cancelling task for group={group_index}, sound={sound_index}")
         key = self._get_sound_key(group_index, sound_index)
         if key not in self.sound_to_task:
             return
         task = self.sound_to_task[key]
-        task.cancel()
-        while not task.done():
-            await asyncio.sleep(0.01)
+        await cancel_and_wait(task, self.CANCEL_TIMEOUT, f"group={group_index}, sound={sound_index}")
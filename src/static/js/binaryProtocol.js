@@ -0,0 +1,199 @@
+// The binary protocol, see `src/websocket/binary_protocol.py`.
+// Messages are msgpack arrays `[opcode, ...values]`, the opcode is the position of the action in the lists below.
+const BINARY_SUBPROTOCOL = "dndj.msgpack.v1";
+
+const _SOUND_INFO_FIELDS = [
+    "groupIndex", "soundIndex", "groupName", "soundName", "volume", "repeatCount", "repeatDelay", "version"
+];
+
+const BINARY_CLIENT_ACTIONS = [
+    ["playMusic", ["groupIndex", "trackListIndex"]],
+    ["stopMusic", []],
+    ["setMusicMasterVolume", ["volume"]],
+    ["setTrackListVolume", ["groupIndex", "trackListIndex", "volume"]],
+    ["playSound", ["groupIndex", "soundIndex"]],
+    ["stopSound", ["groupIndex", "soundIndex"]],
+    ["setSoundMasterVolume", ["volume"]],
+    ["setSoundVolume", ["groupIndex", "soundIndex", "volume"]],
+    ["setSoundRepeatCount", ["groupIndex", "soundIndex", "repeatCount"]],
+    ["setSoundRepeatDelay", ["groupIndex", "soundIndex", "repeatDelay"]],
+    ["sync", ["epoch", "version"]],
+    ["batch", ["commands"]],  // the commands are arrays `[opcode, ...values]` themselves
+];
+
+const BINARY_SERVER_ACTIONS = [
+    ["nowPlaying", ["groupIndex", "trackListIndex", "groupName", "trackName", "version"]],
+    ["musicStopped", ["version"]],
+    ["musicFinished", ["version"]],
+    ["setMusicMasterVolume", ["volume", "version"]],
+    ["setTrackListVolume", ["groupIndex", "trackListIndex", "volume", "version"]],
+    ["soundPlaying", _SOUND_INFO_FIELDS],
+    ["soundStopped", _SOUND_INFO_FIELDS],
+    ["soundFinished", _SOUND_INFO_FIELDS],
+    ["setSoundMasterVolume", ["volume", "version"]],
+    ["setSoundVolume", _SOUND_INFO_FIELDS],
+    ["setSoundRepeatCount", _SOUND_INFO_FIELDS],
+    ["setSoundRepeatDelay", _SOUND_INFO_FIELDS],
+    ["resync", []],
+    ["snapshot", [
+        "epoch", "version", "musicVolume", "nowPlaying", "trackListVolumes", "soundVolume", "sounds", "soundsPlaying"
+    ]],
+    ["batch", ["events", "version"]],  // the events are arrays `[opcode, ...values]` themselves
+];
+
+const _BINARY_CLIENT_OPCODES = {};
+BINARY_CLIENT_ACTIONS.forEach(function([action, fields], opcode) {
+    _BINARY_CLIENT_OPCODES[action] = [opcode, fields];
+});
+
+const _textDecoder = new TextDecoder();
+const _textEncoder = new TextEncoder();
+
+function encodeBinaryMessage(data) {
+    const parts = [];
+    _packValue(parts, _toBinaryArray(data));
+    return new Blob(parts);
+}
+
+function _toBinaryArray(data) {
+    const [opcode, fields] = _BINARY_CLIENT_OPCODES[data.action];
+    if (data.action === "batch") {
+        return [opcode, data.commands.map(_toBinaryArray)];
+    }
+    return [opcode].concat(fields.map(function(field) {
+        return data[field];
+    }));
+}
+
+function decodeBinaryMessage(buffer) {
+    return _fromBinaryArray(new _MsgpackReader(buffer).read());
+}
+
+function _fromBinaryArray(values) {
+    const [action, fields] = BINARY_SERVER_ACTIONS[values[0]];
+    const data = {"action": action};
+    for (let i = 0; i < fields.length; i++) {
+        data[fields[i]] = values[i + 1];
+    }
+    if (action === "batch") {
+        data.events = data.events.map(_fromBinaryArray);
+    }
+    return data;
+}
+
+function _packArrayHeader(parts, length) {
+    parts.push(length < 16 ? new Uint8Array([0x90 | length]) : new Uint8Array([0xdc, length >> 8, length & 0xff]));
+}
+
+function _packValue(parts, value) {
+    if (Array.isArray(value)) {
+        _packArrayHeader(parts, value.length);
+        value.forEach(function(item) {
+            _packValue(parts, item);
+        });
+    } else if (value === null || value === undefined) {
+        parts.push(new Uint8Array([0xc0]));
+    } else if (typeof value === "boolean") {
+        parts.push(new Uint8Array([value ? 0xc3 : 0xc2]));
+    } else if (typeof value === "number" && Number.isInteger(value) && value >= -32 && value < 128) {
+        parts.push(new Uint8Array([value & 0xff]));
+    } else if (typeof value === "number" && Number.isInteger(value) && Math.abs(value) < 0x80000000) {
+        const view = new DataView(new ArrayBuffer(5));
+        view.setUint8(0, 0xd2);
+        view.setInt32(1, value);
+        parts.push(view.buffer);
+    } else if (typeof value === "number") {
+        const view = new DataView(new ArrayBuffer(9));
+        view.setUint8(0, 0xcb);
+        view.setFloat64(1, value);
+        parts.push(view.buffer);
+    } else {
+        const bytes = _textEncoder.encode(String(value));
+        const view = new DataView(new ArrayBuffer(5));
+        view.setUint8(0, 0xdb);
+        view.setUint32(1, bytes.length);
+        parts.push(view.buffer, bytes);
+    }
+}
+
+class _MsgpackReader {
+    constructor(buffer) {
+        this.view = new DataView(buffer);
+        this.bytes = new Uint8Array(buffer);
+        this.offset = 0;
+    }
+
+    read() {
+        const view = this.view;
+        const type = view.getUint8(this.offset++);
+        if (type < 0x80) return type;
+        if (type < 0x90) return this._readMap(type & 0x0f);
+        if (type < 0xa0) return this._readArray(type & 0x0f);
+        if (type < 0xc0) return this._readString(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return this._readBytes(this._readUint(1));
+            case 0xc5: return this._readBytes(this._readUint(2));
+            case 0xc6: return this._readBytes(this._readUint(4));
+            case 0xca: return this._advance(4, view.getFloat32(this.offset));
+            case 0xcb: return this._advance(8, view.getFloat64(this.offset));
+            case 0xcc: return this._readUint(1);
+            case 0xcd: return this._readUint(2);
+            case 0xce: return this._readUint(4);
+            case 0xcf: return this._advance(8, view.getUint32(this.offset) * 0x100000000 + view.getUint32(this.offset + 4));
+            case 0xd0: return this._advance(1, view.getInt8(this.offset));
+            case 0xd1: return this._advance(2, view.getInt16(this.offset));
+            case 0xd2: return this._advance(4, view.getInt32(this.offset));
+            case 0xd3: return this._advance(8, view.getInt32(this.offset) * 0x100000000 + view.getUint32(this.offset + 4));
+            case 0xd9: return this._readString(this._readUint(1));
+            case 0xda: return this._readString(this._readUint(2));
+            case 0xdb: return this._readString(this._readUint(4));
+            case 0xdc: return this._readArray(this._readUint(2));
+            case 0xdd: return this._readArray(this._readUint(4));
+            case 0xde: return this._readMap(this._readUint(2));
+            case 0xdf: return this._readMap(this._readUint(4));
+            default: throw new Error("Unsupported msgpack type: " + type);
+        }
+    }
+
+    _advance(length, value) {
+        this.offset += length;
+        return value;
+    }
+
+    _readUint(length) {
+        let value = 0;
+        for (let i = 0; i < length; i++) {
+            value = value * 256 + this.bytes[this.offset++];
+        }
+        return value;
+    }
+
+    _readBytes(length) {
+        return this._advance(length, this.bytes.subarray(this.offset, this.offset + length));
+    }
+
+    _readString(length) {
+        return _textDecoder.decode(this._readBytes(length));
+    }
+
+    _readArray(length) {
+        const array = new Array(length);
+        for (let i = 0; i < length; i++) {
+            array[i] = this.read();
+        }
+        return array;
+    }
+
+    _readMap(length) {
+        const map = {};
+        for (let i = 0; i < length; i++) {
+            const key = this.read();
+            map[key] = this.read();
+        }
+        return map;
+    }
+}
@@ -8,7 +8,7 @@ function sendCmdPlayMusic(groupIndex, trackListIndex) {
         "groupIndex": groupIndex,
         "trackListIndex": trackListIndex,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 
@@ -20,7 +20,7 @@ function sendCmdStopMusic() {
     const toSend = {
         "action": "stopMusic",
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetMusicMasterVolume(volume) {
@@ -32,7 +32,7 @@ function sendCmdSetMusicMasterVolume(volume) {
         "action": "setMusicMasterVolume",
         "volume": volume,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetTrackListVolume(groupIndex, trackListIndex, volume) {
@@ -46,5 +46,5 @@ function sendCmdSetTrackListVolume(groupIndex, trackListIndex, volume) {
         "trackListIndex": trackListIndex,
         "volume": volume,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
@@ -8,7 +8,7 @@ function sendCmdPlaySound(groupIndex, soundIndex) {
         "groupIndex": groupIndex,
         "soundIndex": soundIndex,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdStopSound(groupIndex, soundIndex) {
@@ -21,7 +21,7 @@ function sendCmdStopSound(groupIndex, soundIndex) {
         "groupIndex": groupIndex,
         "soundIndex": soundIndex,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetSoundMasterVolume(volume) {
@@ -33,7 +33,7 @@ function sendCmdSetSoundMasterVolume(volume) {
         "action": "setSoundMasterVolume",
         "volume": volume,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetSoundVolume(groupIndex, soundIndex, volume) {
@@ -47,7 +47,7 @@ function sendCmdSetSoundVolume(groupIndex, soundIndex, volume) {
         "soundIndex": soundIndex,
         "volume": volume,
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetSoundRepeatCount(groupIndex, soundIndex) {
@@ -61,7 +61,7 @@ function sendCmdSetSoundRepeatCount(groupIndex, soundIndex) {
         "soundIndex": soundIndex,
         "repeatCount": selectSoundRepeatCountInput(groupIndex, soundIndex).val(),
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
 
 function sendCmdSetSoundRepeatDelay(groupIndex, soundIndex) {
@@ -75,5 +75,5 @@ function sendCmdSetSoundRepeatDelay(groupIndex, soundIndex) {
         "soundIndex": soundIndex,
         "repeatDelay": selectSoundRepeatDelayInput(groupIndex, soundIndex).val(),
     };
-    conn.send(JSON.stringify(toSend));
+    sendMessage(toSend);
 }
@@ -1,5 +1,18 @@
 let conn = null;
+// The state version of the page, see `EventLog` in `src/websocket/event_log.py`
+let stateEpoch = null;
+let stateVersion = 0;
+const MIN_RECONNECT_DELAY = 500;
+const MAX_RECONNECT_DELAY = 10000;
+let reconnectDelay = MIN_RECONNECT_DELAY;
+let reconnectTimeout = null;
+
 $(document).ready(function() {
+    stateEpoch = $("body").attr("data-epoch");
+    if (stateEpoch === undefined) {
+        return;  // not a page of a campaign, e.g., the list of sessions
+    }
+    stateVersion = parseInt($("body").attr("data-version"));
     if (conn == null) {
         connect();
     } else {
@@ -8,76 +21,125 @@ $(document).ready(function() {
 });
 
 
+function useBinaryProtocol() {
+    // Opt in with `?protocol=msgpack` and out with `?protocol=json`, the choice is remembered on this device
+    const requested = new URLSearchParams(window.location.search).get("protocol");
+    if (requested !== null) {
+        localStorage.setItem("protocol", requested);
+    }
+    return localStorage.getItem("protocol") === "msgpack";
+}
+
 function connect() {
     disconnect();
-    const wsUri = (window.location.protocol==='https:'&&'wss://'||'ws://')+window.location.host;
-    conn = new WebSocket(wsUri);
+    // The path of the page, sessions of a server with several campaigns are served under their own prefix
+    const wsUri = (window.location.protocol==='https:'&&'wss://'||'ws://')+window.location.host+window.location.pathname;
+    conn = useBinaryProtocol() ? new WebSocket(wsUri, [BINARY_SUBPROTOCOL]) : new WebSocket(wsUri);
+    conn.binaryType = "arraybuffer";
     conn.onopen = function() {
-        console.log("Connected");
+        console.log("Connected" + (conn.protocol === BINARY_SUBPROTOCOL ? " (binary protocol)" : ""));
+        reconnectDelay = MIN_RECONNECT_DELAY;
+        sendSync();
     };
     conn.onmessage = function(e) {
-        const data = JSON.parse(e.data);
-        switch (data.action) {
-            case "nowPlaying": {
-                _handleNowPlaying(data);
-                break;
-            }
-            case "musicStopped": {
-                _handleMusicStopped(data);
-                break;
-            }
-            case "musicFinished": {
-                _handleMusicFinished(data);
-                break;
-            }
-            case "setMusicMasterVolume": {
-                _handleSetMusicMasterVolume(data);
-                break;
-            }
-            case "setTrackListVolume": {
-                _handleSetTrackListVolume(data);
-                break;
-            }
-            case "setSoundMasterVolume": {
-                _handleSetSoundMasterVolume(data);
-                break;
-            }
-            case "setSoundVolume": {
-                _handleSetSoundVolume(data);
-                break;
-            }
-            case "soundPlaying": {
-                _handleSoundPlaying(data);
-                break;
-            }
-            case "soundStopped": {
-                _handleSoundStopped(data);
-                break;
-            }
-            case "soundFinished": {
-                _handleSoundFinished(data);
-                break;
-            }
-            case "setSoundRepeatCount": {
-                _handleSetSoundRepeatCount(data);
-                break;
-            }
-            case "setSoundRepeatDelay": {
-                _handleSetSoundRepeatDelay(data);
-                break;
-            }
-            default:
-                console.log("Received unknown action: " + data.action);
+        const data = typeof e.data === "string" ? JSON.parse(e.data) : decodeBinaryMessage(e.data);
+        if (data.version !== undefined) {
+            stateVersion = data.version;
         }
+        _handleMessage(data);
     };
     conn.onclose = function() {
-        console.log("Disconnected");
+        console.log("Disconnected, reconnecting in " + reconnectDelay + " ms");
         conn = null;
+        reconnectTimeout = setTimeout(connect, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY);
     };
 }
 
+function _handleMessage(data) {
+    switch (data.action) {
+        case "nowPlaying": {
+            _handleNowPlaying(data);
+            break;
+        }
+        case "musicStopped": {
+            _handleMusicStopped(data);
+            break;
+        }
+        case "musicFinished": {
+            _handleMusicFinished(data);
+            break;
+        }
+        case "setMusicMasterVolume": {
+            _handleSetMusicMasterVolume(data);
+            break;
+        }
+        case "setTrackListVolume": {
+            _handleSetTrackListVolume(data);
+            break;
+        }
+        case "setSoundMasterVolume": {
+            _handleSetSoundMasterVolume(data);
+            break;
+        }
+        case "setSoundVolume": {
+            _handleSetSoundVolume(data);
+            break;
+        }
+        case "soundPlaying": {
+            _handleSoundPlaying(data);
+            break;
+        }
+        case "soundStopped": {
+            _handleSoundStopped(data);
+            break;
+        }
+        case "soundFinished": {
+            _handleSoundFinished(data);
+            break;
+        }
+        case "setSoundRepeatCount": {
+            _handleSetSoundRepeatCount(data);
+            break;
+        }
+        case "setSoundRepeatDelay": {
+            _handleSetSoundRepeatDelay(data);
+            break;
+        }
+        case "resync": {
+            _handleResync(data);
+            break;
+        }
+        case "snapshot": {
+            _handleSnapshot(data);
+            break;
+        }
+        case "batch": {
+            data.events.forEach(_handleMessage);
+            break;
+        }
+        default:
+            console.log("Received unknown action: " + data.action);
+    }
+}
+
+function sendSync() {
+    // The server answers with the missed events or, if they are no longer available, with a snapshot
+    sendMessage({
+        "action": "sync",
+        "epoch": stateEpoch,
+        "version": stateVersion,
+    });
+}
+
+function sendMessage(data) {
+    conn.send(conn.protocol === BINARY_SUBPROTOCOL ? encodeBinaryMessage(data) : JSON.stringify(data));
+}
+
 function disconnect() {
+   clearTimeout(reconnectTimeout);
    if (conn != null) {
+       conn.onclose = null;
        conn.close();
        conn = null;
    }
@@ -85,7 +147,7 @@ function disconnect() {
 
 function onNotConnected(){
     console.log("No connection established!");
-    displayToast("Not Connected", "Please reload the page");
+    displayToast("Not Connected", "Reconnecting...");
 }
 
 function displayToast(title, message) {
@@ -184,3 +246,37 @@ function _handleSetSoundRepeatDelay(data) {
     console.log("Sound loop delay for group=" + data.groupIndex + ", sound=" + data.soundIndex +
         " set to " + data.repeatDelay);
 }
+
+function _handleResync(data) {
+    console.log("Missed updates, syncing");
+    sendSync();
+}
+
+function _handleSnapshot(data) {
+    stateEpoch = data.epoch;
+    console.log("Received snapshot at version " + data.version);
+    setMusicMasterVolume(data.musicVolume);
+    data.trackListVolumes.forEach(function(volumes, groupIndex) {
+        volumes.forEach(function(volume, trackListIndex) {
+            setTrackListVolumeSlider(groupIndex, trackListIndex, volume);
+        });
+    });
+    if (data.nowPlaying === null) {
+        setMusicNotPlaying();
+    } else {
+        const [groupIndex, trackListIndex, groupName, trackName] = data.nowPlaying;
+        setMusicPlaying(groupIndex, groupName, trackListIndex, trackName);
+    }
+    setSoundMasterVolume(data.soundVolume);
+    data.sounds.forEach(function(sounds, groupIndex) {
+        sounds.forEach(function([volume, repeatCount, repeatDelay], soundIndex) {
+            setSoundVolume(groupIndex, soundIndex, volume);
+            setSoundRepeatCount(groupIndex, soundIndex, repeatCount);
+            setSoundRepeatDelay(groupIndex, soundIndex, repeatDelay);
+            setSoundNotPlaying(groupIndex, soundIndex);
+        });
+    });
+    data.soundsPlaying.forEach(function([groupIndex, soundIndex]) {
+        setSoundPlaying(groupIndex, soundIndex);
+    });
+}
@@ -0,0 +1,28 @@
+import asyncio
+import io
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+async def cancel_and_wait(task: asyncio.Task, timeout: float, description: str) -> bool:
+    """
+    Cancels the task and waits until it is done, without polling. Returns `True` if the task is done.
+
+    If the task is not done within `timeout` seconds, e.g., because it swallows the cancellation or is stuck in its
+    clean up, it is abandoned: a warning with the stack of the task is logged and `False` is returned.
+
+    :param task: the task to cancel
+    :param timeout: the seconds to wait for the task
+    :param description: what the task does, used in the warning
+    """
+    task.cancel()
+    done, _ = await asyncio.wait([task], timeout=timeout)
+    if done:
+        return True
+    stack = io.StringIO()
+    task.print_stack(file=stack)
+    logger.warning(f"Task for {description} did not finish within {timeout} seconds after it was cancelled.")
+    logger.warning(stack.getvalue())
+    return False
@@ -0,0 +1,7 @@
+from src.websocket import binary_protocol  # noqa
+from src.websocket.broadcaster import Broadcaster  # noqa
+from src.websocket.event_log import EventLog  # noqa
+from src.websocket.message_coalescer import MessageCoalescer  # noqa
+from src.websocket.message_dispatcher import ActionHandler, MessageDispatcher  # noqa
+from src.websocket.overflow_policy import OverflowPolicy  # noqa
+from src.websocket.websocket_client import WebsocketClient  # noqa
@@ -0,0 +1,115 @@
+from typing import Dict, List, Sequence, Tuple
+
+import msgpack
+
+
+SUBPROTOCOL = "dndj.msgpack.v1"
+
+# The opcode of an action is its position in the list. Only append to the lists, the client in
+# `static/js/binaryProtocol.js` uses the same numbers.
+CLIENT_ACTIONS: Sequence[Tuple[str, Tuple[str, ...]]] = [
+    ("playMusic", ("groupIndex", "trackListIndex")),
+    ("stopMusic", ()),
+    ("setMusicMasterVolume", ("volume",)),
+    ("setTrackListVolume", ("groupIndex", "trackListIndex", "volume")),
+    ("playSound", ("groupIndex", "soundIndex")),
+    ("stopSound", ("groupIndex", "soundIndex")),
+    ("setSoundMasterVolume", ("volume",)),
+    ("setSoundVolume", ("groupIndex", "soundIndex", "volume")),
+    ("setSoundRepeatCount", ("groupIndex", "soundIndex", "repeatCount")),
+    ("setSoundRepeatDelay", ("groupIndex", "soundIndex", "repeatDelay")),
+    ("sync", ("epoch", "version")),
+    ("batch", ("commands",)),  # the commands are arrays `[opcode, *values]` themselves
+]
+
+_SOUND_INFO_FIELDS = (
+    "groupIndex",
+    "soundIndex",
+    "groupName",
+    "soundName",
+    "volume",
+    "repeatCount",
+    "repeatDelay",
+    "version",
+)
+
+SERVER_ACTIONS: Sequence[Tuple[str, Tuple[str, ...]]] = [
+    ("nowPlaying", ("groupIndex", "trackListIndex", "groupName", "trackName", "version")),
+    ("musicStopped", ("version",)),
+    ("musicFinished", ("version",)),
+    ("setMusicMasterVolume", ("volume", "version")),
+    ("setTrackListVolume", ("groupIndex", "trackListIndex", "volume", "version")),
+    ("soundPlaying", _SOUND_INFO_FIELDS),
+    ("soundStopped", _SOUND_INFO_FIELDS),
+    ("soundFinished", _SOUND_INFO_FIELDS),
+    ("setSoundMasterVolume", ("volume", "version")),
+    ("setSoundVolume", _SOUND_INFO_FIELDS),
+    ("setSoundRepeatCount", _SOUND_INFO_FIELDS),
+    ("setSoundRepeatDelay", _SOUND_INFO_FIELDS),
+    ("resync", ()),
+    (
+        "snapshot",
+        (
+            "epoch",
+            "version",
+            "musicVolume",
+            "nowPlaying",
+            "trackListVolumes",
+            "soundVolume",
+            "sounds",
+            "soundsPlaying",
+        ),
+    ),
+    ("batch", ("events", "version")),  # the events are arrays `[opcode, *values]` themselves
+]
+
+_SERVER_OPCODES = {action: (opcode, fields) for opcode, (action, fields) in enumerate(SERVER_ACTIONS)}
+
+
+def encode(message: Dict) -> bytes:
+    """
+    Encodes a message of the server as msgpack array `[opcode, *values]`, the values are in the order of the fields
+    in `SERVER_ACTIONS`. Raises a `KeyError` if the action or one of its fields is unknown.
+    """
+    return msgpack.packb(_to_array(message), use_bin_type=True)
+
+
+def _to_array(message: Dict) -> List:
+    """
+    Returns the message as array `[opcode, *values]`, the events of a batch are converted as well.
+    """
+    opcode, fields = _SERVER_OPCODES[message["action"]]
+    if message["action"] == "batch":
+        return [opcode, [_to_array(event) for event in message["events"]], message["version"]]
+    return [opcode, *[message[field] for field in fields]]
+
+
+def decode(data: bytes) -> Dict:
+    """
+    Decodes a msgpack array `[opcode, *values]` sent by a client into the same dictionary the JSON protocol would
+    produce. Raises a `ValueError` if the data is malformed.
+    """
+    try:
+        array = msgpack.unpackb(data, raw=False)
+    except (TypeError, ValueError, msgpack.UnpackException) as ex:
+        raise ValueError(f"Malformed binary message: {ex!r}")
+    return _from_array(array)
+
+
+def _from_array(array) -> Dict:
+    """
+    Returns the message of the array `[opcode, *values]`, the commands of a batch are converted as well.
+    """
+    if not isinstance(array, list) or not array:
+        raise ValueError(f"Expected an array [opcode, *values], got {array!r}")
+    opcode, *values = array
+    if not isinstance(opcode, int) or not 0 <= opcode < len(CLIENT_ACTIONS):
+        raise ValueError(f"Unknown opcode: {opcode!r}")
+    action, fields = CLIENT_ACTIONS[opcode]
+    if len(values) != len(fields):
+        raise ValueError(f"Expected {len(fields)} values for '{action}', got {len(values)}")
+    if action == "batch":
+        if not isinstance(values[0], list):
+            raise ValueError(f"Expected an array of commands, got {values[0]!r}")
+        return {"action": action, "commands": [_from_array(command) for command in values[0]]}
+    return {"action": action, **dict(zip(fields, values))}
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+from typing import Dict
+
+from aiohttp import web
+
+from src.websocket import binary_protocol
+from src.websocket.overflow_policy import OverflowPolicy
+from src.websocket.websocket_client import WebsocketClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """
+    This class keeps track of the connected websockets and sends messages to all of them.
+
+    Every websocket gets its own bounded queue that is drained by a writer task (see `WebsocketClient`), so
+    broadcasting never waits for the network. A client that cannot keep up is handled according to the
+    `OverflowPolicy`.
+
+    Clients either use the default JSON protocol or the binary protocol (see `binary_protocol`).
+    """
+
+    RESYNC_MESSAGE = {"action": "resync"}
+
+    def __init__(
+        self,
+        send_timeout: float = 5.0,
+        max_queue_size: int = 100,
+        overflow_policy: OverflowPolicy = OverflowPolicy.RESYNC,
+        compress_threshold: int = 0,
+    ):
+        """
+        Initializes a `Broadcaster` instance.
+
+        :param send_timeout: seconds a single send may take before the client is considered dead and removed
+        :param max_queue_size: number of messages that may wait to be sent to a single client
+        :param overflow_policy: what to do with a client whose queue is full
+        :param compress_threshold: frames shorter than this are not compressed, see `WebsocketClient`
+        """
+        self.send_timeout = send_timeout
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.compress_threshold = compress_threshold
+        self.clients: Dict[str, WebsocketClient] = {}
+        self._resync_frame = json.dumps(self.RESYNC_MESSAGE)
+        self._binary_resync_frame = binary_protocol.encode(self.RESYNC_MESSAGE)
+
+    @property
+    def client_count(self) -> int:
+        """
+        Returns the number of registered websockets.
+        """
+        return len(self.clients)
+
+    def register(self, identifier: str, ws: web.WebSocketResponse, binary: bool = False):
+        """
+        Registers the websocket under the given identifier such that it receives future broadcasts.
+
+        :param identifier: identifier of the websocket
+        :param ws: the websocket
+        :param binary: whether the websocket uses the binary protocol instead of JSON
+        """
+        self.clients[identifier] = WebsocketClient(
+            identifier,
+            ws,
+            self.max_queue_size,
+            self.send_timeout,
+            on_failure=self._evict,
+            binary=binary,
+            compress_threshold=self.compress_threshold,
+        )
+
+    def unregister(self, identifier: str):
+        """
+        Unregisters the websocket with the given identifier. Does nothing if there is no such websocket.
+        """
+        client = self.clients.pop(identifier, None)
+        if client is not None:
+            client.stop()
+
+    def broadcast(self, message: Dict):
+        """
+        Enqueues the message for every registered websocket. The message is serialized at most once per protocol and
+        the same frame is handed to every websocket of that protocol.
+        """
+        if not self.clients:
+            return
+        text_frame = binary_frame = None
+        for client in list(self.clients.values()):
+            if client.binary:
+                if binary_frame is None:
+                    binary_frame = binary_protocol.encode(message)
+                frame = binary_frame
+            else:
+                if text_frame is None:
+                    text_frame = json.dumps(message)
+                frame = text_frame
+            if not client.send(frame):
+                self._on_overflow(client)
+
+    def send(self, identifier: str, message: Dict):
+        """
+        Enqueues the message for the websocket with the given identifier only. Does nothing if there is no such
+        websocket.
+        """
+        client = self.clients.get(identifier)
+        if client is None:
+            return
+        frame = binary_protocol.encode(message) if client.binary else json.dumps(message)
+        if not client.send(frame):
+            self._on_overflow(client)
+
+    def _on_overflow(self, client: WebsocketClient):
+        """
+        Handles a client whose queue is full.
+        """
+        if self.overflow_policy == OverflowPolicy.RESYNC:
+            logger.warning(f"Client {client.identifier} is too slow, asking it to resync.")
+            client.replace_queue(self._binary_resync_frame if client.binary else self._resync_frame)
+        else:
+            logger.warning(f"Client {client.identifier} is too slow, disconnecting it.")
+            self._evict(client)
+
+    def _evict(self, client: WebsocketClient):
+        """
+        Unregisters the client and closes its websocket in the background.
+        """
+        if self.clients.get(client.identifier) is client:
+            del self.clients[client.identifier]
+        asyncio.ensure_future(client.close())
+
+    async def close(self):
+        """
+        Closes and unregisters every websocket.
+        """
+        clients = list(self.clients.values())
+        self.clients.clear()
+        await asyncio.gather(*[client.close() for client in clients])
@@ -0,0 +1,45 @@
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class EventLog:
+    """
+    This class stamps every broadcast event with a monotonically increasing version and keeps the most recent events
+    such that a reconnecting client can catch up on the events it missed.
+
+    The `epoch` identifies the server process. Versions of another epoch are meaningless, e.g., after a restart.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initializes an `EventLog` instance.
+
+        :param max_size: number of events that are kept, older events are discarded
+        """
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self._events = deque(maxlen=max_size)
+
+    def append(self, message: Dict) -> Dict:
+        """
+        Increments the version and returns a copy of the message stamped with it. The copy is kept in the log.
+        """
+        self.version += 1
+        event = {**message, "version": self.version}
+        self._events.append(event)
+        return event
+
+    def since(self, epoch: str, version: int) -> Optional[List[Dict]]:
+        """
+        Returns the events after the given version, oldest first. Returns `None` if the events are not available,
+        i.e., the epoch differs, the version is unknown or some of the events were already discarded.
+        """
+        if epoch != self.epoch or not 0 <= version <= self.version:
+            return None
+        n_missed = self.version - version
+        if n_missed > len(self._events):
+            return None
+        if n_missed == 0:
+            return []
+        return list(self._events)[-n_missed:]
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Set
+
+
+logger = logging.getLogger(__name__)
+
+
+class MessageCoalescer:
+    """
+    This class coalesces bursts of commands that share the same key (last write wins).
+
+    The first command for a key is applied immediately. Commands for the same key that arrive within `window`
+    seconds after it only replace the pending command, which is applied once the window has passed. Therefore,
+    every key is applied at most once per window.
+    """
+
+    def __init__(self, window: float):
+        """
+        Initializes a `MessageCoalescer` instance.
+
+        :param window: seconds in which a key is applied at most once (0 disables coalescing)
+        """
+        self.window = window
+        self._last_applied: Dict[Hashable, float] = {}
+        self._pending: Dict[Hashable, Callable[[], Awaitable]] = {}
+        self._timers: Dict[Hashable, asyncio.Handle] = {}
+        self._tasks: Set[asyncio.Future] = set()
+
+    async def submit(self, key: Hashable, apply_fn: Callable[[], Awaitable]):
+        """
+        Applies the command now or schedules it to be applied at the end of the current window.
+
+        :param key: commands with the same key replace each other, e.g., `(action, group_index, sound_index)`
+        :param apply_fn: async function without arguments that applies the command
+        """
+        if self.window <= 0:
+            await apply_fn()
+            return
+        if key in self._timers:  # already waiting for the window to pass
+            self._pending[key] = apply_fn
+            return
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        last_applied = self._last_applied.get(key)
+        if last_applied is None or now - last_applied >= self.window:
+            self._last_applied[key] = now
+            await apply_fn()
+        else:
+            self._pending[key] = apply_fn
+            self._timers[key] = loop.call_later(self.window - (now - last_applied), self._flush, key)
+
+    def _flush(self, key: Hashable):
+        """
+        Applies the pending command for the key.
+        """
+        del self._timers[key]
+        apply_fn = self._pending.pop(key)
+        self._last_applied[key] = asyncio.get_event_loop().time()
+        task = asyncio.ensure_future(apply_fn())
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Future):
+        """
+        Forgets the finished task and logs its exception, if any.
+        """
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to apply coalesced command: {task.exception()!r}")
+
+    def close(self):
+        """
+        Discards every pending command and cancels the commands that are being applied.
+        """
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
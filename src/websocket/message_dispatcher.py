@@ -0,0 +1,273 @@
+import functools
+import math
+import re
+from collections import namedtuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from aiohttp.web_request import Request
+
+from src.websocket.message_coalescer import MessageCoalescer
+
+
+ActionHandler = namedtuple("ActionHandler", ["action", "handler"])
+
+_MALFORMED = object()  # returned by the coercions instead of raising, a malformed message must not cost an exception
+
+_INT_REGEX = re.compile(r"\s*[+-]?\d+\s*")
+_FLOAT_REGEX = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*")
+
+
+def _to_int(value: Any) -> Any:
+    """
+    Returns the finite float or the numeric string as `int`, or `_MALFORMED`.
+    """
+    if isinstance(value, str):
+        return int(value) if _INT_REGEX.fullmatch(value) else _MALFORMED
+    if isinstance(value, float) and math.isfinite(value):
+        return int(value)
+    return _MALFORMED
+
+
+def _to_float(value: Any) -> Any:
+    """
+    Returns the int or the numeric string as `float`, or `_MALFORMED`.
+    """
+    if isinstance(value, int) or isinstance(value, str) and _FLOAT_REGEX.fullmatch(value):
+        return float(value)
+    return _MALFORMED
+
+
+def _to_str(value: Any) -> Any:
+    """
+    Returns `_MALFORMED`, a string field takes strings only.
+    """
+    return _MALFORMED
+
+
+_COERCIONS = {int: _to_int, float: _to_float, str: _to_str}
+
+
+def _check_coercion(coerce: Callable[[Any], Any]) -> Tuple[Any, Callable[[Any], Any]]:
+    """
+    Returns the type that a value must have to be taken as is and the function that coerces a value of any other
+    type or returns `_MALFORMED`.
+
+    Any coercion but `int`, `float` and `str`, e.g., one that parses a nested structure, is called with every value
+    but `None` and may raise a `TypeError` or `ValueError`. Its values are never taken as is (`isinstance(value, ())`
+    is always `False`).
+    """
+    if coerce in _COERCIONS:
+        return coerce, _COERCIONS[coerce]
+
+    def checked(value):
+        if value is None:  # the field is missing or null
+            return _MALFORMED
+        try:
+            return coerce(value)
+        except (TypeError, ValueError):
+            return _MALFORMED
+
+    return (), checked
+
+
+def _compile_call(
+    fields: Sequence[Tuple[str, Callable[[Any], Any]]], validator: Optional[Callable[..., bool]]
+) -> Callable[[Callable, Any, Dict], Any]:
+    """
+    Returns a function `call(function, first, data)` that looks up and coerces the fields of a message, checks them
+    with the validator and returns `function(first, *values)`. Returns `None` if a field is missing, its value
+    cannot be coerced or the values are invalid.
+
+    The common field counts get a dedicated function to avoid looping over the fields and packing the values for
+    every message.
+    """
+    fields = [(name,) + _check_coercion(coerce) for name, coerce in fields]
+    if len(fields) == 0:
+
+        def call(function, first, data):
+            if validator is None or validator():
+                return function(first)
+            return None
+
+        return call
+    if len(fields) == 1:
+        ((name_1, type_1, coerce_1),) = fields
+
+        def call(function, first, data):
+            value_1 = data.get(name_1)
+            if not isinstance(value_1, type_1):
+                value_1 = coerce_1(value_1)
+                if value_1 is _MALFORMED:
+                    return None
+            if validator is None or validator(value_1):
+                return function(first, value_1)
+            return None
+
+        return call
+    if len(fields) == 2:
+        (name_1, type_1, coerce_1), (name_2, type_2, coerce_2) = fields
+
+        def call(function, first, data):
+            value_1 = data.get(name_1)
+            if not isinstance(value_1, type_1):
+                value_1 = coerce_1(value_1)
+                if value_1 is _MALFORMED:
+                    return None
+            value_2 = data.get(name_2)
+            if not isinstance(value_2, type_2):
+                value_2 = coerce_2(value_2)
+                if value_2 is _MALFORMED:
+                    return None
+            if validator is None or validator(value_1, value_2):
+                return function(first, value_1, value_2)
+            return None
+
+        return call
+    if len(fields) == 3:
+        (name_1, type_1, coerce_1), (name_2, type_2, coerce_2), (name_3, type_3, coerce_3) = fields
+
+        def call(function, first, data):
+            value_1 = data.get(name_1)
+            if not isinstance(value_1, type_1):
+                value_1 = coerce_1(value_1)
+                if value_1 is _MALFORMED:
+                    return None
+            value_2 = data.get(name_2)
+            if not isinstance(value_2, type_2):
+                value_2 = coerce_2(value_2)
+                if value_2 is _MALFORMED:
+                    return None
+            value_3 = data.get(name_3)
+            if not isinstance(value_3, type_3):
+                value_3 = coerce_3(value_3)
+                if value_3 is _MALFORMED:
+                    return None
+            if validator is None or validator(value_1, value_2, value_3):
+                return function(first, value_1, value_2, value_3)
+            return None
+
+        return call
+
+    def call(function, first, data):
+        values = []
+        for name, type_, coerce in fields:
+            value = data.get(name)
+            if not isinstance(value, type_):
+                value = coerce(value)
+                if value is _MALFORMED:
+                    return None
+            values.append(value)
+        if validator is None or validator(*values):
+            return function(first, *values)
+        return None
+
+    return call
+
+
+def _compile_coalesce_key(action: str, positions: Sequence[int]) -> Callable[[Tuple], Tuple]:
+    """
+    Returns a function that builds the coalescer key from the action and the values at the given positions.
+    """
+    if len(positions) == 0:
+        key = (action,)
+        return lambda values: key
+    if len(positions) == 2:
+        position_1, position_2 = positions
+        return lambda values: (action, values[position_1], values[position_2])
+    return lambda values: (action,) + tuple([values[position] for position in positions])
+
+
+def _with_values(action_handler: ActionHandler, *values) -> Tuple[ActionHandler, Tuple]:
+    """
+    Returns the action handler together with the values, see `MessageDispatcher.parse()`.
+    """
+    return action_handler, values
+
+
+class MessageDispatcher:
+    """
+    This class dispatches incoming websocket messages to the handler that is registered for their action.
+
+    The fields of every action are looked up and checked in a precompiled order. Messages with an unknown action,
+    missing fields or values that cannot be coerced are dropped without raising.
+    """
+
+    def __init__(self, coalescer: Optional[MessageCoalescer] = None):
+        """
+        Initializes a `MessageDispatcher` instance.
+
+        :param coalescer: used for actions that are registered with `coalesce_by` (Optional)
+        """
+        self.coalescer = coalescer
+        # action -> (action handler, compiled call, function that the call passes the values to when dispatching)
+        self._handlers: Dict[str, Tuple[ActionHandler, Callable, Callable]] = {}
+
+    @property
+    def actions(self) -> Tuple[str, ...]:
+        """
+        Returns the registered actions.
+        """
+        return tuple(self._handlers.keys())
+
+    def register(
+        self,
+        action: str,
+        handler: Callable[..., Awaitable],
+        fields: Sequence[Tuple[str, Callable[[Any], Any]]] = (),
+        validator: Optional[Callable[..., bool]] = None,
+        coalesce_by: Optional[Sequence[str]] = None,
+    ):
+        """
+        Registers the handler for the action.
+
+        :param action: the value of the "action" field of the message
+        :param handler: async function that is called with the request followed by the coerced field values
+        :param fields: pairs of field name and function that coerces the value, e.g., `("groupIndex", int)`
+        :param validator: function that is called with the coerced field values and returns whether they are valid
+        :param coalesce_by: names of the fields that, together with the action, form the key for the coalescer
+        """
+        invoke = handler
+        if coalesce_by is not None:
+            field_names = [name for name, _ in fields]
+            coalesce_key = _compile_coalesce_key(action, [field_names.index(name) for name in coalesce_by])
+            invoke = functools.partial(self._coalesce, handler, coalesce_key)
+        self._handlers[action] = (ActionHandler(action, handler), _compile_call(tuple(fields), validator), invoke)
+
+    def _coalesce(
+        self, handler: Callable[..., Awaitable], coalesce_key: Callable[[Tuple], Tuple], request: Request, *values
+    ) -> Awaitable:
+        """
+        Returns the awaitable that submits the handler call to the coalescer, or calls it if there is no coalescer.
+        """
+        if self.coalescer is None:
+            return handler(request, *values)
+        return self.coalescer.submit(coalesce_key(values), functools.partial(handler, request, *values))
+
+    def parse(self, data: Dict) -> Optional[Tuple[ActionHandler, Tuple]]:
+        """
+        Returns the handler for the message and the coerced field values. Returns `None` if the message is dropped.
+        """
+        try:
+            registered = self._handlers.get(data.get("action"))
+        except TypeError:  # the action is unhashable, e.g., a list
+            return None
+        if registered is None:
+            return None
+        action_handler, call, _ = registered
+        return call(_with_values, action_handler, data)
+
+    def dispatch(self, request: Request, data: Dict) -> Optional[Awaitable]:
+        """
+        Returns the awaitable that calls the handler for the message. Returns `None` if the message is dropped.
+
+        Apart from what is done with the values, this is the same path as `parse()`. The handler call is returned
+        rather than awaited, which saves a coroutine for every message.
+        """
+        try:
+            registered = self._handlers.get(data.get("action"))
+        except TypeError:  # the action is unhashable, e.g., a list
+            return None
+        if registered is None:
+            return None
+        _, call, invoke = registered
+        return call(invoke, request, data)
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+    DISCONNECT = "disconnect"
+    RESYNC = "resync"
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Callable, Optional, Union
+
+from aiohttp import web
+
+
+logger = logging.getLogger(__name__)
+
+
+class WebsocketClient:
+    """
+    This class wraps a websocket with a bounded outbound queue. A writer task drains the queue, so callers that
+    send a frame never wait for the network.
+    """
+
+    def __init__(
+        self,
+        identifier: str,
+        ws: web.WebSocketResponse,
+        max_queue_size: int,
+        send_timeout: float,
+        on_failure: Optional[Callable[["WebsocketClient"], None]] = None,
+        binary: bool = False,
+        compress_threshold: int = 0,
+    ):
+        """
+        Initializes a `WebsocketClient` instance.
+
+        :param identifier: identifier of the client
+        :param ws: the websocket to write to
+        :param max_queue_size: number of frames that may wait to be sent before the queue overflows
+        :param send_timeout: seconds a single send may take before the client is considered dead
+        :param on_failure: function to call with this client if a send fails or times out
+        :param binary: whether the client uses the binary protocol, its frames are sent as bytes instead of text
+        :param compress_threshold: frames shorter than this are sent uncompressed if the websocket negotiated
+            compression, since compressing them saves next to nothing (0 compresses every frame)
+        """
+        self.identifier = identifier
+        self.ws = ws
+        self.send_timeout = send_timeout
+        self.on_failure = on_failure
+        self.binary = binary
+        self.compress_threshold = compress_threshold
+        self._queue = asyncio.Queue(maxsize=max_queue_size)
+        self._writer = asyncio.ensure_future(self._write())
+
+    @property
+    def queue_size(self) -> int:
+        """
+        Returns the number of frames that are waiting to be sent.
+        """
+        return self._queue.qsize()
+
+    def send(self, frame: Union[str, bytes]) -> bool:
+        """
+        Enqueues the frame to be sent. Returns `False` if the queue is full and the frame was not enqueued.
+        """
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def replace_queue(self, frame: Union[str, bytes]):
+        """
+        Discards every frame that is waiting to be sent and enqueues the given frame instead.
+        """
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(frame)
+
+    async def _write(self):
+        """
+        Sends the enqueued frames one after another. Stops and calls `self.on_failure` if a send fails.
+        """
+        try:
+            send = self.ws.send_bytes if self.binary else self.ws.send_str
+            compress_threshold = self.compress_threshold if self.ws.compress else 0
+            while True:
+                frame = await self._queue.get()
+                if len(frame) < compress_threshold:
+                    await asyncio.wait_for(self._send_uncompressed(send, frame), timeout=self.send_timeout)
+                else:
+                    await asyncio.wait_for(send(frame), timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logger.warning(f"Failed to send to client {self.identifier}: {ex!r}")
+            if self.on_failure is not None:
+                self.on_failure(self)
+
+    async def _send_uncompressed(self, send: Callable, frame: Union[str, bytes]):
+        """
+        Sends the frame without compressing it.
+
+        The writer of aiohttp compresses every frame once compression was negotiated. Uncompressed frames are valid
+        nonetheless (RFC 7692), so compression is switched off for this frame. Only this task sends data frames.
+        The `compress` argument of `send_str()` and `send_bytes()` cannot switch it off, so this relies on the private
+        writer of the pinned aiohttp version, see `test_frames_below_compress_threshold_are_not_compressed_on_the_wire`.
+        If the writer has no `compress` attribute, the frame is sent compressed as usual.
+        """
+        writer = getattr(self.ws, "_writer", None)
+        if not hasattr(writer, "compress"):
+            await send(frame)
+            return
+        compress, writer.compress = writer.compress, 0
+        try:
+            await send(frame)
+        finally:
+            writer.compress = compress
+
+    def stop(self):
+        """
+        Stops the writer task. Frames that are waiting to be sent are discarded.
+        """
+        self._writer.cancel()
+
+    async def close(self):
+        """
+        Stops the writer task and closes the websocket. Any error is ignored, since the connection is most likely
+        broken already.
+        """
+        self.stop()
+        try:
+            await asyncio.wait_for(self.ws.close(), timeout=self.send_timeout)
+        except Exception:
+            pass
@@ -1,27 +1,155 @@
 import argparse
+import pathlib
 
-from src.check_version import check_youtube_dl_version
-from src.server import Server
+from src.event_loop import EventLoop, install_event_loop
+from src.websocket import OverflowPolicy
+
+
+def parse_session(value: str):
+    """
+    Parses "name=path/to/config.yaml" or "path/to/config.yaml" into the name of the session and the config path.
+    The name defaults to the filename of the config without extension.
+    """
+    name, separator, config_path = value.partition("=")
+    if not separator:
+        return pathlib.Path(value).stem, value
+    return name, config_path
 
 
 if __name__ == "__main__":
     """
     Starts the server with the provided YAML config file.
 
+    If several config files are provided, every campaign is hosted as its own session under "/s/<name>/" where the name
+    is the filename of the config without extension. Use "name=path/to/config.yaml" to choose another name.
+
     Accepts the following optional arguments:
     --host "your.new.host.ip" (default="127.0.0.1")
     --port port_number (default=8080)
+    --client-queue-size size (default=100)
+    --slow-client-policy {disconnect,resync} (default=resync)
+    --coalesce-window milliseconds (default=100)
+    --heartbeat seconds (default=30)
+    --idle-timeout seconds (default=90)
+    --compression (compress websocket messages, default=off)
+    --compression-threshold size (default=32)
+    --loop {asyncio,uvloop} (default=asyncio)
+    --skip-version-check (do not check for a new version of 'youtube-dl')
 
     Run this script as follows:
     `python start_server.py "path/to/config.yaml"`
+    `python start_server.py "table-1=path/to/config.yaml" "table-2=path/to/other_config.yaml"`
     """
     parser = argparse.ArgumentParser(description="Start the server")
-    parser.add_argument("config", metavar="C", help="path to the config file")
+    parser.add_argument(
+        "configs",
+        metavar="C",
+        nargs="+",
+        type=parse_session,
+        help="path to the config file, several configs are hosted as sessions (optionally as name=path)",
+    )
     parser.add_argument(
         "--host", dest="host", action="store", default="127.0.0.1", help="The host (default: 127.0.0.1)"
     )
     parser.add_argument("--port", dest="port", action="store", default=8080, help="The port (default: 8080)")
+    parser.add_argument(
+        "--client-queue-size",
+        dest="client_queue_size",
+        action="store",
+        type=int,
+        default=100,
+        help="Number of messages that may wait to be sent to a single client (default: 100)",
+    )
+    parser.add_argument(
+        "--slow-client-policy",
+        dest="slow_client_policy",
+        action="store",
+        choices=[policy.value for policy in OverflowPolicy],
+        default=OverflowPolicy.RESYNC.value,
+        help="What to do with a client whose queue is full (default: resync)",
+    )
+    parser.add_argument(
+        "--coalesce-window",
+        dest="coalesce_window",
+        action="store",
+        type=int,
+        default=100,
+        help="Apply bursts of volume and repeat commands at most once per this many milliseconds (default: 100)",
+    )
+    parser.add_argument(
+        "--heartbeat",
+        dest="heartbeat",
+        action="store",
+        type=float,
+        default=30,
+        help="Ping clients every this many seconds, their pongs keep them from being idle, 0 disables (default: 30)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        dest="idle_timeout",
+        action="store",
+        type=float,
+        default=90,
+        help="Disconnect clients that sent nothing, not even a pong, for this many seconds. Should be well above the "
+        "heartbeat, 0 disables (default: 90)",
+    )
+    parser.add_argument(
+        "--compression",
+        dest="compression",
+        action="store_true",
+        help="Compress websocket messages (permessage-deflate) for clients that support it, saves bandwidth on weak "
+        "networks at the cost of CPU time",
+    )
+    parser.add_argument(
+        "--compression-threshold",
+        dest="compression_threshold",
+        action="store",
+        type=int,
+        default=32,
+        help="Do not compress messages shorter than this many bytes (default: 32)",
+    )
+    parser.add_argument(
+        "--loop",
+        dest="loop",
+        action="store",
+        choices=[event_loop.value for event_loop in EventLoop],
+        default=EventLoop.ASYNCIO.value,
+        help="The event loop implementation, falls back to asyncio if uvloop is not installed (default: asyncio)",
+    )
+    parser.add_argument(
+        "--skip-version-check",
+        dest="skip_version_check",
+        action="store_true",
+        help="Do not check for a new version of 'youtube-dl', e.g., if there is no internet connection",
+    )
 
     args = parser.parse_args()
-    check_youtube_dl_version()
-    Server(config_path=args.config, host=args.host, port=args.port).start()
+    names = [name for name, _ in args.configs]
+    if len(set(names)) != len(names):
+        parser.error("The names of the sessions must be unique.")
+    install_event_loop(EventLoop(args.loop))
+    # Imported after parsing the arguments, so `--help` and invalid arguments are answered without the slow imports
+    from src.check_version import check_youtube_dl_version_on_startup
+    from src.server import Server
+    from src.session_router import SessionRouter
+
+    servers = {
+        name: Server(
+            config_path=config_path,
+            host=args.host,
+            port=args.port,
+            max_client_queue_size=args.client_queue_size,
+            slow_client_policy=OverflowPolicy(args.slow_client_policy),
+            coalesce_window=args.coalesce_window / 1000,
+            heartbeat=args.heartbeat or None,
+            idle_timeout=args.idle_timeout or None,
+            compression=args.compression,
+            compression_threshold=args.compression_threshold,
+        )
+        for name, config_path in args.configs
+    }
+    on_startup = [] if args.skip_version_check else [check_youtube_dl_version_on_startup]
+    if len(servers) == 1:
+        next(iter(servers.values())).start(on_startup=on_startup)
+    else:
+        SessionRouter(servers, host=args.host, port=args.port).start(on_startup=on_startup)
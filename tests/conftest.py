@@ -2,6 +2,7 @@ import pytest
 import yaml
 
 from src.loader import CustomLoader
+from src.music.stream_resolver import get_stream_resolver
 
 
 @pytest.fixture(scope="session")
@@ -51,3 +52,19 @@ def example_config_str():
 @pytest.fixture(scope="session")
 def example_config(example_config_str):
     return yaml.load(example_config_str, Loader=CustomLoader)
+
+
+@pytest.fixture
+def stream_cache_files(monkeypatch):
+    """
+    Keeps the cache of YouTube streams in memory instead of the cache directory. Returns the saved files by name.
+    The `StreamResolver` that is shared by the process is created anew, such that no test sees the streams of another.
+    """
+    files = {}
+    monkeypatch.setattr("src.music.stream_cache.cache.load_dict", lambda filename: dict(files.get(filename, {})))
+    monkeypatch.setattr(
+        "src.music.stream_cache.cache.save_dict", lambda content, filename: files.update({filename: dict(content)})
+    )
+    get_stream_resolver.cache_clear()
+    yield files
+    get_stream_resolver.cache_clear()
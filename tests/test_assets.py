@@ -0,0 +1,104 @@
+import base64
+import gzip
+import hashlib
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src import assets
+
+
+class TestAssets:
+    @pytest.fixture
+    def static_root(self, tmp_path, monkeypatch):
+        static_root = tmp_path / "static"
+        (static_root / "css").mkdir(parents=True)
+        (static_root / "js").mkdir()
+        (static_root / "fonts").mkdir()
+        (static_root / "css" / "first.css").write_text("/*! license */\nbody {\n    color: red;\n}\n")
+        (static_root / "css" / "second.css").write_text(
+            "@font-face { src: url('../fonts/icons.woff2?v=1#icons'), url(data:font/woff;base64,AAAA); }"
+        )
+        (static_root / "fonts" / "icons.woff2").write_bytes(b"font")
+        (static_root / "js" / "first.js").write_text("function first() {\n    return 1;\n}\n")
+        (static_root / "js" / "second.js").write_text("// comment\nconst second = first() + 1;\n")
+        monkeypatch.setattr(assets, "CSS_BUNDLE", ["css/first.css", "css/second.css"])
+        monkeypatch.setattr(assets, "JS_BUNDLE", ["js/first.js", "js/second.js"])
+        return static_root
+
+    def test_fingerprint_depends_on_content(self):
+        assert assets.fingerprint("app.js", b"a") == f"app.{hashlib.sha256(b'a').hexdigest()[:12]}.js"
+        assert assets.fingerprint("app.js", b"a") != assets.fingerprint("app.js", b"b")
+
+    def test_build_bundles_and_minifies(self, static_root, tmp_path):
+        dist_directory = tmp_path / "dist"
+        manifest = assets.build(static_root, dist_directory)
+        assert manifest["app.js"].startswith("app.") and manifest["app.js"].endswith(".js")
+        js = (dist_directory / manifest["app.js"]).read_text()
+        assert js == "function first(){return 1;};const second=first()+1;"
+        css = (dist_directory / manifest["app.css"]).read_text()
+        assert css.startswith("/*! license */")
+        assert "color:red" in css
+
+    def test_build_writes_gzipped_copies_and_manifest(self, static_root, tmp_path):
+        dist_directory = tmp_path / "dist"
+        manifest = assets.build(static_root, dist_directory)
+        for filename in manifest.values():
+            content = (dist_directory / filename).read_bytes()
+            assert gzip.decompress((dist_directory / f"{filename}.gz").read_bytes()) == content
+        assert assets.load_manifest(dist_directory) == manifest
+
+    def test_build_fingerprints_files_referenced_by_stylesheets(self, static_root, tmp_path):
+        dist_directory = tmp_path / "dist"
+        manifest = assets.build(static_root, dist_directory)
+        font_filename = assets.fingerprint("icons.woff2", b"font")
+        assert (dist_directory / font_filename).read_bytes() == b"font"
+        css = (dist_directory / manifest["app.css"]).read_text()
+        assert f"url({font_filename}?v=1#icons)" in css
+        assert "url(data:font/woff;base64,AAAA)" in css
+
+    def test_load_manifest_returns_none_if_not_built(self, tmp_path):
+        assert assets.load_manifest(tmp_path) is None
+
+    def test_fetch_vendor_files_verifies_integrity_and_fetches_references(self, tmp_path, monkeypatch):
+        css = b"@font-face { src: url(../webfonts/icons.woff2); }"
+        integrity = "sha384-" + base64.b64encode(hashlib.sha384(css).digest()).decode()
+        monkeypatch.setattr(
+            assets, "VENDOR_FILES", [("https://cdn.example.com/lib/css/lib.css", "lib/css/lib.css", integrity)]
+        )
+        responses = {
+            "https://cdn.example.com/lib/css/lib.css": css,
+            "https://cdn.example.com/lib/webfonts/icons.woff2": b"font",
+        }
+        monkeypatch.setattr(
+            "src.assets.requests.get",
+            lambda url, timeout: MagicMock(content=responses[url], raise_for_status=MagicMock()),
+        )
+        assets.fetch_vendor_files(tmp_path)
+        assert (tmp_path / "lib" / "css" / "lib.css").read_bytes() == css
+        assert (tmp_path / "lib" / "webfonts" / "icons.woff2").read_bytes() == b"font"
+
+    def test_fetch_vendor_files_raises_if_integrity_does_not_match(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(assets, "VENDOR_FILES", [("https://cdn.example.com/lib.js", "lib.js", "sha256-invalid")])
+        monkeypatch.setattr(
+            "src.assets.requests.get", lambda url, timeout: MagicMock(content=b"tampered", raise_for_status=MagicMock())
+        )
+        with pytest.raises(RuntimeError):
+            assets.fetch_vendor_files(tmp_path)
+        assert not (tmp_path / "lib.js").exists()
+
+    def test_fetch_vendor_files_times_out_and_raises_for_http_errors(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(assets, "VENDOR_FILES", [("https://cdn.example.com/lib.js", "lib.js", None)])
+        requests_get_mock = MagicMock()
+        requests_get_mock.return_value.raise_for_status.side_effect = requests.HTTPError("404 Client Error")
+        monkeypatch.setattr("src.assets.requests.get", requests_get_mock)
+        with pytest.raises(requests.HTTPError):
+            assets.fetch_vendor_files(tmp_path)
+        requests_get_mock.assert_called_once_with("https://cdn.example.com/lib.js", timeout=assets.DOWNLOAD_TIMEOUT)
+        assert not (tmp_path / "lib.js").exists()
+
+    def test_build_raises_if_files_are_missing(self, static_root, tmp_path):
+        (static_root / "js" / "second.js").unlink()
+        with pytest.raises(FileNotFoundError):
+            assets.build(static_root, tmp_path / "dist")
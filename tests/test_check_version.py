@@ -1,9 +1,68 @@
-from src.check_version import check_youtube_dl_version
+from collections import namedtuple
+from unittest.mock import MagicMock
 
+import pytest
+import requests
+from aiohttp import web
 
-def test_check_youtube_dl_version():
+from src.check_version import (
+    REQUEST_TIMEOUT,
+    check_youtube_dl_version,
+    check_youtube_dl_version_in_background,
+    check_youtube_dl_version_on_startup,
+)
+
+
+Version = namedtuple("Version", ["version"])
+
+
+def test_check_youtube_dl_version(tmp_path, monkeypatch):
     """
     This test will fail if a new version of `youtube-dl` is available.
     This test should always succeed at the CI step, because the latest version will be installed during a run.
     """
+    monkeypatch.setattr("src.cache.CACHE_DIR", str(tmp_path))
     assert check_youtube_dl_version()
+
+
+async def test_check_youtube_dl_version_on_startup(monkeypatch):
+    check_mock = MagicMock()
+    monkeypatch.setattr("src.check_version.check_youtube_dl_version_in_background", check_mock)
+    app = web.Application()
+    app.on_startup.append(check_youtube_dl_version_on_startup)
+    app.freeze()
+    check_mock.assert_not_called()
+    await app.startup()
+    check_mock.assert_called_once_with()
+
+
+class TestCachedVersionCheck:
+    @pytest.fixture
+    def requests_get_mock(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("src.cache.CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr("src.check_version.pkg_resources.get_distribution", MagicMock(return_value=Version("1.0")))
+        requests_get_mock = MagicMock()
+        requests_get_mock.return_value.json.return_value = {"info": {"version": "1.0"}}
+        monkeypatch.setattr("src.check_version.requests.get", requests_get_mock)
+        return requests_get_mock
+
+    def test_latest_version_is_cached(self, requests_get_mock):
+        assert check_youtube_dl_version()
+        assert check_youtube_dl_version()
+        requests_get_mock.assert_called_once()
+        assert requests_get_mock.call_args[1]["timeout"] == REQUEST_TIMEOUT
+
+    def test_latest_version_is_requested_again_after_ttl(self, requests_get_mock):
+        assert check_youtube_dl_version()
+        requests_get_mock.return_value.json.return_value = {"info": {"version": "2.0"}}
+        assert not check_youtube_dl_version(ttl=0)
+        assert requests_get_mock.call_count == 2
+        assert not check_youtube_dl_version()  # the new version was cached
+        assert requests_get_mock.call_count == 2
+
+    def test_background_check_logs_failed_request(self, requests_get_mock, caplog):
+        requests_get_mock.side_effect = requests.ConnectionError("no internet")
+        thread = check_youtube_dl_version_in_background()
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+        assert "Could not check the version" in caplog.text
@@ -0,0 +1,30 @@
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.event_loop import EventLoop, install_event_loop
+
+
+class TestInstallEventLoop:
+    @pytest.fixture
+    def set_policy_mock(self, monkeypatch):
+        set_policy_mock = MagicMock()
+        monkeypatch.setattr(asyncio, "set_event_loop_policy", set_policy_mock)
+        return set_policy_mock
+
+    def test_asyncio_installs_default_policy(self, set_policy_mock):
+        assert install_event_loop(EventLoop.ASYNCIO) == EventLoop.ASYNCIO
+        set_policy_mock.assert_called_once_with(None)
+
+    def test_uvloop_installs_its_policy(self, set_policy_mock, monkeypatch):
+        uvloop_mock = MagicMock()
+        monkeypatch.setitem(sys.modules, "uvloop", uvloop_mock)
+        assert install_event_loop(EventLoop.UVLOOP) == EventLoop.UVLOOP
+        set_policy_mock.assert_called_once_with(uvloop_mock.EventLoopPolicy.return_value)
+
+    def test_uvloop_falls_back_to_asyncio_if_not_installed(self, set_policy_mock, monkeypatch):
+        monkeypatch.setitem(sys.modules, "uvloop", None)  # makes the import raise an ImportError
+        assert install_event_loop(EventLoop.UVLOOP) == EventLoop.ASYNCIO
+        set_policy_mock.assert_called_once_with(None)
@@ -0,0 +1,70 @@
+import builtins
+import pathlib
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.lazy_import import ensure_loaded, lazy_import
+
+
+class TestLazyImport:
+    @pytest.fixture
+    def module_name(self, tmp_path, monkeypatch):
+        (tmp_path / "lazy_example.py").write_text(
+            "import builtins\nbuiltins.lazy_example_executed = True\nvalue = 42\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "lazy_example", raising=False)
+        monkeypatch.setattr(builtins, "lazy_example_executed", False, raising=False)
+        yield "lazy_example"
+        sys.modules.pop("lazy_example", None)
+
+    def test_module_is_executed_on_first_attribute_access(self, module_name):
+        module = lazy_import(module_name)
+        assert not builtins.lazy_example_executed
+        assert module.value == 42
+        assert builtins.lazy_example_executed
+
+    def test_returns_module_that_is_already_imported(self, module_name):
+        assert lazy_import(module_name) is lazy_import(module_name)
+
+    def test_ensure_loaded_is_thread_safe(self, tmp_path, monkeypatch):
+        (tmp_path / "slow_lazy_example.py").write_text("import time\ntime.sleep(0.1)\nvalue = 42\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        module = lazy_import("slow_lazy_example")
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(ensure_loaded(module).value)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sys.modules.pop("slow_lazy_example", None)
+        assert values == [42] * 4
+
+    def test_raises_module_not_found_error(self):
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("does_not_exist")
+
+    def test_server_does_not_import_media_libraries(self):
+        """
+        Lazily imported modules are in `sys.modules` as `_LazyModule` until they are executed.
+        """
+        code = (
+            "import sys, src.server; "
+            "print(*[name for name in ('vlc', 'pafy', 'youtube_dl', 'pygame', 'pydub', 'pkg_resources') "
+            "if type(sys.modules.get(name)).__name__ == 'module'])"
+        )
+        project_root = pathlib.Path(__file__).parent.parent
+        result = subprocess.run([sys.executable, "-c", code], cwd=project_root, stdout=subprocess.PIPE, check=True)
+        assert result.stdout.decode().strip() == ""
+
+    def test_server_does_not_import_asset_minifiers(self):
+        """
+        The minifiers are only needed to build the assets, see `assets.build()`.
+        """
+        code = "import sys, src.server; print(*[name for name in ('rcssmin', 'rjsmin') if name in sys.modules])"
+        project_root = pathlib.Path(__file__).parent.parent
+        result = subprocess.run([sys.executable, "-c", code], cwd=project_root, stdout=subprocess.PIPE, check=True)
+        assert result.stdout.decode().strip() == ""
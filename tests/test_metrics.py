@@ -0,0 +1,46 @@
+from src.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestMetrics:
+    def test_counter_renders_labels(self):
+        counter = Counter("messages_total", "Messages.", {"action": "playSound"})
+        counter.inc()
+        counter.inc(2)
+        assert counter.samples() == ['messages_total{action="playSound"} 3']
+
+    def test_labels_are_escaped(self):
+        counter = Counter("messages_total", "Messages.", {"name": 'a "b"\\c\nd'})
+        assert counter.samples() == ['messages_total{name="a \\"b\\"\\\\c\\nd"} 0']
+
+    def test_gauge_reads_function(self):
+        values = [1]
+        gauge = Gauge("clients", "Clients.", lambda: len(values))
+        values.append(2)
+        assert gauge.samples() == ["clients 2"]
+
+    def test_histogram_counts_are_cumulative(self):
+        histogram = Histogram("duration_seconds", "Duration.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value)
+        assert histogram.samples() == [
+            'duration_seconds_bucket{le="0.1"} 2',
+            'duration_seconds_bucket{le="1.0"} 3',
+            'duration_seconds_bucket{le="+Inf"} 4',
+            "duration_seconds_sum 5.65",
+            "duration_seconds_count 4",
+        ]
+
+    def test_registry_renders_metrics_with_same_name_as_one_family(self):
+        registry = Registry()
+        registry.register(Counter("messages_total", "Messages.", {"action": "playSound"})).inc()
+        registry.register(Counter("messages_total", "Messages.", {"action": "stopSound"}))
+        registry.register(Gauge("clients", "Clients.", lambda: 2))
+        assert registry.render() == (
+            "# HELP messages_total Messages.\n"
+            "# TYPE messages_total counter\n"
+            'messages_total{action="playSound"} 1\n'
+            'messages_total{action="stopSound"} 0\n'
+            "# HELP clients Clients.\n"
+            "# TYPE clients gauge\n"
+            "clients 2\n"
+        )
@@ -0,0 +1,56 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.music.crossfader import Crossfader
+
+
+class TestCrossfader:
+    @pytest.fixture
+    def player_mock(self):
+        player_mock = MagicMock()
+        player_mock.audio_get_volume.return_value = 100
+        return player_mock
+
+    async def test_fade_changes_volume_linearly(self, player_mock, monkeypatch):
+        monkeypatch.setattr("src.music.crossfader.Crossfader.INTERVAL", 0.01)
+        crossfader = Crossfader()
+        await asyncio.wait_for(crossfader.fade(player_mock, 0, 0.1), timeout=1)
+        volumes = [c[0][0] for c in player_mock.audio_set_volume.call_args_list]
+        assert len(volumes) > 2
+        assert volumes == sorted(volumes, reverse=True)
+        assert volumes[-1] == 0
+        assert not crossfader.is_fading(player_mock)
+
+    async def test_fades_of_two_players_are_driven_together(self, player_mock):
+        other_player_mock = MagicMock()
+        other_player_mock.audio_get_volume.return_value = 0
+        crossfader = Crossfader()
+        fade_out = crossfader.fade(player_mock, 0, 0.2)
+        fade_in = crossfader.fade(other_player_mock, 100, 0.2)
+        await asyncio.sleep(0.1)
+        fade_out_volume = player_mock.audio_set_volume.call_args[0][0]
+        fade_in_volume = other_player_mock.audio_set_volume.call_args[0][0]
+        assert abs(fade_out_volume + fade_in_volume - 100) <= 1  # same progress, up to rounding
+        await asyncio.wait_for(asyncio.gather(fade_out, fade_in), timeout=1)
+
+    async def test_fade_without_duration_sets_volume_immediately(self, player_mock):
+        crossfader = Crossfader()
+        await asyncio.wait_for(crossfader.fade(player_mock, 30, 0), timeout=1)
+        player_mock.audio_set_volume.assert_called_once_with(30)
+
+    async def test_stop_resolves_fade_at_current_volume(self, player_mock):
+        crossfader = Crossfader()
+        fade = crossfader.fade(player_mock, 0, 10)
+        await asyncio.sleep(0)
+        crossfader.stop(player_mock)
+        assert fade.done()
+        assert not crossfader.is_fading(player_mock)
+
+    async def test_cancelled_fade_is_dropped(self, player_mock):
+        crossfader = Crossfader()
+        crossfader.fade(player_mock, 0, 10).cancel()
+        await asyncio.sleep(Crossfader.INTERVAL * 2)
+        assert not crossfader.is_fading(player_mock)
+        player_mock.audio_set_volume.assert_not_called()
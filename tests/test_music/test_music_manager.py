@@ -1,7 +1,10 @@
 import asyncio
+import threading
+from typing import List
 from unittest.mock import MagicMock, PropertyMock, call
 
 import pytest
+import vlc
 from asynctest import CoroutineMock
 
 from src.music import MusicGroup, MusicManager, Track
@@ -14,12 +17,53 @@ class TestMusicManager:
         return {"volume": 50, "groups": []}
 
     @pytest.fixture
-    def example_music_manager(self, example_config, monkeypatch):
+    def example_music_manager(self, example_config, stream_cache_files, monkeypatch):
         with monkeypatch.context() as m:
             m.setattr("src.music.music_manager.MusicChecker", MagicMock())
             manager = MusicManager(config=example_config["music"])
         return manager
 
+    def _patch_vlc_instance(self, monkeypatch, *media_player_mocks: MagicMock) -> MagicMock:
+        """
+        Patches the libvlc instance such that it creates the given media players in turn. Returns the instance mock.
+        """
+        vlc_instance_mock = MagicMock()
+        vlc_instance_mock.media_player_new.side_effect = media_player_mocks
+        monkeypatch.setattr("src.music.music_manager.get_vlc_instance", MagicMock(return_value=vlc_instance_mock))
+        return vlc_instance_mock
+
+    def _media_player_mock(self, emit_on_unpause: List[str], emit_on_play: List[str] = ("MediaPlayerPaused",)):
+        """
+        Returns a mock of a `vlc.MediaPlayer` that emits the given events when `play()` is called, by default that it is
+        paused like a media with the option "start-paused", and when `set_pause(0)` is called. Calling `stop()` emits
+        "MediaPlayerStopped". The events are emitted from another thread like VLC does, use `emit()` for other events.
+        The volume that is set is returned by `audio_get_volume()`.
+        """
+        callbacks = {}
+        media_player_mock = MagicMock()
+        media_player_mock.audio_set_volume.side_effect = lambda volume: setattr(media_player_mock, "volume", volume)
+        media_player_mock.audio_get_volume.side_effect = lambda: media_player_mock.volume
+        media_player_mock.volume = 0
+        media_player_mock.event_manager.return_value.event_attach.side_effect = callbacks.__setitem__
+
+        def emit(*event_names):
+            for event_name in event_names:
+                callback = callbacks.get(getattr(vlc.EventType, event_name))
+                if callback is not None:
+                    thread = threading.Thread(target=callback, args=(None,))
+                    thread.start()
+                    thread.join()
+
+        def detach(event_type):
+            callbacks.pop(event_type, None)
+
+        media_player_mock.emit = emit
+        media_player_mock.event_manager.return_value.event_detach.side_effect = detach
+        media_player_mock.play.side_effect = lambda: emit(*emit_on_play) or 0
+        media_player_mock.set_pause.side_effect = lambda do_pause: emit(*emit_on_unpause) if not do_pause else None
+        media_player_mock.stop.side_effect = lambda: emit("MediaPlayerStopped")
+        return media_player_mock
+
     def test_minimal_dict_as_config(self, minimal_music_manager_config):
         music_manager = MusicManager(minimal_music_manager_config)
         assert music_manager.volume == 50
@@ -64,6 +108,20 @@ class TestMusicManager:
         music_manager = MusicManager(minimal_music_manager_config)
         assert isinstance(music_manager.groups, tuple)
 
+    def test_crossfade_is_zero_by_default(self, minimal_music_manager_config):
+        music_manager = MusicManager(minimal_music_manager_config)
+        assert music_manager.crossfade == 0
+
+    def test_crossfade_in_config(self, minimal_music_manager_config):
+        minimal_music_manager_config["crossfade"] = 2.5
+        music_manager = MusicManager(minimal_music_manager_config)
+        assert music_manager.crossfade == 2.5
+
+    def test_music_managers_share_stream_resolver(self, stream_cache_files):
+        manager_1 = MusicManager({"volume": 1, "groups": []})
+        manager_2 = MusicManager({"volume": 1, "groups": []})
+        assert manager_1.stream_resolver is manager_2.stream_resolver
+
     def test_equal_if_same_config(self):
         manager_1 = MusicManager({"volume": 1, "groups": []})
         manager_2 = MusicManager({"volume": 1, "groups": []})
@@ -105,15 +163,78 @@ class TestMusicManager:
         Calling cancel() will cancel whatever is currently_playing and wait for it to reset the state.
         """
 
-        def reset(x):
-            example_music_manager._currently_playing = None
+        async def play_track_list():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                example_music_manager._currently_playing = None
 
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", CoroutineMock(side_effect=reset))
-        currently_playing_mock = MagicMock()
-        example_music_manager._currently_playing = currently_playing_mock
-        await example_music_manager.cancel()
+        task = asyncio.ensure_future(play_track_list())
+        example_music_manager._currently_playing = CurrentlyPlaying(0, 0, task)
+        await asyncio.sleep(0)
+        await asyncio.wait_for(example_music_manager.cancel(), timeout=1)
+        assert example_music_manager._currently_playing is None
+        assert task.cancelled()
+
+    async def test_cancel_gives_up_on_a_stuck_track_list(self, example_music_manager, monkeypatch):
+        """
+        If the track list does not finish cancelling within `CANCEL_TIMEOUT` seconds, cancel() returns anyway.
+        """
+
+        async def play_track_list():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(10)
+
+        monkeypatch.setattr(example_music_manager, "CANCEL_TIMEOUT", 0.05)
+        task = asyncio.ensure_future(play_track_list())
+        example_music_manager._currently_playing = CurrentlyPlaying(0, 0, task)
+        await asyncio.sleep(0)
+        await asyncio.wait_for(example_music_manager.cancel(), timeout=1)
+        assert not task.done()
+        task.cancel()
+
+    async def test_stuck_track_list_that_finishes_late_leaves_next_track_list_alone(
+        self, example_music_manager, monkeypatch
+    ):
+        """
+        If a track list is stuck when the next one is played, its tracks are stopped and released right away. When it
+        finishes after the next track list started, it leaves the state of the next track list alone, such that the
+        next track list can still be cancelled.
+        """
+        stuck_track_list = example_music_manager.groups[0].track_lists[0]
+        release_stuck_track_list = asyncio.Event()
+
+        async def play_track(group, track_list, track, next_track=None):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                if track_list is stuck_track_list:
+                    await release_stuck_track_list.wait()
+                raise
+
+        monkeypatch.setattr(example_music_manager, "CANCEL_TIMEOUT", 0.05)
+        monkeypatch.setattr(example_music_manager, "_play_track", play_track)
+        await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=0)
+        stuck_task = example_music_manager._currently_playing.task
+        stuck_track_mock = MagicMock()
+        example_music_manager._current_track = stuck_track_mock
+        example_music_manager._current_player = stuck_track_mock.player
+        await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=1)
+        stuck_track_mock.player.stop.assert_called_once()
+        stuck_track_mock.media.release.assert_called_once()
+        next_task = example_music_manager._currently_playing.task
+        current_player_mock = MagicMock()
+        example_music_manager._current_player = current_player_mock
+        release_stuck_track_list.set()
+        await asyncio.wait([stuck_task])
+        assert example_music_manager._currently_playing.task is next_task
+        assert example_music_manager._current_player is current_player_mock
+        current_player_mock.stop.assert_not_called()
+        assert await example_music_manager.cancel()
+        assert next_task.cancelled()
         assert example_music_manager._currently_playing is None
-        currently_playing_mock.task.cancel.assert_called_once()
 
     async def test_play_track_list_creates_a_task_to_play_the_track_list(self, example_music_manager, monkeypatch):
         """
@@ -134,6 +255,22 @@ class TestMusicManager:
         assert example_music_manager._currently_playing.track_list_index == 0
         assert isinstance(example_music_manager._currently_playing.task, asyncio.Task)
 
+    async def test_play_track_list_returns_the_task(self, example_music_manager, monkeypatch):
+        """
+        Calling play_track_list() should return the created task, which can be awaited even if the track list
+        already finished and currently_playing was reset.
+        """
+        monkeypatch.setattr(example_music_manager, "_play_track", CoroutineMock())
+        track_list = example_music_manager.groups[0].track_lists[0]
+        track_list._tracks = [Track("track-1.mp3"), Track("track-2.mp3")]
+        track_list.loop = False
+        task = await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=0)
+        assert isinstance(task, asyncio.Task)
+        await asyncio.sleep(0.01)
+        assert example_music_manager._currently_playing is None
+        await task
+        assert task.done()
+
     async def test_play_track_list_plays_all_tracks_once_if_no_loop(self, example_music_manager, monkeypatch):
         """
         The _play_track_list() method should call _play_track() for every track in it.
@@ -144,12 +281,12 @@ class TestMusicManager:
         track_list = group.track_lists[0]
         track_list._tracks = [Track("track-1.mp3"), Track("track-2.mp3")]
         track_list.loop = False
+        track_list.shuffle = False
         await example_music_manager._play_track_list(request=None, group_index=0, track_list_index=0)
-        assert play_track_mock.await_count == 2
-        play_track_mock.assert_has_awaits(
-            [call(group, track_list, track_list._tracks[0]), call(group, track_list, track_list._tracks[1])],
-            any_order=True,
-        )
+        assert play_track_mock.await_args_list == [
+            call(group, track_list, track_list._tracks[0], track_list._tracks[1]),  # the next track is preloaded
+            call(group, track_list, track_list._tracks[1], None),
+        ]
 
     async def test_play_track_list_loops(self, example_music_manager, monkeypatch):
         """
@@ -198,6 +335,7 @@ class TestMusicManager:
         track_list._tracks = [Track("track-1.mp3"), Track("track-2.mp3")]
         current_player_mock = MagicMock()
         example_music_manager._current_player = current_player_mock
+        example_music_manager._currently_playing = CurrentlyPlaying(0, 0, asyncio.current_task())
         await example_music_manager._play_track_list(request=None, group_index=0, track_list_index=0)
         current_player_mock.stop.assert_called_once()
         assert example_music_manager._currently_playing is None
@@ -215,6 +353,7 @@ class TestMusicManager:
         track_list._tracks = [Track("track-1.mp3"), Track("track-2.mp3")]
         current_player_mock = MagicMock()
         example_music_manager._current_player = current_player_mock
+        example_music_manager._currently_playing = CurrentlyPlaying(0, 0, asyncio.current_task())
         with pytest.raises(asyncio.CancelledError):
             await example_music_manager._play_track_list(request=None, group_index=0, track_list_index=0)
         current_player_mock.stop.assert_called_once()
@@ -232,6 +371,7 @@ class TestMusicManager:
         track_list = example_music_manager.groups[0].track_lists[0]
         track_list.loop = False
         track_list.next = "Next Track List"
+        example_music_manager._currently_playing = CurrentlyPlaying(0, 0, asyncio.current_task())
         await example_music_manager._play_track_list(request=None, group_index=0, track_list_index=0)
         play_next_track_list_mock.assert_awaited_once_with(None, track_list)
 
@@ -285,149 +425,292 @@ class TestMusicManager:
         """
         The _get_track_path() method will raise a ValueError, if it fails. In that case raise a CancelledError.
         """
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(side_effect=ValueError))
+        monkeypatch.setattr(
+            "src.music.music_manager.MusicManager._get_track_path", CoroutineMock(side_effect=ValueError)
+        )
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
         track = track_list.tracks[0]
         with pytest.raises(asyncio.CancelledError):
             await example_music_manager._play_track(group=group, track_list=track_list, track=track)
 
+    async def test_get_track_path_resolves_youtube_links_with_stream_resolver(self, example_music_manager, monkeypatch):
+        resolve_mock = CoroutineMock(return_value="stream-url")
+        get_track_path_mock = MagicMock()
+        monkeypatch.setattr(example_music_manager.stream_resolver, "resolve", resolve_mock)
+        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", get_track_path_mock)
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[0]
+        track = track_list.tracks[0]
+        assert track.is_youtube_link
+        assert await example_music_manager._get_track_path(group, track_list, track) == "stream-url"
+        resolve_mock.assert_awaited_once_with(track.file)
+        get_track_path_mock.assert_not_called()
+
+    async def test_get_track_path_returns_file_path(self, example_music_manager, monkeypatch):
+        resolve_mock = CoroutineMock()
+        monkeypatch.setattr(example_music_manager.stream_resolver, "resolve", resolve_mock)
+        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(return_value="path"))
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[1]
+        track = track_list.tracks[0]
+        assert not track.is_youtube_link
+        assert await example_music_manager._get_track_path(group, track_list, track) == "path"
+        resolve_mock.assert_not_awaited()
+
     async def test_play_track_cancels_if_play_returns_error(self, example_music_manager, monkeypatch):
         """
         If calling the play() method on the media player returns an error code (-1), raise a CancelledError.
         """
-        media_player_mock = MagicMock()
+        media_player_mock = self._media_player_mock(emit_on_unpause=[])
+        media_player_mock.play.side_effect = None
         media_player_mock.play.return_value = -1
-        monkeypatch.setattr("src.music.music_manager.vlc.MediaPlayer", MagicMock(return_value=media_player_mock))
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(return_value="url"))
+        self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
         track = track_list.tracks[0]
         with pytest.raises(asyncio.CancelledError):
             await example_music_manager._play_track(group=group, track_list=track_list, track=track)
 
-    async def test_play_track_cancels_if_cancelled_error_is_raised_while_playing(
-        self, example_music_manager, monkeypatch
-    ):
+    async def test_play_track_cancels_if_cancelled_while_playing(self, example_music_manager, monkeypatch):
         """
-        If a CancelledError is raised while the music is playing, catch it, set the volume to zero and
-        re-raise it.
+        If the task is cancelled while the music is playing, set the volume to zero, detach from the events of the
+        player and re-raise the CancelledError.
         """
-        media_player_mock = MagicMock()
-        media_player_mock.is_playing.return_value = True
-        media_player_mock.get_time = MagicMock(side_effect=asyncio.CancelledError)  # some method in the try block
+        media_player_mock = self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying"])
         set_master_volume_mock = CoroutineMock()
-        monkeypatch.setattr("src.music.music_manager.vlc.MediaPlayer", MagicMock(return_value=media_player_mock))
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(return_value="url"))
-        monkeypatch.setattr(
-            "src.music.music_manager.MusicManager._wait_for_current_player_to_be_playing", CoroutineMock()
-        )
+        self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
         monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", set_master_volume_mock)
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", CoroutineMock())
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
         track = track_list.tracks[0]
-        track.end_at = 1000
+        task = asyncio.ensure_future(example_music_manager._play_track(group=group, track_list=track_list, track=track))
+        await asyncio.sleep(0.05)
+        task.cancel()
         with pytest.raises(asyncio.CancelledError):
-            await example_music_manager._play_track(group=group, track_list=track_list, track=track)
-        media_player_mock.get_time.assert_called_once()  # this raised the CancelledError which got re-raised
+            await task
         set_master_volume_mock.assert_awaited_with(0, set_global=False)
+        assert media_player_mock.event_manager.return_value.event_detach.call_count == 5
 
     async def test_play_track_plays_the_track(self, example_music_manager, monkeypatch):
         """
         When a track is requested to be played, perform the following steps:
         - Get the path (url or file path) for the track
-        - Create a MediaPlayer instance
-        - Call the play() method on the media player
-        - Wait for it to start playing
+        - Open it paused on a media player, such that it is buffered
+        - Wait for the event that it is paused and unpause it
         - Set the volume with _set_master_volume()
-        - While the media player is_playing(), wait
+        - Wait for the event that it reached the end without polling the player
         """
-        media_player_mock = MagicMock()
-        is_playing_mock = MagicMock(side_effect=[True, True, False])  # Only plays for 2 steps
-        media_player_mock.is_playing = is_playing_mock
-        get_track_path_mock = MagicMock(return_value="url")
-        sleep_mock = CoroutineMock()
-        wait_for_start_mock = CoroutineMock()
-        set_master_volume_mock = CoroutineMock()  # necessary because it will use asyncio.sleep and mess up the numbers
-        monkeypatch.setattr("src.music.music_manager.vlc.MediaPlayer", MagicMock(return_value=media_player_mock))
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", get_track_path_mock)
-        monkeypatch.setattr(
-            "src.music.music_manager.MusicManager._wait_for_current_player_to_be_playing", wait_for_start_mock
-        )
+        media_player_mock = self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying", "MediaPlayerEndReached"])
+        vlc_instance_mock = self._patch_vlc_instance(monkeypatch, media_player_mock)
+        get_track_path_mock = CoroutineMock(return_value="url")
+        set_master_volume_mock = CoroutineMock()
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", get_track_path_mock)
         monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", set_master_volume_mock)
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", sleep_mock)
         example_music_manager.volume = 55
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
         track = track_list.tracks[0]
-        await example_music_manager._play_track(group=group, track_list=track_list, track=track)
-        get_track_path_mock.assert_called_once()
+        await asyncio.wait_for(
+            example_music_manager._play_track(group=group, track_list=track_list, track=track), timeout=1
+        )
+        get_track_path_mock.assert_awaited_once()
+        vlc_instance_mock.media_new.assert_called_once_with("url", "start-paused")
         media_player_mock.play.assert_called_once()
-        wait_for_start_mock.assert_awaited_once()
+        media_player_mock.set_pause.assert_called_once_with(0)
         set_master_volume_mock.assert_awaited_once_with(example_music_manager.volume, set_global=False)
-        assert is_playing_mock.call_count == 3  # is_playing becomes False at the 3rd call, so stop
-        assert sleep_mock.await_count == 2  # Two times for while player is playing
+        media_player_mock.is_playing.assert_not_called()
 
-    async def test_play_track_sets_start_time(self, example_music_manager, monkeypatch):
+    async def test_play_track_releases_media(self, example_music_manager, monkeypatch):
         """
-        If a `Track` has the `start_at` attribute, the media player should skip to it.
+        The media of a track is detached from the player and released when the track finished.
         """
-        media_player_mock = MagicMock()
-        media_player_mock.is_playing.return_value = False
-        monkeypatch.setattr("src.music.music_manager.vlc.MediaPlayer", MagicMock(return_value=media_player_mock))
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(return_value="url"))
+        media_player_mock = self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying", "MediaPlayerEndReached"])
+        vlc_instance_mock = self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[0]
+        await example_music_manager._play_track(group=group, track_list=track_list, track=track_list.tracks[0])
+        media_mock = vlc_instance_mock.media_new.return_value
+        assert media_player_mock.set_media.call_args_list == [call(media_mock), call(None)]
+        media_mock.release.assert_called_once()
+
+    async def test_play_track_preloads_next_track_on_second_player(self, example_music_manager, monkeypatch):
+        """
+        While a track plays, the next track is opened paused on the second player. When the track ends, the next track
+        is unpaused at full volume without being opened again. The players take turns.
+        """
+        player_mocks = [
+            self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying"]),
+            self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying", "MediaPlayerEndReached"]),
+        ]
+        vlc_instance_mock = self._patch_vlc_instance(monkeypatch, *player_mocks)
         monkeypatch.setattr(
-            "src.music.music_manager.MusicManager._wait_for_current_player_to_be_playing", CoroutineMock()
+            "src.music.music_manager.MusicManager._get_track_path", CoroutineMock(side_effect=["url-1", "url-2"])
         )
-        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", CoroutineMock())
+        set_master_volume_mock = CoroutineMock()
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", set_master_volume_mock)
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
-        track = track_list.tracks[0]
-        track.start_at = 1000
-        await example_music_manager._play_track(group=group, track_list=track_list, track=track)
-        media_player_mock.set_time.assert_called_once_with(1000)
+        track_1, track_2 = track_list.tracks[:2]
+        task = asyncio.ensure_future(example_music_manager._play_track(group, track_list, track_1, track_2))
+        await asyncio.sleep(0.05)
+        assert vlc_instance_mock.media_new.call_args_list == [
+            call("url-1", "start-paused"),
+            call("url-2", "start-paused"),
+        ]
+        player_mocks[1].play.assert_called_once()  # the next track is buffered
+        player_mocks[1].set_pause.assert_not_called()  # but does not start yet
+        player_mocks[0].emit("MediaPlayerEndReached")
+        await asyncio.wait_for(task, timeout=1)
+        await asyncio.wait_for(example_music_manager._play_track(group, track_list, track_2), timeout=1)
+        assert vlc_instance_mock.media_new.call_count == 2
+        player_mocks[1].set_pause.assert_called_once_with(0)
+        set_master_volume_mock.assert_awaited_with(example_music_manager.volume, set_global=False, smooth=False)
+        assert vlc_instance_mock.media_player_new.call_count == 2
+
+    async def test_preloaded_track_is_released_if_track_list_is_cancelled(self, example_music_manager, monkeypatch):
+        player_mocks = [
+            self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying"]),
+            self._media_player_mock(emit_on_unpause=[]),
+        ]
+        self._patch_vlc_instance(monkeypatch, *player_mocks)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
+        track_list = example_music_manager.groups[0].track_lists[0]
+        track_list.loop = False
+        await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=0)
+        await asyncio.sleep(0.05)
+        await example_music_manager.cancel()
+        player_mocks[1].play.assert_called_once()
+        player_mocks[1].stop.assert_called()
+        player_mocks[1].set_media.assert_called_with(None)
+        assert example_music_manager._preloading is None
 
-    async def test_play_track_stops_at_end_time(self, example_music_manager, monkeypatch):
+    async def test_play_track_list_crossfades_to_next_track_list(self, example_music_manager, monkeypatch):
         """
-        If a `Track` has the `end_at` attribute, the media player should stop if it is reached.
+        If the next track list crossfades, the track that plays is not faded out before the next track list starts.
+        Once the next track is ready, the old player fades out while the new one fades in and is released afterwards.
         """
-        media_player_mock = MagicMock()
-        media_player_mock.is_playing.return_value = True  # Can only exit if stop() is called
+        player_mocks = [self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying"]) for _ in range(3)]
+        self._patch_vlc_instance(monkeypatch, *player_mocks)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        example_music_manager.crossfade = 0.2
+        loop = asyncio.get_event_loop()
+        await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=0)
+        await asyncio.sleep(0.3)
+        old_player = example_music_manager._current_player
+        assert old_player.audio_get_volume() == 20
+        start = loop.time()
+        await example_music_manager.play_track_list(request=None, group_index=0, track_list_index=1)
+        assert loop.time() - start < 0.1  # does not wait for a fade out
+        old_player.stop.assert_not_called()
+        await asyncio.sleep(0.1)
+        new_player = example_music_manager._current_player
+        assert new_player is not old_player
+        assert 0 < old_player.audio_get_volume() < 20
+        assert 0 < new_player.audio_get_volume() < 20
+        await asyncio.sleep(0.2)
+        assert old_player.audio_get_volume() == 0
+        old_player.stop.assert_called()
+        assert call(None) in old_player.set_media.call_args_list  # released, it may preload the next track now
+        assert new_player.audio_get_volume() == 20
+        await example_music_manager.cancel()
 
-        def set_is_playing_to_false():
-            media_player_mock.is_playing.return_value = False
+    async def test_track_list_crossfade_overrides_global_crossfade(self, example_music_manager):
+        track_list = example_music_manager.groups[0].track_lists[0]
+        example_music_manager.crossfade = 2
+        assert example_music_manager._get_crossfade(track_list) == 2
+        track_list.crossfade = 0
+        assert example_music_manager._get_crossfade(track_list) == 0
 
-        media_player_mock.get_time.return_value = 1000
-        media_player_mock.stop = MagicMock(side_effect=set_is_playing_to_false)
-        monkeypatch.setattr("src.music.music_manager.vlc.MediaPlayer", MagicMock(return_value=media_player_mock))
-        monkeypatch.setattr("src.music.music_manager.utils.get_track_path", MagicMock(return_value="url"))
+    async def test_play_track_skips_track_if_player_encounters_error(self, example_music_manager, monkeypatch):
+        """
+        If the player fails before it starts playing, do not wait for it and continue with the next track.
+        """
+        media_player_mock = self._media_player_mock(emit_on_unpause=[], emit_on_play=["MediaPlayerEncounteredError"])
+        set_master_volume_mock = CoroutineMock()
+        self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", set_master_volume_mock)
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[0]
+        track = track_list.tracks[0]
+        await asyncio.wait_for(
+            example_music_manager._play_track(group=group, track_list=track_list, track=track), timeout=1
+        )
+        set_master_volume_mock.assert_not_awaited()
+        media_player_mock.set_pause.assert_not_called()
+
+    async def test_play_track_resolves_youtube_link_again_if_cached_stream_fails(
+        self, example_music_manager, monkeypatch
+    ):
+        """
+        If the cached stream of a YouTube link fails to play, e.g., because it expired early, drop it from the cache
+        and play the track from a stream that is resolved again.
+        """
+        player_mocks = [
+            self._media_player_mock(emit_on_unpause=[], emit_on_play=["MediaPlayerEncounteredError"]),
+            self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying", "MediaPlayerEndReached"]),
+        ]
+        vlc_instance_mock = self._patch_vlc_instance(monkeypatch, *player_mocks)
+        invalidate_mock = MagicMock(return_value=True)
+        monkeypatch.setattr(example_music_manager.stream_resolver, "invalidate", invalidate_mock)
         monkeypatch.setattr(
-            "src.music.music_manager.MusicManager._wait_for_current_player_to_be_playing", CoroutineMock()
+            "src.music.music_manager.MusicManager._get_track_path", CoroutineMock(side_effect=["stale", "fresh"])
         )
         monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", CoroutineMock())
         group = example_music_manager.groups[0]
         track_list = group.track_lists[0]
         track = track_list.tracks[0]
-        track.end_at = 1000
+        await asyncio.wait_for(example_music_manager._play_track(group, track_list, track), timeout=1)
+        invalidate_mock.assert_called_once_with(track.file)
+        assert vlc_instance_mock.media_new.call_args_list == [
+            call("stale", "start-paused"),
+            call("fresh", "start-paused"),
+        ]
+        player_mocks[0].set_pause.assert_not_called()
+        player_mocks[0].set_media.assert_called_with(None)
+        player_mocks[1].set_pause.assert_called_once_with(0)
+
+    async def test_play_track_sets_start_time(self, example_music_manager, monkeypatch):
+        """
+        If a `Track` has the `start_at` attribute, the media should start at it.
+        """
+        media_player_mock = self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying", "MediaPlayerEndReached"])
+        vlc_instance_mock = self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[0]
+        track = track_list.tracks[0]
+        track.start_at = 1000
         await example_music_manager._play_track(group=group, track_list=track_list, track=track)
-        media_player_mock.get_time.assert_called_once()  # Compares get_time with track.end_at and
-        assert media_player_mock.is_playing.call_count == 2  # immediately exits next step due to get_time >= end_at
-        media_player_mock.stop.assert_called_once()  # and calls stop()
+        vlc_instance_mock.media_new.assert_called_once_with("url", "start-paused", "start-time=1.0")
 
-    async def test_wait_for_current_player_to_be_playing(self, example_music_manager, monkeypatch):
+    async def test_play_track_stops_at_end_time(self, example_music_manager, monkeypatch):
         """
-        Wait until the current player is playing.
+        If a `Track` has the `end_at` attribute, the media player should be stopped when it is reached.
         """
-        sleep_mock = CoroutineMock()
-        monkeypatch.setattr("src.music.music_manager.asyncio.sleep", sleep_mock)
-        example_music_manager._current_player = MagicMock()
-        example_music_manager._current_player.is_playing = MagicMock(side_effect=[False, False, True])
-        await example_music_manager._wait_for_current_player_to_be_playing()
-        assert example_music_manager._current_player.is_playing.call_count == 3
-        assert sleep_mock.await_count == 2
+        media_player_mock = self._media_player_mock(emit_on_unpause=["MediaPlayerPlaying"])  # Can only end if stopped
+        media_player_mock.get_time.return_value = 950
+        self._patch_vlc_instance(monkeypatch, media_player_mock)
+        monkeypatch.setattr("src.music.music_manager.MusicManager._get_track_path", CoroutineMock(return_value="url"))
+        monkeypatch.setattr("src.music.music_manager.MusicManager._set_master_volume", CoroutineMock())
+        group = example_music_manager.groups[0]
+        track_list = group.track_lists[0]
+        track = track_list.tracks[0]
+        track.end_at = 1000
+        start = asyncio.get_event_loop().time()
+        await asyncio.wait_for(
+            example_music_manager._play_track(group=group, track_list=track_list, track=track), timeout=1
+        )
+        assert asyncio.get_event_loop().time() - start >= 0.05  # stops after the remaining 50 ms
+        media_player_mock.get_time.assert_called_once()
+        media_player_mock.stop.assert_called()
 
     async def test_set_master_volume_sets_volume_if_global_parameter(self, example_music_manager):
         example_music_manager.volume = 0
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import vlc
+
+from src.music.player_events import PlayerEvents
+
+
+class TestPlayerEvents:
+    @pytest.fixture
+    def player_mock(self):
+        player_mock = MagicMock()
+        player_mock.callbacks = {}
+        player_mock.event_manager.return_value.event_attach.side_effect = player_mock.callbacks.__setitem__
+        return player_mock
+
+    def _emit_from_thread(self, player_mock, event_type):
+        thread = threading.Thread(target=player_mock.callbacks[event_type], args=(None,))
+        thread.start()
+        thread.join()
+
+    async def test_playing_event_resolves_wait_until_playing(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerPlaying)
+        assert await asyncio.wait_for(player_events.wait_until_playing(), timeout=1)
+        assert not player_events.ended.done()
+
+    @pytest.mark.parametrize(
+        "event_type",
+        [vlc.EventType.MediaPlayerEndReached, vlc.EventType.MediaPlayerStopped],
+    )
+    async def test_end_events_resolve_wait_until_ended(self, player_mock, event_type):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerPlaying)
+        self._emit_from_thread(player_mock, event_type)
+        assert await asyncio.wait_for(player_events.wait_until_ended(), timeout=1)
+
+    async def test_paused_event_resolves_wait_until_paused(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerPaused)
+        assert await asyncio.wait_for(player_events.wait_until_paused(), timeout=1)
+        assert not player_events.playing.done()
+
+    async def test_end_before_paused_resolves_wait_until_paused_with_false(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerEncounteredError)
+        assert not await asyncio.wait_for(player_events.wait_until_paused(), timeout=1)
+
+    async def test_end_before_playing_resolves_both_waits(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerEndReached)
+        assert not await asyncio.wait_for(player_events.wait_until_playing(), timeout=1)
+        assert await asyncio.wait_for(player_events.wait_until_ended(), timeout=1)
+
+    async def test_error_resolves_both_waits_with_false(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerEncounteredError)
+        assert not await asyncio.wait_for(player_events.wait_until_playing(), timeout=1)
+        assert not await asyncio.wait_for(player_events.wait_until_ended(), timeout=1)
+
+    async def test_later_events_do_not_change_result(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerEncounteredError)
+        self._emit_from_thread(player_mock, vlc.EventType.MediaPlayerStopped)
+        assert not await asyncio.wait_for(player_events.wait_until_ended(), timeout=1)
+
+    async def test_detach_detaches_events_and_cancels_waits(self, player_mock):
+        player_events = PlayerEvents(player_mock)
+        player_events.detach()
+        event_manager = player_mock.event_manager.return_value
+        assert {c[0][0] for c in event_manager.event_detach.call_args_list} == set(player_mock.callbacks)
+        assert player_events.playing.cancelled()
+        assert player_events.paused.cancelled()
+        assert player_events.ended.cancelled()
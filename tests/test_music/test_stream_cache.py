@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from src.music.stream_cache import StreamCache, get_expiry
+
+
+def stream_url(expires_in: float) -> str:
+    return f"https://r1.googlevideo.com/videoplayback?expire={int(time.time() + expires_in)}&id=o-A"
+
+
+class TestGetExpiry:
+    def test_expiry_in_query(self):
+        assert get_expiry("https://r1.googlevideo.com/videoplayback?expire=1600000000&ei=x", 0) == 1600000000
+
+    def test_expiry_in_path(self):
+        assert get_expiry("https://manifest.googlevideo.com/api/manifest/dash/expire/1600000000/ei/x", 0) == 1600000000
+
+    def test_default_ttl_without_expiry(self):
+        assert abs(get_expiry("https://example.com/stream.webm", 60) - (time.time() + 60)) < 1
+
+
+class TestStreamCache:
+    @pytest.fixture
+    def stream_cache(self, stream_cache_files):
+        return StreamCache()
+
+    def test_get_returns_stored_stream(self, stream_cache):
+        url = stream_url(expires_in=3600)
+        stream_cache.put("link", url)
+        assert stream_cache.get("link") == url
+        assert stream_cache.get("other-link") is None
+
+    def test_get_counts_hits_and_misses(self, stream_cache):
+        stream_cache.put("link", stream_url(expires_in=3600))
+        stream_cache.put("lapsing", stream_url(expires_in=StreamCache.EXPIRY_MARGIN - 10))
+        stream_cache.get("link")
+        stream_cache.get("lapsing")
+        stream_cache.get("other-link")
+        assert stream_cache.hits.value == 1
+        assert stream_cache.misses.value == 2
+
+    def test_get_ignores_stream_that_lapses_soon(self, stream_cache):
+        stream_cache.put("link", stream_url(expires_in=StreamCache.EXPIRY_MARGIN - 10))
+        assert stream_cache.get("link") is None
+
+    def test_put_saves_to_disk_and_entries_are_loaded_on_restart(self, stream_cache, stream_cache_files):
+        url = stream_url(expires_in=3600)
+        stream_cache.put("link", url)
+        assert stream_cache_files[StreamCache.FILENAME]["link"]["url"] == url
+        assert StreamCache().get("link") == url
+
+    def test_least_recently_used_entries_are_dropped(self, stream_cache, monkeypatch):
+        monkeypatch.setattr(StreamCache, "MAX_ENTRIES", 2)
+        stream_cache.put("link-1", stream_url(expires_in=3600))
+        stream_cache.put("link-2", stream_url(expires_in=3600))
+        stream_cache.get("link-1")
+        stream_cache.put("link-3", stream_url(expires_in=3600))
+        assert list(stream_cache.entries) == ["link-1", "link-3"]
+
+    def test_invalidate_removes_entry(self, stream_cache, stream_cache_files):
+        stream_cache.put("link", stream_url(expires_in=3600))
+        assert stream_cache.invalidate("link")
+        assert not stream_cache.invalidate("link")
+        assert stream_cache.get("link") is None
+        assert "link" not in stream_cache_files[StreamCache.FILENAME]
+
+    def test_get_lapsing(self, stream_cache):
+        stream_cache.put("lapsed", stream_url(expires_in=-10))
+        stream_cache.put("lapsing", stream_url(expires_in=60))
+        stream_cache.put("valid", stream_url(expires_in=3600))
+        assert stream_cache.get_lapsing(["lapsed", "lapsing", "valid", "unknown"], within=600) == ["lapsed", "lapsing"]
+
+    def test_corrupt_file_is_ignored(self, monkeypatch):
+        def load_dict(filename):
+            raise ValueError("Expecting value")
+
+        monkeypatch.setattr("src.music.stream_cache.cache.load_dict", load_dict)
+        assert StreamCache().get("link") is None
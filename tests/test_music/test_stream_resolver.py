@@ -0,0 +1,159 @@
+import asyncio
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.lazy_import import lazy_import
+from src.music.stream_resolver import StreamResolver, get_stream_resolver
+
+
+@pytest.mark.usefixtures("stream_cache_files")
+class TestStreamResolver:
+    @pytest.fixture
+    def slow_resolve_mock(self):
+        """
+        A resolver that takes 50 ms per lookup, like a (fast) extraction of a YouTube stream.
+        """
+
+        def resolve(youtube_url):
+            time.sleep(0.05)
+            return f"stream-of-{youtube_url}"
+
+        return MagicMock(side_effect=resolve)
+
+    @pytest.fixture
+    def slow_lazy_pafy(self, tmp_path, monkeypatch):
+        """
+        Replaces `pafy` with a lazily imported module that takes 100 ms to import, like `pafy` with `youtube-dl`.
+        """
+        (tmp_path / "slow_pafy.py").write_text(
+            "import time\n"
+            "from unittest.mock import MagicMock\n"
+            "time.sleep(0.1)\n"
+            "def new(youtube_url):\n"
+            "    return MagicMock(**{'getbestaudio.return_value.url': f'stream-of-{youtube_url}'})\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr("src.music.utils.pafy", lazy_import("slow_pafy"))
+        yield
+        sys.modules.pop("slow_pafy", None)
+
+    async def test_resolve_returns_stream_url(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        assert await resolver.resolve("link") == "stream-of-link"
+        slow_resolve_mock.assert_called_once_with("link")
+
+    async def test_resolve_does_not_block_event_loop(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        loop = asyncio.get_event_loop()
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(loop.time())
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.ensure_future(tick())
+        await resolver.resolve("link")
+        ticker.cancel()
+        assert len(ticks) > 3
+
+    async def test_concurrent_requests_for_same_link_share_one_lookup(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        results = await asyncio.gather(*[resolver.resolve("link") for _ in range(5)])
+        assert results == ["stream-of-link"] * 5
+        assert slow_resolve_mock.call_count == 1
+
+    async def test_resolved_stream_is_cached(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        await resolver.resolve("link")
+        assert await asyncio.wait_for(resolver.resolve("link"), timeout=0.01) == "stream-of-link"
+        assert slow_resolve_mock.call_count == 1
+        assert StreamResolver(resolve_fn=slow_resolve_mock).stream_cache.get("link") == "stream-of-link"
+
+    async def test_invalidated_stream_is_resolved_again(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        await resolver.resolve("link")
+        assert resolver.invalidate("link")
+        await resolver.resolve("link")
+        assert slow_resolve_mock.call_count == 2
+
+    async def test_refresh_resolves_lapsing_streams_in_background(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        resolver.stream_cache.put("lapsing", f"old-stream?expire={int(time.time()) + 60}")
+        resolver.stream_cache.put("valid", f"old-stream?expire={int(time.time()) + 3600}")
+        resolver.refresh(["lapsing", "valid", "unknown"])
+        await asyncio.sleep(0.1)
+        slow_resolve_mock.assert_called_once_with("lapsing")
+        assert resolver.stream_cache.get("lapsing") == "stream-of-lapsing"
+
+    async def test_refresh_periodically_refreshes_right_away(self, slow_resolve_mock, monkeypatch):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        refresh_mock = MagicMock()
+        monkeypatch.setattr(resolver, "refresh", refresh_mock)
+        task = asyncio.ensure_future(resolver.refresh_periodically(["link"]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        refresh_mock.assert_called_once_with(["link"])
+
+    async def test_failed_refresh_is_logged(self, caplog):
+        resolver = StreamResolver(resolve_fn=MagicMock(side_effect=OSError("unavailable")))
+        resolver.stream_cache.put("lapsing", f"old-stream?expire={int(time.time()) + 60}")
+        resolver.refresh(["lapsing"])
+        await asyncio.sleep(0.05)
+        assert "Failed to refresh the stream of lapsing: unavailable" in caplog.text
+
+    async def test_concurrency_is_bounded(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def resolve(youtube_url):
+            with lock:
+                running.append(youtube_url)
+                max_running.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(youtube_url)
+            return youtube_url
+
+        resolver = StreamResolver(resolve_fn=resolve, max_workers=2)
+        await asyncio.gather(*[resolver.resolve(f"link-{i}") for i in range(6)])
+        assert max(max_running) == 2
+
+    async def test_concurrent_lookups_import_pafy_once(self, slow_lazy_pafy):
+        resolver = StreamResolver()
+        links = [f"link-{index}" for index in range(resolver.MAX_WORKERS)]
+        stream_urls = await asyncio.gather(*[resolver.resolve(link) for link in links])
+        assert stream_urls == [f"stream-of-{link}" for link in links]
+
+    async def test_cancelled_caller_does_not_cancel_other_callers(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock)
+        cancelled = asyncio.ensure_future(resolver.resolve("link"))
+        other = asyncio.ensure_future(resolver.resolve("link"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        assert await asyncio.wait_for(other, timeout=1) == "stream-of-link"
+        assert cancelled.cancelled()
+
+    async def test_lookup_without_callers_is_dropped_if_not_started(self, slow_resolve_mock):
+        resolver = StreamResolver(resolve_fn=slow_resolve_mock, max_workers=1)
+        running = asyncio.ensure_future(resolver.resolve("link-1"))
+        queued = asyncio.ensure_future(resolver.resolve("link-2"))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await running
+        await asyncio.sleep(0.1)
+        slow_resolve_mock.assert_called_once_with("link-1")
+        assert resolver._in_flight == {}
+
+    async def test_errors_are_raised_for_every_caller(self):
+        resolver = StreamResolver(resolve_fn=MagicMock(side_effect=ValueError))
+        results = await asyncio.gather(resolver.resolve("link"), resolver.resolve("link"), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_stream_resolver_is_shared_by_the_process(self):
+        assert get_stream_resolver() is get_stream_resolver()
@@ -59,6 +59,15 @@ class TestTrackList:
         track_list = TrackList(minimal_track_list_config)
         assert track_list.shuffle is False
 
+    def test_crossfade_is_none_by_default(self, minimal_track_list_config):
+        track_list = TrackList(minimal_track_list_config)
+        assert track_list.crossfade is None
+
+    def test_crossfade_in_config(self, minimal_track_list_config):
+        minimal_track_list_config["crossfade"] = 3
+        track_list = TrackList(minimal_track_list_config)
+        assert track_list.crossfade == 3.0
+
     def test_tracks_are_shuffled_if_shuffle_is_set(self, minimal_track_list_config, monkeypatch):
         minimal_track_list_config["tracks"] = ["some-filename.mp3", "other-filename.mp3"]
         random_mock = MagicMock()
@@ -1,13 +1,18 @@
 import asyncio
+import gzip
 import json
 from unittest.mock import MagicMock
 
+import aiohttp
+import aiohttp_jinja2
+import msgpack
 import pytest
 from asynctest import CoroutineMock
 
 from src.music import MusicManager
 from src.server import Server
 from src.sound import SoundManager
+from src.websocket import binary_protocol
 
 
 class TestServer:
@@ -26,7 +31,7 @@ class TestServer:
         return config_file
 
     @pytest.fixture
-    def minimal_server(self, minimal_server_config_file):
+    def minimal_server(self, stream_cache_files, minimal_server_config_file):
         return Server(config_path=minimal_server_config_file, host="127.0.0.1", port=8080)
 
     @pytest.fixture
@@ -36,7 +41,7 @@ class TestServer:
         return client
 
     @pytest.fixture
-    def patched_example_server(self, example_config_str, tmp_path, monkeypatch):
+    def patched_example_server(self, stream_cache_files, example_config_str, tmp_path, monkeypatch):
         example_config_file = tmp_path / "config.yaml"
         example_config_file.write_text(example_config_str)
         monkeypatch.setattr(MusicManager, "_play_track", CoroutineMock())
@@ -53,6 +58,12 @@ class TestServer:
         client = await aiohttp_client(app)
         return client
 
+    async def test_on_startup_is_called_when_app_starts(self, minimal_server, aiohttp_client):
+        on_startup_mock = CoroutineMock()
+        app = await minimal_server._init_app(on_startup=[on_startup_mock])
+        await aiohttp_client(app)
+        on_startup_mock.assert_awaited_once_with(app)
+
     def test_minimal_server_configures_music(self, minimal_server):
         minimal_music_config = {"volume": 0.2, "groups": []}
         assert minimal_server.music == MusicManager(minimal_music_config)
@@ -65,10 +76,116 @@ class TestServer:
         resp = await minimal_client.get("/")
         assert resp.status == 200
 
+    async def test_index_is_rendered_once_per_state_version(self, minimal_client, monkeypatch):
+        render_mock = MagicMock(wraps=aiohttp_jinja2.render_string)
+        monkeypatch.setattr("src.server.aiohttp_jinja2.render_string", render_mock)
+        first_resp = await minimal_client.get("/")
+        second_resp = await minimal_client.get("/")
+        assert await first_resp.text() == await second_resp.text()
+        assert render_mock.call_count == 1
+        minimal_client.server.app["event_log"].append({"action": "musicStopped"})
+        third_resp = await minimal_client.get("/")
+        assert render_mock.call_count == 2
+        assert third_resp.headers["ETag"] != first_resp.headers["ETag"]
+
+    async def test_index_is_not_modified_if_etag_matches(self, minimal_client):
+        resp = await minimal_client.get("/")
+        etag = resp.headers["ETag"]
+        assert resp.headers["Cache-Control"] == "no-cache"
+        not_modified_resp = await minimal_client.get("/", headers={"If-None-Match": etag})
+        assert not_modified_resp.status == 304
+        assert not_modified_resp.headers["ETag"] == etag
+        assert await not_modified_resp.read() == b""
+        minimal_client.server.app["event_log"].append({"action": "musicStopped"})
+        modified_resp = await minimal_client.get("/", headers={"If-None-Match": etag})
+        assert modified_resp.status == 200
+
+    async def test_index_uses_cdn_if_assets_are_not_built(self, minimal_client):
+        resp = await minimal_client.get("/")
+        text = await resp.text()
+        assert "https://code.jquery.com/jquery-3.3.1.min.js" in text
+        assert "/static/dist/" not in text
+
+    async def test_built_assets_are_served_precompressed_and_immutable(
+        self, minimal_server, aiohttp_client, tmp_path, monkeypatch
+    ):
+        dist_directory = tmp_path / "dist"
+        dist_directory.mkdir()
+        (dist_directory / "app.0123456789ab.js").write_text("const app = 1;")
+        (dist_directory / "app.0123456789ab.js.gz").write_bytes(gzip.compress(b"const app = 1;"))
+        (dist_directory / "manifest.json").write_text(json.dumps({"app.js": "app.0123456789ab.js", "app.css": "x.css"}))
+        monkeypatch.setattr("src.server.assets.DIST_DIRECTORY", dist_directory)
+        client = await aiohttp_client(await minimal_server._init_app())
+        text = await (await client.get("/")).text()
+        assert '<script src="/static/dist/app.0123456789ab.js"></script>' in text
+        assert "https://code.jquery.com" not in text
+        resp = await client.get("/static/dist/app.0123456789ab.js", headers={"Accept-Encoding": "gzip"})
+        assert resp.status == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "javascript" in resp.headers["Content-Type"]
+        assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert await resp.text() == "const app = 1;"
+        other_resp = await client.get("/static/favicon.ico")
+        assert "immutable" not in other_resp.headers.get("Cache-Control", "")
+
     async def test_client_can_connect_via_websocket_to_server(self, minimal_client):
         ws_resp = await minimal_client.ws_connect("/")
         assert ws_resp.closed is False
 
+    async def test_websocket_is_not_compressed_by_default(self, minimal_client):
+        ws_resp = await minimal_client.ws_connect("/", compress=15)
+        assert ws_resp.compress == 0
+
+    async def test_websocket_is_compressed_if_enabled(self, minimal_server_config_file, aiohttp_client):
+        server = Server(config_path=minimal_server_config_file, host="127.0.0.1", port=8080, compression=True)
+        client = await aiohttp_client(await server._init_app())
+        ws_resp = await client.ws_connect("/", compress=15)
+        assert ws_resp.compress == 15
+
+    async def test_status_returns_number_of_connected_clients(self, minimal_client):
+        resp = await minimal_client.get("/status")
+        assert await resp.json() == {"clients": 0, "version": 0}
+        await minimal_client.ws_connect("/")
+        await minimal_client.ws_connect("/")
+        resp = await minimal_client.get("/status")
+        assert (await resp.json())["clients"] == 2
+
+    async def test_client_that_closes_is_unregistered(self, minimal_client):
+        broadcaster = minimal_client.server.app["broadcaster"]
+        ws_resp = await minimal_client.ws_connect("/")
+        assert broadcaster.client_count == 1
+        await ws_resp.close()
+        await asyncio.sleep(0.05)
+        assert broadcaster.client_count == 0
+
+    async def test_idle_client_is_disconnected(self, minimal_server_config_file, aiohttp_client):
+        server = Server(
+            config_path=minimal_server_config_file, host="127.0.0.1", port=8080, heartbeat=None, idle_timeout=0.1
+        )
+        client = await aiohttp_client(await server._init_app())
+        ws_resp = await client.ws_connect("/")
+        resp = await ws_resp.receive(timeout=1)
+        assert resp.type == aiohttp.WSMsgType.CLOSE
+        await asyncio.sleep(0.05)
+        assert client.server.app["broadcaster"].client_count == 0
+
+    async def test_client_that_does_not_answer_pings_is_disconnected(self, minimal_server_config_file, aiohttp_client):
+        """
+        A client that does not answer the pings with pongs becomes idle. The pings are sent at full seconds, so the
+        idle timeout may expire before the first ping.
+        """
+        server = Server(
+            config_path=minimal_server_config_file, host="127.0.0.1", port=8080, heartbeat=0.1, idle_timeout=1.2
+        )
+        client = await aiohttp_client(await server._init_app())
+        ws_resp = await client.ws_connect("/", autoping=False)
+        resp = await ws_resp.receive(timeout=3)
+        while resp.type == aiohttp.WSMsgType.PING:
+            resp = await ws_resp.receive(timeout=3)
+        assert resp.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED)
+        await asyncio.sleep(0.05)
+        assert client.server.app["broadcaster"].client_count == 0
+
     async def test_client_can_request_music_to_play(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
         play_music_request = {"action": "playMusic", "groupIndex": 0, "trackListIndex": 1}
@@ -80,6 +197,7 @@ class TestServer:
             "trackListIndex": 1,
             "groupName": "Scene 1 - Travel",
             "trackName": "Forest Music",
+            "version": 1,
         }
 
     async def test_client_can_request_music_to_stop(self, patched_example_client, monkeypatch):
@@ -92,14 +210,14 @@ class TestServer:
         stop_music_request = {"action": "stopMusic"}
         await ws_resp.send_str(json.dumps(stop_music_request))
         resp = await ws_resp.receive()
-        assert json.loads(resp.data) == {"action": "musicStopped"}
+        assert json.loads(resp.data) == {"action": "musicStopped", "version": 2}
 
     async def test_client_can_set_music_master_volume(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
         set_music_master_volume_request = {"action": "setMusicMasterVolume", "volume": 75}
         await ws_resp.send_str(json.dumps(set_music_master_volume_request))
         resp = await ws_resp.receive()
-        assert json.loads(resp.data) == {"action": "setMusicMasterVolume", "volume": 75}
+        assert json.loads(resp.data) == {"action": "setMusicMasterVolume", "volume": 75, "version": 1}
 
     async def test_client_can_set_music_volume(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
@@ -111,8 +229,172 @@ class TestServer:
             "groupIndex": 0,
             "trackListIndex": 0,
             "volume": 75,
+            "version": 1,
+        }
+
+    async def test_batch_sends_events_as_one_message(self, patched_example_client):
+        ws_resp = await patched_example_client.ws_connect("/")
+        commands = [
+            {"action": "setSoundMasterVolume", "volume": 0.5},
+            {"action": "playSound", "groupIndex": 0, "soundIndex": 0},
+            {"action": "playSound", "groupIndex": 0, "soundIndex": 1},
+        ]
+        await ws_resp.send_str(json.dumps({"action": "batch", "commands": commands}))
+        resp = json.loads((await ws_resp.receive()).data)
+        assert resp["action"] == "batch"
+        events = resp["events"]
+        assert events[0] == {"action": "setSoundMasterVolume", "volume": 0.5, "version": 1}
+        assert {event["soundIndex"] for event in events if event["action"] == "soundPlaying"} == {0, 1}
+        assert [event["version"] for event in events] == list(range(1, len(events) + 1))
+        assert resp["version"] == events[-1]["version"]
+
+    async def test_batch_does_not_delay_events_of_other_requests(self, patched_example_server, aiohttp_client):
+        sounds_started = asyncio.Event()
+        release_sounds = asyncio.Event()
+
+        async def play_sounds(request, sounds):
+            sounds_started.set()
+            await release_sounds.wait()
+
+        patched_example_server.sound.play_sounds = play_sounds
+        client = await aiohttp_client(await patched_example_server._init_app())
+        ws_resp = await client.ws_connect("/")
+        other_ws_resp = await client.ws_connect("/")
+        commands = [
+            {"action": "setSoundMasterVolume", "volume": 0.5},
+            {"action": "playSound", "groupIndex": 0, "soundIndex": 0},
+        ]
+        await ws_resp.send_str(json.dumps({"action": "batch", "commands": commands}))
+        await sounds_started.wait()
+        await other_ws_resp.send_str(json.dumps({"action": "setMusicMasterVolume", "volume": 10}))
+        resp = json.loads((await ws_resp.receive(timeout=1)).data)
+        assert resp == {"action": "setMusicMasterVolume", "volume": 10, "version": 1}
+        release_sounds.set()
+        resp = json.loads((await ws_resp.receive(timeout=1)).data)
+        assert resp == {
+            "action": "batch",
+            "events": [{"action": "setSoundMasterVolume", "volume": 0.5, "version": 2}],
+            "version": 2,
         }
 
+    @pytest.mark.parametrize(
+        "invalid_command",
+        [
+            {"action": "playSound", "groupIndex": 42, "soundIndex": 0},
+            {"action": "unknown"},
+            {"action": "sync", "epoch": "epoch", "version": 0},
+            {"action": "batch", "commands": [{"action": "stopMusic"}]},
+            "stopMusic",
+        ],
+    )
+    async def test_batch_with_invalid_command_is_dropped(self, patched_example_client, invalid_command):
+        ws_resp = await patched_example_client.ws_connect("/")
+        commands = [{"action": "setSoundMasterVolume", "volume": 0.5}, invalid_command]
+        await ws_resp.send_str(json.dumps({"action": "batch", "commands": commands}))
+        await ws_resp.send_str(json.dumps({"action": "batch", "commands": []}))
+        await ws_resp.send_str(json.dumps({"action": "setSoundMasterVolume", "volume": 0.25}))
+        resp = json.loads((await ws_resp.receive()).data)
+        assert resp == {"action": "setSoundMasterVolume", "volume": 0.25, "version": 1}
+
+    async def test_malformed_messages_are_dropped(self, patched_example_client):
+        """
+        Malformed messages must neither close the connection nor affect the following messages.
+        """
+        ws_resp = await patched_example_client.ws_connect("/")
+        await ws_resp.send_str("this is not json")
+        await ws_resp.send_str(json.dumps(["playSound", 0, 0]))
+        await ws_resp.send_str(json.dumps({"action": "unknown"}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": "first", "soundIndex": 0}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": 42, "soundIndex": 0}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": -1, "soundIndex": 0}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": 0}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": 0, "soundIndex": 0}))
+        resp = await ws_resp.receive()
+        assert json.loads(resp.data)["action"] == "soundPlaying"
+        assert ws_resp.closed is False
+
+    async def test_metrics_count_messages(self, patched_example_client):
+        ws_resp = await patched_example_client.ws_connect("/")
+        await ws_resp.send_str("this is not json")
+        await ws_resp.send_str(json.dumps({"action": "unknown"}))
+        await ws_resp.send_str(json.dumps({"action": "playSound", "groupIndex": 0, "soundIndex": 0}))
+        await ws_resp.receive()
+        await asyncio.sleep(0.05)  # the message is counted after the handler returned
+        resp = await patched_example_client.get("/metrics")
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        samples = dict(line.rsplit(" ", 1) for line in (await resp.text()).splitlines() if not line.startswith("#"))
+        assert samples['dndj_websocket_messages_total{action="playSound"}'] == "1"
+        assert samples['dndj_websocket_messages_total{action="stopSound"}'] == "0"
+        assert samples["dndj_websocket_messages_dropped_total"] == "2"
+        assert samples["dndj_message_handling_seconds_count"] == "3"
+        assert int(samples["dndj_broadcast_seconds_count"]) >= 1  # the sound may have finished already
+        assert samples["dndj_websocket_clients"] == "1"
+        assert "dndj_active_sounds" in samples
+        assert samples["dndj_stream_cache_hits_total"] == "0"
+        assert samples["dndj_stream_cache_misses_total"] == "0"
+
+    async def test_client_can_use_binary_protocol(self, patched_example_client):
+        ws_resp = await patched_example_client.ws_connect("/", protocols=(binary_protocol.SUBPROTOCOL,))
+        assert ws_resp.protocol == binary_protocol.SUBPROTOCOL
+        await ws_resp.send_bytes(msgpack.packb([0, 0, 1]))  # playMusic
+        resp = await ws_resp.receive()
+        assert msgpack.unpackb(resp.data, raw=False) == [0, 0, 1, "Scene 1 - Travel", "Forest Music", 1]
+
+    async def test_json_clients_receive_json_when_binary_clients_are_connected(self, patched_example_client):
+        binary_ws_resp = await patched_example_client.ws_connect("/", protocols=(binary_protocol.SUBPROTOCOL,))
+        json_ws_resp = await patched_example_client.ws_connect("/")
+        assert json_ws_resp.protocol is None
+        await json_ws_resp.send_str(json.dumps({"action": "setMusicMasterVolume", "volume": 75}))
+        json_resp = await json_ws_resp.receive()
+        binary_resp = await binary_ws_resp.receive()
+        assert json.loads(json_resp.data) == {"action": "setMusicMasterVolume", "volume": 75, "version": 1}
+        assert msgpack.unpackb(binary_resp.data, raw=False) == [3, 75, 1]
+
+    async def test_malformed_binary_messages_are_dropped(self, patched_example_client):
+        ws_resp = await patched_example_client.ws_connect("/", protocols=(binary_protocol.SUBPROTOCOL,))
+        await ws_resp.send_bytes(b"\xc1")
+        await ws_resp.send_bytes(msgpack.packb([99, 0, 0]))
+        await ws_resp.send_bytes(msgpack.packb([4, 0]))
+        await ws_resp.send_bytes(msgpack.packb([4, 0, 0]))  # playSound
+        resp = await ws_resp.receive()
+        assert msgpack.unpackb(resp.data, raw=False)[0] == 5  # soundPlaying
+        assert ws_resp.closed is False
+
+    async def test_index_contains_state_version(self, patched_example_client):
+        event_log = patched_example_client.server.app["event_log"]
+        resp = await patched_example_client.get("/")
+        text = await resp.text()
+        assert f'data-epoch="{event_log.epoch}"' in text
+        assert 'data-version="0"' in text
+
+    async def test_client_can_sync_missed_events(self, patched_example_client):
+        event_log = patched_example_client.server.app["event_log"]
+        ws_resp = await patched_example_client.ws_connect("/")
+        await ws_resp.send_str(json.dumps({"action": "setMusicMasterVolume", "volume": 75}))
+        await ws_resp.send_str(json.dumps({"action": "setSoundMasterVolume", "volume": 0.25}))
+        await ws_resp.receive()
+        await ws_resp.receive()
+        reconnected_ws_resp = await patched_example_client.ws_connect("/")
+        await reconnected_ws_resp.send_str(json.dumps({"action": "sync", "epoch": event_log.epoch, "version": 1}))
+        resp = await reconnected_ws_resp.receive()
+        assert json.loads(resp.data) == {"action": "setSoundMasterVolume", "volume": 0.25, "version": 2}
+
+    async def test_client_receives_snapshot_if_missed_events_are_not_available(self, patched_example_client):
+        event_log = patched_example_client.server.app["event_log"]
+        ws_resp = await patched_example_client.ws_connect("/")
+        await ws_resp.send_str(json.dumps({"action": "setMusicMasterVolume", "volume": 75}))
+        await ws_resp.receive()
+        await ws_resp.send_str(json.dumps({"action": "sync", "epoch": "restarted", "version": 0}))
+        resp = await ws_resp.receive()
+        snapshot = json.loads(resp.data)
+        assert snapshot["action"] == "snapshot"
+        assert snapshot["epoch"] == event_log.epoch
+        assert snapshot["version"] == 1
+        assert snapshot["musicVolume"] == 75
+        assert snapshot["nowPlaying"] is None
+        assert snapshot["sounds"][0][0] == [1, 1, "0"]
+        assert snapshot["soundsPlaying"] == []
+
     async def test_client_can_request_sound_to_play(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
         play_sound_request = {"action": "playSound", "groupIndex": 0, "soundIndex": 0}
@@ -127,6 +409,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "0",
+            "version": 1,
         }
 
     async def test_client_is_notified_when_sound_finishes(self, patched_example_client):
@@ -144,6 +427,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "0",
+            "version": 2,
         }
 
     async def test_client_can_request_sound_to_stop(self, patched_example_client, monkeypatch):
@@ -165,6 +449,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "0",
+            "version": 2,
         }
 
     async def test_client_can_request_sound_to_stop_that_is_waiting_for_next_repeat(
@@ -196,6 +481,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 0,
             "repeatDelay": "42000",  # Remember that repeat_delay was set
+            "version": 2,
         }
 
     async def test_client_can_set_sound_master_volume(self, patched_example_client):
@@ -203,7 +489,7 @@ class TestServer:
         set_sound_master_volume_request = {"action": "setSoundMasterVolume", "volume": 0.25}
         await ws_resp.send_str(json.dumps(set_sound_master_volume_request))
         resp = await ws_resp.receive()
-        assert json.loads(resp.data) == {"action": "setSoundMasterVolume", "volume": 0.25}
+        assert json.loads(resp.data) == {"action": "setSoundMasterVolume", "volume": 0.25, "version": 1}
 
     async def test_client_can_set_sound_volume(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
@@ -219,8 +505,23 @@ class TestServer:
             "volume": 0.25,
             "repeatCount": 1,
             "repeatDelay": "0",
+            "version": 1,
         }
 
+    async def test_bursts_of_sound_volume_commands_are_coalesced(self, patched_example_client):
+        """
+        The first command of a burst is applied immediately and the last one after the coalesce window. The commands
+        in between are dropped (last write wins).
+        """
+        ws_resp = await patched_example_client.ws_connect("/")
+        for volume in [0.1, 0.2, 0.3, 0.4, 0.5]:
+            set_sound_volume_request = {"action": "setSoundVolume", "groupIndex": 0, "soundIndex": 0, "volume": volume}
+            await ws_resp.send_str(json.dumps(set_sound_volume_request))
+        first_resp = await ws_resp.receive()
+        second_resp = await ws_resp.receive()
+        assert json.loads(first_resp.data)["volume"] == 0.1
+        assert json.loads(second_resp.data)["volume"] == 0.5
+
     async def test_client_can_set_sound_repeat_count(self, patched_example_client):
         ws_resp = await patched_example_client.ws_connect("/")
         set_sound_repeat_count_request = {
@@ -240,6 +541,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 42,
             "repeatDelay": "0",
+            "version": 1,
         }
 
     async def test_client_can_set_sound_repeat_delay_to_single_number(self, patched_example_client):
@@ -261,6 +563,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "24",
+            "version": 1,
         }
 
     async def test_client_can_set_sound_repeat_delay_to_interval(self, patched_example_client):
@@ -282,6 +585,7 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "24-42",
+            "version": 1,
         }
 
     async def test_client_cannot_set_sound_repeat_delay_to_invalid_value(self, patched_example_client):
@@ -303,4 +607,5 @@ class TestServer:
             "volume": 1,
             "repeatCount": 1,
             "repeatDelay": "0",  # Nothing changed!
+            "version": 1,
         }
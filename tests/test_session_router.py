@@ -0,0 +1,77 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from asynctest import CoroutineMock
+
+from src.music import MusicManager
+from src.server import Server
+from src.session_router import SessionRouter
+from src.sound import SoundManager
+
+
+class TestSessionRouter:
+    @pytest.fixture
+    def patched_servers(self, example_config_str, tmp_path, monkeypatch):
+        example_config_file = tmp_path / "config.yaml"
+        example_config_file.write_text(example_config_str)
+        monkeypatch.setattr(MusicManager, "_play_track", CoroutineMock())
+        monkeypatch.setattr(SoundManager, "_play_sound_file", CoroutineMock())
+        with monkeypatch.context() as m:
+            m.setattr("src.music.music_manager.MusicChecker", MagicMock())
+            m.setattr("src.sound.sound_manager.SoundChecker", MagicMock())
+            return {
+                name: Server(config_path=example_config_file, host="127.0.0.1", port=8080)
+                for name in ("table", "table-2")
+            }
+
+    @pytest.fixture
+    async def client(self, patched_servers, aiohttp_client):
+        router = SessionRouter(patched_servers, host="127.0.0.1", port=8080)
+        return await aiohttp_client(await router._init_app())
+
+    def test_invalid_session_name_raises_value_error(self, patched_servers):
+        with pytest.raises(ValueError):
+            SessionRouter({"table/1": patched_servers["table"]}, host="127.0.0.1", port=8080)
+
+    async def test_on_startup_is_called_once_when_app_starts(self, patched_servers, aiohttp_client):
+        on_startup_mock = CoroutineMock()
+        router = SessionRouter(patched_servers, host="127.0.0.1", port=8080)
+        app = await router._init_app(on_startup=[on_startup_mock])
+        await aiohttp_client(app)
+        on_startup_mock.assert_awaited_once_with(app)
+
+    async def test_index_lists_sessions(self, client):
+        resp = await client.get("/")
+        text = await resp.text()
+        assert 'href="/s/table/"' in text
+        assert 'href="/s/table-2/"' in text
+
+    async def test_session_without_trailing_slash_is_redirected(self, client):
+        resp = await client.get("/s/table?protocol=msgpack", allow_redirects=False)
+        assert resp.status == 302
+        assert resp.headers["Location"] == "/s/table/?protocol=msgpack"
+
+    async def test_sessions_serve_their_page_and_share_static_files(self, client):
+        for path in ("/s/table/", "/s/table-2/"):
+            resp = await client.get(path)
+            assert resp.status == 200
+            assert "Forest Music" in await resp.text()
+        resp = await client.get("/static/css/base.css")
+        assert resp.status == 200
+        resp = await client.get("/s/table/static/css/base.css")
+        assert resp.status == 404
+
+    async def test_broadcasts_stay_within_their_session(self, client):
+        ws_table = await client.ws_connect("/s/table/")
+        ws_table_2 = await client.ws_connect("/s/table-2/")
+        await ws_table_2.send_str(json.dumps({"action": "playMusic", "groupIndex": 0, "trackListIndex": 1}))
+        resp = await ws_table_2.receive(timeout=1)
+        assert json.loads(resp.data)["action"] == "nowPlaying"
+        with pytest.raises(asyncio.TimeoutError):
+            await ws_table.receive(timeout=0.1)
+        resp = await client.get("/s/table-2/status")
+        assert (await resp.json())["version"] > 0
+        resp = await client.get("/s/table/status")
+        assert await resp.json() == {"clients": 1, "version": 0}
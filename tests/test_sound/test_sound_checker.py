@@ -1,5 +1,6 @@
 import os
 import platform
+import shutil
 from unittest.mock import MagicMock, call
 
 import pytest
@@ -148,3 +149,21 @@ class TestSoundChecker:
         convert_file_mock.assert_not_called()
         assert sound_file.file == converted_file_path
         os.remove(converted_file_path)
+
+    def test_convert_incompatible_wav_files_probes_shared_files_once(self, tmp_path, monkeypatch):
+        """
+        Test that a file that several instances check, e.g., for several sessions, is only probed once unless it
+        changes.
+        """
+        sound_file_path = tmp_path / "sound.wav"
+        shutil.copy("tests/_resources/supported_format.wav", sound_file_path)
+        mediainfo_mock = MagicMock(return_value={"format_name": "wav", "sample_fmt": "s16"})
+        monkeypatch.setattr("src.sound.sound_checker.mediainfo", mediainfo_mock)
+        group = SoundGroup({"name": "Group", "sounds": [{"name": "Sound", "files": ["sound.wav"]}]})
+        SoundChecker([group], str(tmp_path)).convert_incompatible_wav_files()
+        SoundChecker([group], str(tmp_path)).convert_incompatible_wav_files()
+        assert mediainfo_mock.call_count == 1
+        with open(sound_file_path, "ab") as sound_file:
+            sound_file.write(b"\0\0")
+        SoundChecker([group], str(tmp_path)).convert_incompatible_wav_files()
+        assert mediainfo_mock.call_count == 2
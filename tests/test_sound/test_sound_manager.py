@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, call
 import pytest
 from asynctest import CoroutineMock
 
-from src.sound import SoundGroup, SoundManager, utils
+from src.sound import SoundActions, SoundGroup, SoundManager, utils
 
 
 class TestSoundManager:
@@ -157,6 +157,20 @@ class TestSoundManager:
         assert sleep_mock.await_count == 3
         sleep_mock.assert_has_awaits([call(42 / 1000.0), call(42 / 1000.0), call(42 / 1000.0)])
 
+    async def test_play_sounds_starts_sounds_together(self, example_sound_manager, monkeypatch):
+        """
+        Test that `play_sounds()` creates the tasks for all sounds (every sound once) before it returns to the event
+        loop only once.
+        """
+        sleep_mock = CoroutineMock()
+        register_sound_mock = MagicMock()
+        monkeypatch.setattr("src.sound.sound_manager.asyncio.sleep", sleep_mock)
+        monkeypatch.setattr(example_sound_manager.tracker, "register_sound", register_sound_mock)
+        monkeypatch.setattr(example_sound_manager, "_play_repeating_sound", CoroutineMock())
+        await example_sound_manager.play_sounds(MagicMock(), [(0, 0), (0, 1), (0, 0)])
+        assert [call_args[0][:2] for call_args in register_sound_mock.call_args_list] == [(0, 0), (0, 1)]
+        sleep_mock.assert_awaited_once_with(0)
+
     async def test_play_sound_uses_correct_file_path(self, example_sound_manager, monkeypatch):
         """
         Test that the `_play_sound()` method instantiates the `pygame.mixer.Sound` with the file path of the sound file
@@ -251,6 +265,19 @@ class TestSoundManager:
         ]
         assert sound_instance_mock.mock_calls == expected_calls
 
+    async def test_play_sound_file_observes_play_latency_once(self, example_sound_manager, monkeypatch):
+        """
+        Test that the time from `play_sound()` to the start of the playback is recorded, but not for repetitions.
+        """
+        monkeypatch.setattr("src.sound.sound_manager.pygame.mixer.Sound", MagicMock())
+        monkeypatch.setattr("src.sound.sound_manager.asyncio.sleep", CoroutineMock())
+        monkeypatch.setattr(example_sound_manager.tracker, "register_sound", MagicMock())
+        monkeypatch.setattr(example_sound_manager, "_play_repeating_sound", CoroutineMock())
+        await example_sound_manager.play_sound(MagicMock(), 0, 0)
+        await example_sound_manager._play_sound_file(0, 0)
+        await example_sound_manager._play_sound_file(0, 0)
+        assert sum(example_sound_manager.play_latency.counts) == 1
+
     async def test_set_master_volume(self, example_sound_manager):
         example_sound_manager.volume = 1
         await example_sound_manager.set_master_volume(request=MagicMock(), volume=0)
@@ -302,6 +329,30 @@ class TestSoundManager:
         assert currently_playing[1].sound_name == example_sound_manager.groups[0].sounds[1].name
         await asyncio.gather(dummy_task_one, dummy_task_two)
 
+    @pytest.mark.parametrize("cancel", [False, True])
+    async def test_sound_is_not_playing_when_it_reports_finish_or_stop(self, example_sound_manager, cancel):
+        """
+        Test that a sound is no longer listed by `currently_playing` when it reports that it finished or stopped, such
+        that the state that is rendered along with the report is up to date.
+        """
+        playing_on_callback = {}
+
+        async def callback(action, request, sound_info, master_volume):
+            playing_on_callback[action] = [info.sound_index for info in example_sound_manager.currently_playing]
+
+        example_sound_manager.callback_handler.callback_fn = callback
+        example_sound_manager._play_sound_file = CoroutineMock(side_effect=lambda *args: asyncio.sleep(0.05))
+        await example_sound_manager.play_sound(MagicMock(), 0, 0)
+        if cancel:
+            await example_sound_manager.cancel_sound(0, 0)
+        else:
+            await asyncio.sleep(0.1)
+        assert playing_on_callback == {
+            SoundActions.START: [0],
+            SoundActions.STOP if cancel else SoundActions.FINISH: [],
+        }
+        assert example_sound_manager.currently_playing == []
+
     async def test_set_sound_repeat_count(self, example_sound_manager):
         group = example_sound_manager.groups[0]
         sound = group.sounds[0]
@@ -41,6 +41,27 @@ class TestSoundTracker:
         with pytest.raises(RuntimeError):
             tracker._unregister_sound(0, 1, None)
 
+    async def test_unregister_sound_before_task_is_done(self, loop):
+        tracker = SoundTracker()
+        task = loop.create_task(asyncio.sleep(0.001))
+        tracker.register_sound(0, 1, task)
+        tracker.unregister_sound(0, 1, task)
+        assert tracker._get_sound_key(0, 1) not in tracker.sound_to_task
+        await task
+
+    async def test_unregister_sound_keeps_task_of_restarted_sound(self, loop):
+        tracker = SoundTracker()
+        finishing_task = loop.create_task(asyncio.sleep(0.001))
+        tracker.register_sound(0, 1, finishing_task)
+        tracker.unregister_sound(0, 1, finishing_task)
+        restarted_task = loop.create_task(asyncio.sleep(0.01))
+        tracker.register_sound(0, 1, restarted_task)
+        tracker.unregister_sound(0, 1, finishing_task)
+        await finishing_task
+        assert tracker.sound_to_task[tracker._get_sound_key(0, 1)] == restarted_task
+        await restarted_task
+        assert tracker._get_sound_key(0, 1) not in tracker.sound_to_task
+
     async def test_cancel_sound_cancels_task(self, loop):
         tracker = SoundTracker()
         task = loop.create_task(asyncio.sleep(0.001))
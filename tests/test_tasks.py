@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from src.tasks import cancel_and_wait
+
+
+class TestCancelAndWait:
+    async def test_cancels_task_and_waits_until_done(self):
+        cleaned_up = []
+
+        async def play():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                await asyncio.sleep(0.01)
+                cleaned_up.append(True)
+
+        task = asyncio.ensure_future(play())
+        await asyncio.sleep(0)
+        assert await cancel_and_wait(task, timeout=1, description="play")
+        assert task.cancelled()
+        assert cleaned_up == [True]
+
+    async def test_returns_immediately_if_task_is_done(self):
+        task = asyncio.ensure_future(asyncio.sleep(0))
+        await task
+        assert await asyncio.wait_for(cancel_and_wait(task, timeout=1, description="done"), timeout=0.1)
+
+    async def test_logs_stack_of_stuck_task(self, caplog):
+        async def swallow_cancellation():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(swallow_cancellation())
+        await asyncio.sleep(0)
+        with caplog.at_level(logging.WARNING):
+            assert not await cancel_and_wait(task, timeout=0.01, description="stuck")
+        assert not task.done()
+        assert "Task for stuck did not finish within 0.01 seconds" in caplog.text
+        assert "swallow_cancellation" in caplog.text
+        task.cancel()
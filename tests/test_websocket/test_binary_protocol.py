@@ -0,0 +1,78 @@
+import json
+
+import msgpack
+import pytest
+
+from src.websocket import binary_protocol
+
+
+class TestBinaryProtocol:
+    def test_encode_orders_values_by_fields(self):
+        message = {"action": "setTrackListVolume", "volume": 75, "trackListIndex": 1, "groupIndex": 0, "version": 7}
+        assert msgpack.unpackb(binary_protocol.encode(message), raw=False) == [4, 0, 1, 75, 7]
+
+    def test_encode_without_fields(self):
+        assert msgpack.unpackb(binary_protocol.encode({"action": "resync"}), raw=False) == [12]
+
+    def test_encode_raises_key_error_for_unknown_action(self):
+        with pytest.raises(KeyError):
+            binary_protocol.encode({"action": "unknown"})
+
+    def test_encoded_message_is_smaller_than_json(self):
+        message = {
+            "action": "soundPlaying",
+            "groupIndex": 3,
+            "soundIndex": 12,
+            "groupName": "Scene 4 - The Haunted Mill",
+            "soundName": "Creaking Floorboards",
+            "volume": 0.75,
+            "repeatCount": 0,
+            "repeatDelay": "2000-8000",
+            "version": 1234,
+        }
+        assert len(binary_protocol.encode(message)) < len(json.dumps(message)) / 2
+
+    def test_decode_returns_same_dict_as_json_protocol(self):
+        data = msgpack.packb([7, 1, 2, 0.5])
+        assert binary_protocol.decode(data) == {
+            "action": "setSoundVolume",
+            "groupIndex": 1,
+            "soundIndex": 2,
+            "volume": 0.5,
+        }
+
+    def test_encode_and_decode_batch(self):
+        message = {
+            "action": "batch",
+            "events": [
+                {"action": "musicStopped", "version": 4},
+                {"action": "setSoundMasterVolume", "volume": 0.5, "version": 5},
+            ],
+            "version": 5,
+        }
+        assert msgpack.unpackb(binary_protocol.encode(message), raw=False) == [14, [[1, 4], [8, 0.5, 5]], 5]
+        data = msgpack.packb([11, [[1], [4, 0, 2]]])
+        assert binary_protocol.decode(data) == {
+            "action": "batch",
+            "commands": [{"action": "stopMusic"}, {"action": "playSound", "groupIndex": 0, "soundIndex": 2}],
+        }
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"\xc1",
+            msgpack.packb(5),
+            msgpack.packb([]),
+            msgpack.packb([99]),
+            msgpack.packb([-1]),
+            msgpack.packb(["playMusic", 0, 0]),
+            msgpack.packb([0, 1]),
+            msgpack.packb([0, 1, 2, 3]),
+            msgpack.packb([11, 5]),
+            msgpack.packb([11, [[0, 1]]]),
+        ],
+    )
+    def test_decode_raises_value_error_if_malformed(self, data):
+        with pytest.raises(ValueError):
+            binary_protocol.decode(data)
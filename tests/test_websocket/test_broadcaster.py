@@ -0,0 +1,170 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import msgpack
+from asynctest import CoroutineMock
+
+from src.websocket import Broadcaster, OverflowPolicy
+
+
+class TestBroadcaster:
+    def _ws_mock(self, send_str=None):
+        ws = MagicMock()
+        ws.send_str = send_str if send_str is not None else CoroutineMock()
+        ws.send_bytes = CoroutineMock()
+        ws.close = CoroutineMock()
+        return ws
+
+    async def test_register_and_unregister(self):
+        broadcaster = Broadcaster()
+        ws = self._ws_mock()
+        broadcaster.register("client", ws)
+        assert list(broadcaster.clients.keys()) == ["client"]
+        assert broadcaster.clients["client"].ws == ws
+        broadcaster.unregister("client")
+        assert broadcaster.clients == {}
+
+    def test_unregister_does_nothing_if_not_registered(self):
+        broadcaster = Broadcaster()
+        broadcaster.unregister("unknown")
+        assert broadcaster.clients == {}
+
+    async def test_broadcast_sends_to_every_client(self):
+        broadcaster = Broadcaster()
+        ws_1 = self._ws_mock()
+        ws_2 = self._ws_mock()
+        broadcaster.register("client-1", ws_1)
+        broadcaster.register("client-2", ws_2)
+        broadcaster.broadcast({"action": "musicStopped"})
+        await asyncio.sleep(0.01)  # sending happens in the writer tasks
+        ws_1.send_str.assert_awaited_once_with('{"action": "musicStopped"}')
+        ws_2.send_str.assert_awaited_once_with('{"action": "musicStopped"}')
+        await broadcaster.close()
+
+    async def test_broadcast_serializes_message_once(self, monkeypatch):
+        broadcaster = Broadcaster()
+        dumps_mock = MagicMock(return_value="frame")
+        monkeypatch.setattr("src.websocket.broadcaster.json.dumps", dumps_mock)
+        clients = [self._ws_mock() for _ in range(10)]
+        for i, ws in enumerate(clients):
+            broadcaster.register(f"client-{i}", ws)
+        broadcaster.broadcast({"action": "musicStopped"})
+        await asyncio.sleep(0.01)  # sending happens in the writer tasks
+        dumps_mock.assert_called_once_with({"action": "musicStopped"})
+        for ws in clients:
+            ws.send_str.assert_awaited_once_with("frame")
+        await broadcaster.close()
+
+    async def test_broadcast_serializes_message_once_per_protocol(self, monkeypatch):
+        broadcaster = Broadcaster()
+        encode_mock = MagicMock(return_value=b"frame")
+        monkeypatch.setattr("src.websocket.broadcaster.binary_protocol.encode", encode_mock)
+        json_ws = self._ws_mock()
+        binary_clients = [self._ws_mock() for _ in range(3)]
+        broadcaster.register("json", json_ws)
+        for i, ws in enumerate(binary_clients):
+            broadcaster.register(f"binary-{i}", ws, binary=True)
+        broadcaster.broadcast({"action": "musicStopped"})
+        await asyncio.sleep(0.01)
+        encode_mock.assert_called_once_with({"action": "musicStopped"})
+        json_ws.send_str.assert_awaited_once_with('{"action": "musicStopped"}')
+        json_ws.send_bytes.assert_not_awaited()
+        for ws in binary_clients:
+            ws.send_bytes.assert_awaited_once_with(b"frame")
+            ws.send_str.assert_not_awaited()
+        await broadcaster.close()
+
+    async def test_broadcast_does_not_wait_for_slow_clients(self):
+        broadcaster = Broadcaster()
+        slow_send_str = CoroutineMock(side_effect=lambda _: asyncio.sleep(1))
+        broadcaster.register("slow", self._ws_mock(send_str=slow_send_str))
+        fast_ws = self._ws_mock()
+        broadcaster.register("fast", fast_ws)
+        broadcaster.broadcast({"action": "musicStopped"})
+        broadcaster.broadcast({"action": "musicFinished"})
+        await asyncio.sleep(0.01)
+        assert fast_ws.send_str.await_count == 2
+        assert broadcaster.clients["slow"].queue_size == 1  # the first is being sent, the second is waiting
+        await broadcaster.close()
+
+    async def test_client_that_times_out_is_removed(self):
+        broadcaster = Broadcaster(send_timeout=0.01)
+        slow_ws = self._ws_mock(send_str=CoroutineMock(side_effect=lambda _: asyncio.sleep(1)))
+        fast_ws = self._ws_mock()
+        broadcaster.register("slow", slow_ws)
+        broadcaster.register("fast", fast_ws)
+        broadcaster.broadcast({"action": "musicStopped"})
+        await asyncio.sleep(0.05)
+        assert list(broadcaster.clients.keys()) == ["fast"]
+        slow_ws.close.assert_awaited_once()
+        fast_ws.send_str.assert_awaited_once()
+        await broadcaster.close()
+
+    async def test_client_that_fails_is_removed(self):
+        broadcaster = Broadcaster()
+        failing_ws = self._ws_mock(send_str=CoroutineMock(side_effect=ConnectionResetError))
+        broadcaster.register("failing", failing_ws)
+        broadcaster.broadcast({"action": "musicStopped"})
+        await asyncio.sleep(0.01)
+        assert broadcaster.clients == {}
+        failing_ws.close.assert_awaited_once()
+
+    async def test_overflowing_client_is_disconnected_with_disconnect_policy(self):
+        broadcaster = Broadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.DISCONNECT)
+        stalled_ws = self._ws_mock(send_str=CoroutineMock(side_effect=lambda _: asyncio.sleep(1)))
+        broadcaster.register("stalled", stalled_ws)
+        for _ in range(4):  # one is taken by the writer, two are waiting, the fourth overflows
+            broadcaster.broadcast({"action": "musicStopped"})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        assert broadcaster.clients == {}
+        stalled_ws.close.assert_awaited_once()
+
+    async def test_overflowing_client_is_asked_to_resync_with_resync_policy(self):
+        broadcaster = Broadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.RESYNC)
+        stalled_ws = self._ws_mock(send_str=CoroutineMock(side_effect=lambda _: asyncio.sleep(1)))
+        broadcaster.register("stalled", stalled_ws)
+        for _ in range(4):  # one is taken by the writer, two are waiting, the fourth overflows
+            broadcaster.broadcast({"action": "musicStopped"})
+            await asyncio.sleep(0)
+        client = broadcaster.clients["stalled"]
+        assert client.queue_size == 1
+        assert client._queue.get_nowait() == '{"action": "resync"}'
+        await broadcaster.close()
+
+    async def test_overflowing_binary_client_is_asked_to_resync_in_binary(self):
+        broadcaster = Broadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.RESYNC)
+        stalled_ws = self._ws_mock()
+        stalled_ws.send_bytes = CoroutineMock(side_effect=lambda _: asyncio.sleep(1))
+        broadcaster.register("stalled", stalled_ws, binary=True)
+        for _ in range(4):
+            broadcaster.broadcast({"action": "musicStopped", "version": 1})
+            await asyncio.sleep(0)
+        client = broadcaster.clients["stalled"]
+        assert msgpack.unpackb(client._queue.get_nowait(), raw=False) == [12]  # resync
+        await broadcaster.close()
+
+    async def test_send_sends_to_single_client(self):
+        broadcaster = Broadcaster()
+        ws_1 = self._ws_mock()
+        ws_2 = self._ws_mock()
+        broadcaster.register("client-1", ws_1)
+        broadcaster.register("client-2", ws_2, binary=True)
+        broadcaster.send("client-1", {"action": "musicStopped", "version": 1})
+        broadcaster.send("client-2", {"action": "musicStopped", "version": 1})
+        broadcaster.send("unknown", {"action": "musicStopped", "version": 1})
+        await asyncio.sleep(0.01)
+        ws_1.send_str.assert_awaited_once_with('{"action": "musicStopped", "version": 1}')
+        ws_2.send_bytes.assert_awaited_once_with(msgpack.packb([1, 1]))
+        await broadcaster.close()
+
+    async def test_close_closes_every_client(self):
+        broadcaster = Broadcaster()
+        ws_1 = self._ws_mock()
+        ws_2 = self._ws_mock()
+        broadcaster.register("client-1", ws_1)
+        broadcaster.register("client-2", ws_2)
+        await broadcaster.close()
+        assert broadcaster.clients == {}
+        ws_1.close.assert_awaited_once()
+        ws_2.close.assert_awaited_once()
@@ -0,0 +1,36 @@
+from src.websocket import EventLog
+
+
+class TestEventLog:
+    def test_append_stamps_increasing_versions(self):
+        event_log = EventLog()
+        assert event_log.append({"action": "musicStopped"}) == {"action": "musicStopped", "version": 1}
+        assert event_log.append({"action": "musicFinished"}) == {"action": "musicFinished", "version": 2}
+        assert event_log.version == 2
+
+    def test_append_does_not_modify_message(self):
+        message = {"action": "musicStopped"}
+        EventLog().append(message)
+        assert message == {"action": "musicStopped"}
+
+    def test_since_returns_missed_events(self):
+        event_log = EventLog()
+        for volume in range(5):
+            event_log.append({"action": "setMusicMasterVolume", "volume": volume})
+        missed_events = event_log.since(event_log.epoch, 2)
+        assert [event["version"] for event in missed_events] == [3, 4, 5]
+        assert event_log.since(event_log.epoch, 5) == []
+
+    def test_since_returns_none_if_events_were_discarded(self):
+        event_log = EventLog(max_size=3)
+        for volume in range(5):
+            event_log.append({"action": "setMusicMasterVolume", "volume": volume})
+        assert event_log.since(event_log.epoch, 1) is None
+        assert [event["version"] for event in event_log.since(event_log.epoch, 2)] == [3, 4, 5]
+
+    def test_since_returns_none_for_other_epoch_or_unknown_version(self):
+        event_log = EventLog()
+        event_log.append({"action": "musicStopped"})
+        assert event_log.since("other", 0) is None
+        assert event_log.since(event_log.epoch, 2) is None
+        assert event_log.since(event_log.epoch, -1) is None
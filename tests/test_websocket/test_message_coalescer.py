@@ -0,0 +1,60 @@
+import asyncio
+
+from asynctest import CoroutineMock
+
+from src.websocket import MessageCoalescer
+
+
+class TestMessageCoalescer:
+    async def test_applies_immediately_if_window_is_zero(self):
+        coalescer = MessageCoalescer(window=0)
+        apply_mock = CoroutineMock()
+        for _ in range(3):
+            await coalescer.submit("key", apply_mock)
+        assert apply_mock.await_count == 3
+
+    async def test_applies_first_command_immediately(self):
+        coalescer = MessageCoalescer(window=1)
+        apply_mock = CoroutineMock()
+        await coalescer.submit("key", apply_mock)
+        apply_mock.assert_awaited_once()
+        coalescer.close()
+
+    async def test_applies_last_command_of_burst_after_window(self):
+        coalescer = MessageCoalescer(window=0.05)
+        first, second, third = CoroutineMock(), CoroutineMock(), CoroutineMock()
+        await coalescer.submit("key", first)
+        await coalescer.submit("key", second)
+        await coalescer.submit("key", third)
+        first.assert_awaited_once()
+        second.assert_not_awaited()
+        third.assert_not_awaited()
+        await asyncio.sleep(0.1)
+        second.assert_not_awaited()  # replaced by the third command (last write wins)
+        third.assert_awaited_once()
+
+    async def test_different_keys_do_not_coalesce(self):
+        coalescer = MessageCoalescer(window=1)
+        apply_1, apply_2 = CoroutineMock(), CoroutineMock()
+        await coalescer.submit(("setSoundVolume", 0, 0), apply_1)
+        await coalescer.submit(("setSoundVolume", 0, 1), apply_2)
+        apply_1.assert_awaited_once()
+        apply_2.assert_awaited_once()
+        coalescer.close()
+
+    async def test_applies_immediately_again_after_window_passed(self):
+        coalescer = MessageCoalescer(window=0.01)
+        apply_1, apply_2 = CoroutineMock(), CoroutineMock()
+        await coalescer.submit("key", apply_1)
+        await asyncio.sleep(0.02)
+        await coalescer.submit("key", apply_2)
+        apply_2.assert_awaited_once()
+
+    async def test_close_discards_pending_commands(self):
+        coalescer = MessageCoalescer(window=0.01)
+        apply_1, apply_2 = CoroutineMock(), CoroutineMock()
+        await coalescer.submit("key", apply_1)
+        await coalescer.submit("key", apply_2)
+        coalescer.close()
+        await asyncio.sleep(0.02)
+        apply_2.assert_not_awaited()
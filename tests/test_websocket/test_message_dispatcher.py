@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock
+
+from asynctest import CoroutineMock
+
+from src.websocket import MessageDispatcher
+
+
+class TestMessageDispatcher:
+    async def test_dispatch_calls_handler_with_coerced_fields(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("playSound", handler_mock, fields=(("groupIndex", int), ("soundIndex", int)))
+        request = MagicMock()
+        await dispatcher.dispatch(request, {"action": "playSound", "groupIndex": "1", "soundIndex": 2})
+        handler_mock.assert_awaited_once_with(request, 1, 2)
+
+    async def test_dispatch_calls_handler_without_fields(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("stopMusic", handler_mock)
+        request = MagicMock()
+        await dispatcher.dispatch(request, {"action": "stopMusic"})
+        handler_mock.assert_awaited_once_with(request)
+
+    def test_parse_returns_handler_and_coerced_fields(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("playSound", handler_mock, fields=(("groupIndex", int), ("soundIndex", int)))
+        action_handler, values = dispatcher.parse({"action": "playSound", "groupIndex": "1", "soundIndex": 2})
+        assert action_handler.action == "playSound"
+        assert action_handler.handler is handler_mock
+        assert values == (1, 2)
+        assert dispatcher.parse({"action": "playSound", "groupIndex": 1}) is None
+        handler_mock.assert_not_awaited()
+
+    def test_dispatch_drops_unknown_action(self):
+        dispatcher = MessageDispatcher()
+        assert dispatcher.dispatch(MagicMock(), {"action": "unknown"}) is None
+        assert dispatcher.dispatch(MagicMock(), {}) is None
+
+    def test_dispatch_drops_message_with_missing_field(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("playSound", handler_mock, fields=(("groupIndex", int), ("soundIndex", int)))
+        assert dispatcher.dispatch(MagicMock(), {"action": "playSound", "groupIndex": 0}) is None
+        handler_mock.assert_not_awaited()
+
+    def test_dispatch_drops_message_with_value_that_cannot_be_coerced(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("setSoundMasterVolume", handler_mock, fields=(("volume", float),))
+        assert dispatcher.dispatch(MagicMock(), {"action": "setSoundMasterVolume", "volume": "loud"}) is None
+        assert dispatcher.dispatch(MagicMock(), {"action": "setSoundMasterVolume", "volume": None}) is None
+        handler_mock.assert_not_awaited()
+
+    def test_dispatch_drops_message_with_value_of_wrong_shape(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("playSound", handler_mock, fields=(("groupIndex", int), ("soundIndex", int)))
+        assert dispatcher.dispatch(MagicMock(), {"action": "playSound", "groupIndex": [1], "soundIndex": 0}) is None
+        assert dispatcher.dispatch(MagicMock(), {"action": "playSound", "groupIndex": "1.5", "soundIndex": 0}) is None
+        assert dispatcher.dispatch(MagicMock(), {"action": "playSound", "groupIndex": 0, "soundIndex": {}}) is None
+        assert dispatcher.dispatch(MagicMock(), {"action": ["playSound"], "groupIndex": 0, "soundIndex": 0}) is None
+        handler_mock.assert_not_awaited()
+
+    def test_parse_drops_message_that_a_custom_coercion_rejects(self):
+        def parse_commands(commands):
+            if not isinstance(commands, list):
+                raise ValueError("Not a list of commands.")
+            return commands
+
+        dispatcher = MessageDispatcher()
+        dispatcher.register("batch", CoroutineMock(), fields=(("commands", parse_commands),))
+        assert dispatcher.parse({"action": "batch", "commands": "stopMusic"}) is None
+        assert dispatcher.parse({"action": "batch"}) is None
+        _, values = dispatcher.parse({"action": "batch", "commands": [{"action": "stopMusic"}]})
+        assert values == ([{"action": "stopMusic"}],)
+
+    def test_dispatch_drops_message_that_fails_validation(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register(
+            "playSound",
+            handler_mock,
+            fields=(("groupIndex", int), ("soundIndex", int)),
+            validator=lambda group_index, sound_index: group_index >= 0 and sound_index >= 0,
+        )
+        assert dispatcher.dispatch(MagicMock(), {"action": "playSound", "groupIndex": -1, "soundIndex": 0}) is None
+        handler_mock.assert_not_awaited()
+
+    async def test_dispatch_submits_to_coalescer_with_key(self):
+        coalescer_mock = MagicMock()
+        coalescer_mock.submit = CoroutineMock()
+        dispatcher = MessageDispatcher(coalescer=coalescer_mock)
+        handler_mock = CoroutineMock()
+        dispatcher.register(
+            "setSoundVolume",
+            handler_mock,
+            fields=(("groupIndex", int), ("soundIndex", int), ("volume", float)),
+            coalesce_by=("groupIndex", "soundIndex"),
+        )
+        request = MagicMock()
+        data = {"action": "setSoundVolume", "groupIndex": 1, "soundIndex": 2, "volume": 0.5}
+        await dispatcher.dispatch(request, data)
+        coalescer_mock.submit.assert_awaited_once()
+        key, apply_fn = coalescer_mock.submit.await_args[0]
+        assert key == ("setSoundVolume", 1, 2)
+        handler_mock.assert_not_awaited()
+        await apply_fn()
+        handler_mock.assert_awaited_once_with(request, 1, 2, 0.5)
+
+    async def test_dispatch_calls_handler_directly_without_coalescer(self):
+        dispatcher = MessageDispatcher()
+        handler_mock = CoroutineMock()
+        dispatcher.register("setSoundMasterVolume", handler_mock, fields=(("volume", float),), coalesce_by=())
+        request = MagicMock()
+        await dispatcher.dispatch(request, {"action": "setSoundMasterVolume", "volume": 1})
+        handler_mock.assert_awaited_once_with(request, 1.0)
+
+    def test_actions(self):
+        dispatcher = MessageDispatcher()
+        dispatcher.register("playMusic", CoroutineMock())
+        dispatcher.register("stopMusic", CoroutineMock())
+        assert dispatcher.actions == ("playMusic", "stopMusic")
@@ -0,0 +1,138 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from aiohttp import WSMsgType, web
+from aiohttp.http_websocket import WebSocketReader
+from asynctest import CoroutineMock
+
+from src.websocket import WebsocketClient
+
+
+class TestWebsocketClient:
+    def _ws_mock(self, send_str=None):
+        ws = MagicMock()
+        ws.send_str = send_str if send_str is not None else CoroutineMock()
+        ws.close = CoroutineMock()
+        ws.compress = 0
+        return ws
+
+    async def test_sends_enqueued_frames_in_order(self):
+        ws = self._ws_mock()
+        client = WebsocketClient("client", ws, max_queue_size=10, send_timeout=1)
+        assert client.send("first")
+        assert client.send("second")
+        await asyncio.sleep(0.01)
+        assert [c[0][0] for c in ws.send_str.await_args_list] == ["first", "second"]
+        client.stop()
+
+    async def test_send_returns_false_if_queue_is_full(self):
+        client = WebsocketClient("client", self._ws_mock(), max_queue_size=1, send_timeout=1)
+        assert client.send("first")
+        assert not client.send("second")  # the writer did not get a chance to take the first frame yet
+        client.stop()
+
+    async def test_replace_queue_discards_waiting_frames(self):
+        client = WebsocketClient("client", self._ws_mock(), max_queue_size=3, send_timeout=1)
+        client.send("first")
+        client.send("second")
+        client.replace_queue("replacement")
+        assert client.queue_size == 1
+        assert client._queue.get_nowait() == "replacement"
+        client.stop()
+
+    async def test_calls_on_failure_if_send_times_out(self):
+        on_failure_mock = MagicMock()
+        ws = self._ws_mock(send_str=CoroutineMock(side_effect=lambda _: asyncio.sleep(1)))
+        client = WebsocketClient("client", ws, max_queue_size=1, send_timeout=0.01, on_failure=on_failure_mock)
+        client.send("frame")
+        await asyncio.sleep(0.05)
+        on_failure_mock.assert_called_once_with(client)
+
+    async def test_calls_on_failure_if_websocket_is_unusable(self):
+        on_failure_mock = MagicMock()
+        ws = self._ws_mock()
+        del ws.compress
+        client = WebsocketClient("client", ws, max_queue_size=1, send_timeout=1, on_failure=on_failure_mock)
+        await asyncio.sleep(0.01)
+        on_failure_mock.assert_called_once_with(client)
+
+    async def test_close_stops_writer_and_closes_websocket(self):
+        ws = self._ws_mock()
+        client = WebsocketClient("client", ws, max_queue_size=1, send_timeout=1)
+        await client.close()
+        await asyncio.sleep(0)
+        assert client._writer.cancelled()
+        ws.close.assert_awaited_once()
+
+    async def test_frames_below_compress_threshold_are_sent_uncompressed(self):
+        compress_during_send = []
+        ws = self._ws_mock(
+            send_str=CoroutineMock(side_effect=lambda _: compress_during_send.append(ws._writer.compress))
+        )
+        ws.compress = 15
+        ws._writer.compress = 15
+        client = WebsocketClient("client", ws, max_queue_size=10, send_timeout=1, compress_threshold=10)
+        client.send("short")
+        client.send("long enough to compress")
+        await asyncio.sleep(0.01)
+        assert compress_during_send == [0, 15]
+        assert ws._writer.compress == 15
+        client.stop()
+
+    async def test_frames_below_compress_threshold_are_sent_compressed_if_writer_has_no_compress(self):
+        ws = self._ws_mock()
+        ws.compress = 15
+        del ws._writer.compress
+        client = WebsocketClient("client", ws, max_queue_size=10, send_timeout=1, compress_threshold=10)
+        client.send("short")
+        await asyncio.sleep(0.01)
+        ws.send_str.assert_awaited_once_with("short")
+        assert not hasattr(ws._writer, "compress")
+        client.stop()
+
+    async def test_compress_threshold_is_ignored_if_compression_was_not_negotiated(self):
+        ws = self._ws_mock()
+        ws._writer.compress = 0
+        client = WebsocketClient("client", ws, max_queue_size=10, send_timeout=1, compress_threshold=10)
+        client.send("short")
+        await asyncio.sleep(0.01)
+        ws.send_str.assert_awaited_once_with("short")
+        client.stop()
+
+    async def test_frames_below_compress_threshold_are_not_compressed_on_the_wire(self, aiohttp_client, monkeypatch):
+        """
+        This test ensures that the private writer of aiohttp, which `_send_uncompressed()` relies on, still works.
+        """
+        compressed_frames = []
+        writers = []
+        parse_frame = WebSocketReader.parse_frame
+
+        def record_compressed_frames(reader, buf):
+            frames = parse_frame(reader, buf)
+            compressed_frames.extend(
+                bool(compressed) for _, opcode, _, compressed in frames if opcode == WSMsgType.TEXT
+            )
+            return frames
+
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            writers.append(getattr(ws, "_writer", None))
+            client = WebsocketClient("client", ws, max_queue_size=10, send_timeout=1, compress_threshold=10)
+            client.send("short")
+            client.send("long enough to compress")
+            await ws.receive()  # until the client closes the websocket
+            client.stop()
+            return ws
+
+        monkeypatch.setattr(WebSocketReader, "parse_frame", record_compressed_frames)
+        app = web.Application()
+        app.router.add_get("/", handler)
+        ws = await (await aiohttp_client(app)).ws_connect("/", compress=15)
+        assert [await ws.receive_str(timeout=1), await ws.receive_str(timeout=1)] == [
+            "short",
+            "long enough to compress",
+        ]
+        await ws.close()
+        assert hasattr(writers[0], "compress"), "aiohttp changed its private websocket writer, see _send_uncompressed()"
+        assert compressed_frames == [False, True]